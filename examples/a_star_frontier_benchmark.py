@@ -0,0 +1,100 @@
+import time
+import queue
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.frontiers import IndexedHeap
+from pychology.simple_search.frontiers import BucketQueue
+
+from a_star_on_text_labyrinth import level_3
+from a_star_on_text_labyrinth import create_adjacency_from_string
+from a_star_on_text_labyrinth import euclidean_distance
+
+
+def priority_queue_search(transition_func, start, goal, cost_heuristic, stats):
+    # The search as it was before frontiers became pluggable, with
+    # counters for the frontier size added.
+    frontier = queue.PriorityQueue()
+    explored = {}
+    frontier.put((0, 0, start, None))
+    while True:
+        total_cost, fixed_cost, node, from_node = frontier.get(block=False)
+        if node in explored:
+            continue
+        explored[node] = (fixed_cost, from_node)
+        if node == goal:
+            path = [node]
+            while True:
+                _, from_node = explored[node]
+                if from_node is None:
+                    break
+                path.append(from_node)
+                node = from_node
+            return fixed_cost, list(reversed(path))
+        for next_node, transition_cost in transition_func(node):
+            if next_node in explored:
+                continue
+            next_fixed_cost = fixed_cost + transition_cost
+            next_total_cost = next_fixed_cost + cost_heuristic(next_node, goal)
+            frontier.put((next_total_cost, next_fixed_cost, next_node, node))
+            stats['peak'] = max(stats['peak'], frontier.qsize())
+
+
+def measured(frontier_cls, stats):
+    class MeasuredFrontier(frontier_cls):
+        def push(self, node, priority):
+            changed = super().push(node, priority)
+            stats['peak'] = max(stats['peak'], len(self))
+            return changed
+    return MeasuredFrontier
+
+
+def counting(transition_func, stats):
+    def inner(node):
+        stats['expansions'] += 1
+        return transition_func(node)
+    return inner
+
+
+def run(name, search_func, repetitions=20):
+    stats = dict(expansions=0, peak=0)
+    start_time = time.perf_counter()
+    for _ in range(repetitions):
+        cost, path = search_func(stats)
+    duration = time.perf_counter() - start_time
+    expansions = stats['expansions'] / repetitions
+    print(f"{name:<32} cost {cost:>4}  "
+          f"expansions {expansions:>6.0f}  "
+          f"expansions/s {stats['expansions'] / duration:>9.0f}  "
+          f"peak frontier {stats['peak']:>4}")
+
+
+if __name__ == '__main__':
+    adj_mat, start, goal = create_adjacency_from_string(level_3)
+    transitions = get_neighbors_and_costs(adj_mat)
+    for heuristic_name, heuristic in [('euclidean', euclidean_distance),
+                                      ('manhattan', estimate_manhattan)]:
+        print(f"level_3, {heuristic_name} heuristic")
+        run(
+            "queue.PriorityQueue (old)",
+            lambda stats: priority_queue_search(
+                counting(transitions, stats), start, goal, heuristic, stats,
+            ),
+        )
+        run(
+            "IndexedHeap",
+            lambda stats: search(
+                counting(transitions, stats), start, goal, heuristic,
+                frontier=measured(IndexedHeap, stats),
+            ),
+        )
+        if heuristic is estimate_manhattan:  # Needs integer priorities
+            run(
+                "BucketQueue",
+                lambda stats: search(
+                    counting(transitions, stats), start, goal, heuristic,
+                    frontier=measured(BucketQueue, stats),
+                ),
+            )
+        print()
@@ -135,10 +135,11 @@ def print_labyrinth(level, path=None):
     print(''.join(annotated_level))
     
 
-level = level_2
-adj_mat, start, goal = create_adjacency_from_string(level)
-print(start, goal)
-print_labyrinth(level)
-cost, path = search(get_neighbors_and_costs(adj_mat), start, goal, euclidean_distance)
-print(cost)
-print_labyrinth(level, path)
+if __name__ == '__main__':
+    level = level_2
+    adj_mat, start, goal = create_adjacency_from_string(level)
+    print(start, goal)
+    print_labyrinth(level)
+    cost, path = search(get_neighbors_and_costs(adj_mat), start, goal, euclidean_distance)
+    print(cost)
+    print_labyrinth(level, path)
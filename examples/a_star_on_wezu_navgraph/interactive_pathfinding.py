@@ -12,6 +12,9 @@ from direct.showbase.ShowBase import ShowBase
 
 from pychology.simple_search.a_star import search
 from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import SearchStatistics
+from pychology.simple_search.anytime import ResumableSearch
+from pychology.simple_search.path_cache import PathCache
 
 from navgraph import make_nav_graph
 from navgraph import make_transition_grid
@@ -30,6 +33,26 @@ if __name__ == '__main__':
         description="Test application for pathfinding and navmesh.",
         epilog="",
     )
+    parser.add_argument(
+        '-b',
+        '--budget',
+        type=float,
+        default=0.002,
+        help='Time per frame for pathfinding, in seconds.',
+    )
+    parser.add_argument(
+        '-w',
+        '--weight',
+        type=float,
+        default=1.0,
+        help='Heuristic weight; Above 1, a path is found fast, then improved.',
+    )
+    parser.add_argument(
+        '-t',
+        '--trace',
+        action='store_true',
+        help='Search in one go, show the expanded nodes, and log statistics.',
+    )
     parser.add_argument(
         '-log',
         '--loglevel',
@@ -72,29 +95,85 @@ if __name__ == '__main__':
     to_node = loader.load_model('models/frowney')
     to_node.set_scale(3)
 
+    adjacency_matrix = {
+        node: {
+            neighbor: nav_graph['cost'][node][neighbor]
+            for neighbor in neighbors
+        }
+        for node, neighbors in nav_graph['neighbors'].items()
+    }
+    def estimator(node_a, node_b):
+        pos_a = nav_graph['pos'][node_a]
+        pos_b = nav_graph['pos'][node_b]
+        return (pos_a - pos_b).length()
+    path_cache = PathCache(get_neighbors_and_costs(adjacency_matrix))
+
     def run_path(from_id, to_id):
         # Visualize start and end
         from_node.reparent_to(debug_nav_nodes[from_id])
         to_node.reparent_to(debug_nav_nodes[to_id])
+        base.task_mgr.remove('pathfinding')
+        for smiley in debug_nav_nodes.values():
+            smiley.clear_color()
+
+        cached = path_cache.lookup(from_id, to_id, estimator)
+        if cached is not None:
+            logging.info(f"Path from {from_id} to {to_id} found in cache "
+                         f"({path_cache.hits} hits, {path_cache.subpath_hits} "
+                         f"subpath hits so far).")
+            print(cached[1])
+            visualize_path(cached[1])
+            return
 
         # The actual search
         logging.info(f"Searching path from {from_id} to {to_id}.")
-        adjacency_matrix = {
-            node: {
-                neighbor: nav_graph['cost'][node][neighbor]
-                for neighbor in neighbors
-            }
-            for node, neighbors in nav_graph['neighbors'].items()
-        }
-        def estimator(node_a, node_b):
-            pos_a = nav_graph['pos'][node_a]
-            pos_b = nav_graph['pos'][node_b]
-            return (pos_a - pos_b).length()
-
-        cost, path = search(get_neighbors_and_costs(adjacency_matrix), from_id, to_id, estimator)
-        print(path)
-
-        # Visualize path
+        if args.trace:
+            statistics = SearchStatistics()
+
+            def show_expansion(node, fixed_cost):
+                debug_nav_nodes[node].set_color(1, 0.3, 0.3, 1)
+
+            cost, path = search(
+                get_neighbors_and_costs(adjacency_matrix),
+                from_id,
+                to_id,
+                estimator,
+                statistics=statistics,
+                on_expand=show_expansion,
+            )
+            logging.info(f"Path of cost {cost} found; {statistics}")
+            print(path)
+            visualize_path(path)
+            path_cache.add(from_id, to_id, estimator, cost, path)
+            return
+
+        pathfinder = ResumableSearch(
+            get_neighbors_and_costs(adjacency_matrix),
+            from_id,
+            to_id,
+            estimator,
+            weight=args.weight,
+        )
+
+        # The search runs in slices, a few milliseconds per frame.
+        def search_step(task):
+            best_path = pathfinder.solution
+            solution = pathfinder.step(max_time=args.budget)
+            if solution is not None and solution is not best_path:
+                cost, path = solution
+                logging.info(f"Path of cost {cost} found after "
+                             f"{pathfinder.expansions} expansions.")
+                print(path)
+                visualize_path(path)
+            if pathfinder.done:
+                cost, path = pathfinder.solution
+                path_cache.add(from_id, to_id, estimator, cost, path)
+                return task.done
+            return task.cont
+
+        base.task_mgr.add(search_step, 'pathfinding')
+
+    def visualize_path(path):
         global debug_edges
         debug_edges.remove_node()
         debug_edges = make_transition_grid(nav_graph, path)
@@ -8,6 +8,8 @@ from panda3d.core import Point3
 from panda3d.core import LineSegs
 from panda3d.core import LineSegs
 
+from pychology.games.navmesh.spatial_index import TriangleIndex
+
 
 def round_vec3_to_tuple(vec):
     return tuple([round(x*4.0)/4.0 for x in vec])
@@ -88,23 +90,14 @@ def make_nav_graph(mesh, edge_neighbors_only=True):
         for neighbor in triangle['neighbors']:
             cost[i][neighbor]=_distance(start, triangles[neighbor]['center'])
     lookup={round_vec3_to_tuple(value):key for (key, value) in positions.items()}
-    graph= {'neighbors':edges, 'cost':cost, 'pos':positions, 'lookup':lookup}
+    index=TriangleIndex([triangle['vertex_pos'] for triangle in triangles])
+    graph= {'neighbors':edges, 'cost':cost, 'pos':positions, 'lookup':lookup, 'index':index}
     return graph
 
 def find_nearest_node(nav_graph, pos):
-    pos=round_vec3_to_tuple(pos)
-    if pos in nav_graph['lookup']:
-        return nav_graph['lookup'][pos]
-    dist={0.0}
-    for i in range(50):
-        dist.add(i*0.25)
-        dist.add(i*-0.25)
-        for x in itertools.permutations(dist, 3):
-            key=(pos[0]+x[0], pos[1]+x[1], pos[2]+x[2])
-            if key in nav_graph['lookup']:
-                print(nav_graph['lookup'][key])
-                return nav_graph['lookup'][key]
-    return None
+    # The triangle that the position is on, or else the one with the
+    # nearest center.
+    return nav_graph['index'].snap(pos)
 
 
 def make_transition_grid(nav_graph, path):
@@ -0,0 +1,38 @@
+import time
+
+from pychology.games import four_in_a_row
+from pychology.games.repl import assemble_search
+
+
+def run(spec, game, state, player):
+    search = assemble_search(spec)(game, state, player)
+    start_time = time.perf_counter()
+    search.build_tree()
+    duration = time.perf_counter() - start_time
+    value, actions = search.opinion[game.hash_state(state)]
+    return len(search.known_states), duration, value, actions
+
+
+if __name__ == '__main__':
+    game = four_in_a_row.Game
+    state = game.initial_state()
+    player = four_in_a_row.X
+    print("Four in a row, first move; Nodes stored and time, per depth")
+    print(f"{'depth':>5}  {'plies nodes':>12} {'time':>9}  "
+          f"{'alpha-beta nodes':>16} {'time':>9}  same value")
+    for depth in range(1, 8):
+        if depth <= 6:
+            plies = run(f'limit_type=plies,limit={depth},eval_func',
+                        game, state, player)
+        else:
+            plies = None  # Takes too long
+        pruned = run(f'limit_type=alphabeta,limit={depth},eval_func',
+                     game, state, player)
+        if plies is not None:
+            plies_columns = f"{plies[0]:>12} {plies[1]:>8.2f}s"
+            same = 'yes' if plies[2] == pruned[2] else 'NO'
+        else:
+            plies_columns = f"{'-':>12} {'-':>9}"
+            same = '-'
+        print(f"{depth:>5}  {plies_columns}  "
+              f"{pruned[0]:>16} {pruned[1]:>8.2f}s  {same}")
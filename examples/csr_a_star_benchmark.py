@@ -0,0 +1,52 @@
+import time
+import tracemalloc
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.csr import CSRGraph
+from pychology.simple_search.csr import CSRSearch
+from pychology.simple_search.csr import euclidean_heuristic
+
+from a_star_on_text_labyrinth import level_3
+from a_star_on_text_labyrinth import create_adjacency_from_string
+from a_star_on_text_labyrinth import euclidean_distance
+
+
+def peak_memory(query):
+    # Most memory allocated at once during one query
+    tracemalloc.start()
+    query()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(name, query, repetitions=50):
+    query()  # Warm up
+    start_time = time.perf_counter()
+    for _ in range(repetitions):
+        cost, path = query()
+    duration = (time.perf_counter() - start_time) / repetitions
+    print(f"{name:<28} cost {cost:>6.1f}  "
+          f"time/query {duration * 1000:>6.2f}ms  "
+          f"peak memory/query {peak_memory(query) / 1024:>7.1f}kB")
+
+
+if __name__ == '__main__':
+    adj_mat, start, goal = create_adjacency_from_string(level_3)
+    transitions = get_neighbors_and_costs(adj_mat)
+    centers = {node: (node[0], node[1], 0) for node in adj_mat}
+    graph = CSRGraph.from_nav_graph(adj_mat, centers)
+    print(f"level_3: {graph.num_nodes} nodes, {graph.num_edges} edges")
+    for heuristic_name, heuristic, csr_heuristic in [
+            ('zero', None, None),
+            ('euclidean', euclidean_distance, euclidean_heuristic(graph)),
+    ]:
+        print(f"{heuristic_name} heuristic")
+        if heuristic is None:
+            run("a_star.search", lambda: search(transitions, start, goal))
+        else:
+            run("a_star.search", lambda: search(transitions, start, goal, heuristic))
+        csr_search = CSRSearch(graph, csr_heuristic)
+        run("CSRSearch", lambda: csr_search.search(start, goal))
+        print()
@@ -0,0 +1,77 @@
+import time
+import random
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.incremental import DStarLite
+
+from a_star_on_text_labyrinth import level_3
+from a_star_on_text_labyrinth import create_adjacency_from_string
+from a_star_on_text_labyrinth import euclidean_distance
+
+
+open_level = '\n'.join(
+    ['I' + '.' * 59] + ['.' * 60] * 58 + ['.' * 59 + 'O']
+)
+
+
+def counting(transition_func, counter):
+    def inner(node):
+        counter[0] += 1
+        return transition_func(node)
+    return inner
+
+
+def benchmark(level, heuristic, rounds=20):
+    rng = random.Random(0)
+    print(f"{'edges changed':>13}  {'D* Lite ms':>10}  {'A* ms':>8}  "
+          f"{'D* Lite exp.':>12}  {'A* exp.':>8}")
+    for num_changes in [1, 10, 100, 1000]:
+        adj_mat, start, goal = create_adjacency_from_string(level)
+        edges = [(a, b) for a in adj_mat for b in adj_mat[a]]
+        transitions = get_neighbors_and_costs(adj_mat)
+        planner = DStarLite(transitions, start, goal, heuristic)
+        planner.search()
+        replan_time = scratch_time = 0.0
+        replan_expansions = 0
+        scratch_expansions = [0]
+        for _ in range(rounds):
+            changed = rng.sample(edges, num_changes)
+            for node_a, node_b in changed:
+                # Costs are changed symmetrically, and never drop below
+                # 1, so that the heuristic stays admissible.
+                cost = rng.randint(1, 3)
+                adj_mat[node_a][node_b] = cost
+                adj_mat[node_b][node_a] = cost
+            changed += [(node_b, node_a) for node_a, node_b in changed]
+
+            start_time = time.perf_counter()
+            planner.edges_changed(changed)
+            replan_cost, _ = planner.search()
+            replan_time += time.perf_counter() - start_time
+            replan_expansions += planner.expansions
+
+            start_time = time.perf_counter()
+            scratch_cost, _ = search(
+                counting(transitions, scratch_expansions),
+                start, goal, heuristic,
+            )
+            scratch_time += time.perf_counter() - start_time
+            assert replan_cost == scratch_cost
+        print(f"{num_changes:>13}  "
+              f"{replan_time / rounds * 1000:>10.2f}  "
+              f"{scratch_time / rounds * 1000:>8.2f}  "
+              f"{replan_expansions / rounds:>12.0f}  "
+              f"{scratch_expansions[0] / rounds:>8.0f}")
+
+
+if __name__ == '__main__':
+    print("Random edge cost changes, then a new search; Averages over 20 "
+          "rounds.")
+    print()
+    print("level_3 labyrinth, euclidean heuristic")
+    benchmark(level_3, euclidean_distance)
+    print()
+    print("Open 60x60 grid, manhattan heuristic")
+    benchmark(open_level, estimate_manhattan)
@@ -0,0 +1,101 @@
+import time
+import queue
+import random
+
+from pychology.search import PriorityExpansionQueue
+from pychology.search import SingleNodeBreadthSearch
+
+
+# The expansion queues as they were before they were built on heapq and
+# deque, for comparison.
+
+class LockedPriorityExpansionQueue:
+    def setup_expansion(self):
+        self.expansion_queue = queue.PriorityQueue()
+
+    def enqueue_for_expansion(self, state):
+        p_func = self.game.prioritization_funcs[self.prioritization_function]
+        self.expansion_queue.put((p_func(state), state))
+
+    def peek_expansion(self):
+        priority, state = self.expansion_queue.get(block=False)
+        self.expansion_queue.put((priority, state))
+        return priority, state
+
+    def select_states_to_expand(self):
+        try:
+            priority, state = self.expansion_queue.get(block=False)
+        except queue.Empty:
+            return []
+        return [state]
+
+
+class ListBreadthSearch:
+    def setup_expansion(self):
+        self.expansion_queue = []
+
+    def enqueue_for_expansion(self, state):
+        self.expansion_queue.append(state)
+
+    def select_states_to_expand(self):
+        try:
+            state = self.expansion_queue.pop(0)
+        except IndexError:
+            return []
+        return [state]
+
+
+class Game:
+    # States are boards as lists, like in four in a row, with few
+    # distinct priorities, so that there are many ties.
+    prioritization_funcs = dict(default=lambda state: state[0] % 8)
+
+    @staticmethod
+    def hash_state(state):
+        return tuple(state)
+
+
+def make_queue(queue_class):
+    expansion_queue = queue_class()
+    expansion_queue.game = Game
+    expansion_queue.prioritization_function = 'default'
+    expansion_queue.setup_expansion()
+    return expansion_queue
+
+
+def run(name, queue_class, states, peek=False):
+    expansion_queue = make_queue(queue_class)
+    start_time = time.perf_counter()
+    for state in states:
+        expansion_queue.enqueue_for_expansion(state)
+        if peek:
+            expansion_queue.peek_expansion()
+    while expansion_queue.select_states_to_expand():
+        pass
+    duration = time.perf_counter() - start_time
+    print(f"{name:<40} {duration * 1000:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    rng = random.Random(0)
+    states = [[rng.randrange(1000)] + [0] * 40 + [rng.randrange(3)]
+              for _ in range(50000)]
+    print(f"{len(states)} states, enqueued, then all expanded")
+    run("queue.PriorityQueue", LockedPriorityExpansionQueue, states)
+    run("PriorityExpansionQueue", PriorityExpansionQueue, states)
+    run("queue.PriorityQueue, peek per push", LockedPriorityExpansionQueue,
+        states, peek=True)
+    run("PriorityExpansionQueue, peek per push", PriorityExpansionQueue,
+        states, peek=True)
+    run("list.pop(0)", ListBreadthSearch, states)
+    run("SingleNodeBreadthSearch", SingleNodeBreadthSearch, states)
+
+    dict_states = [dict(board=state) for state in states[:100]]
+    Game.prioritization_funcs['default'] = lambda state: 0
+    try:
+        run("queue.PriorityQueue, dict states", LockedPriorityExpansionQueue,
+            dict_states)
+    except TypeError as error:
+        print(f"{'queue.PriorityQueue, dict states':<40} TypeError: {error}")
+    run("PriorityExpansionQueue, dict states", PriorityExpansionQueue,
+        dict_states)
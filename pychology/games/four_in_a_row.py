@@ -111,6 +111,52 @@ def hash_state(state):
     return sum(b * 3**e for b, e in zip(state, exponents))
 
 
+### Vectorized playouts
+#
+# The same rules, applied to a batch of boards at once; See
+# `VectorizedMonteCarloBasedEvaluation` in `pychology.search`. NumPy is
+# only imported once they are used.
+
+
+def state_to_array(state):
+    import numpy as np
+    return np.array(state, dtype=np.int8)
+
+
+def batch_legal_moves(boards):
+    """
+    A boolean array; Whether each column can be played on each board.
+    """
+    return boards[:, (ROWS - 1) * COLUMNS:] == 0
+
+
+def batch_make_move(boards, moves):
+    """
+    Drops a stone into one column on each board, in place, for whoever's
+    turn it is.
+    """
+    import numpy as np
+    rows = np.arange(len(boards))
+    heights = (boards.reshape(-1, ROWS, COLUMNS) != 0).sum(axis=1)
+    tiles = heights[rows, moves] * COLUMNS + moves
+    x_to_move = boards.sum(axis=1, dtype=np.int64) % 3 == 0
+    boards[rows, tiles] = np.where(x_to_move, X, O)
+    return boards
+
+
+def batch_game_winner(boards):
+    """
+    The winner on each board, or 0 where the game goes on.
+    """
+    import numpy as np
+    tiles = boards[:, np.array(win_lines)]  # (boards, lines, tiles per line)
+    winners = np.zeros(len(boards), dtype=np.int8)
+    winners[(tiles == O).all(axis=2).any(axis=1)] = O
+    winners[(tiles == X).all(axis=2).any(axis=1)] = X
+    winners[(winners == 0) & ~batch_legal_moves(boards).any(axis=1)] = DRAW
+    return winners
+
+
 ### State evaluation
 
 def line_rewarder(state):
@@ -209,3 +255,7 @@ class Game:
     }
     visualize_state = visualize_state
     query_action = query_action
+    state_to_array = state_to_array
+    batch_legal_moves = batch_legal_moves
+    batch_make_move = batch_make_move
+    batch_game_winner = batch_game_winner
@@ -0,0 +1,105 @@
+"""
+Builds nav graphs from navmesh triangles with NumPy.
+
+This does what `make_nav_graph` in `main.py` does, but on arrays, and
+produces a `CSRGraph`: Each triangle is a node, positioned at its
+center, and connected to the triangles that share an edge with it (or,
+with `edge_neighbors_only=False`, any corner), at the cost of the
+distance between their centers. As in `make_nav_graph`, corners are
+considered the same if they are at the same position, rounded to a
+quarter unit.
+
+Building a graph for a large mesh still takes a moment, so
+`cached_nav_graph` keeps it in a file, and only rebuilds it if the mesh
+has changed.
+"""
+import os
+import hashlib
+
+import numpy as np
+
+from pychology.simple_search.csr import CSRGraph
+
+
+def mesh_digest(positions, triangles, edge_neighbors_only=True):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(bytes([edge_neighbors_only]))
+    digest.update(np.ascontiguousarray(positions, dtype=np.float32).tobytes())
+    digest.update(np.ascontiguousarray(triangles, dtype=np.int64).tobytes())
+    return digest.digest()
+
+
+def _pairs_within_groups(keys, members):
+    # For each group of members with the same key, all ordered pairs of
+    # different members.
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    members = members[order]
+    group_starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    group_sizes = np.diff(np.r_[group_starts, len(keys)])
+    sizes = np.repeat(group_sizes, group_sizes)
+    starts = np.repeat(group_starts, group_sizes)
+    rows = np.repeat(np.arange(len(keys)), sizes)
+    first_in_row = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    columns = np.repeat(starts, sizes) + (np.arange(len(rows)) - first_in_row)
+    from_members = members[rows]
+    to_members = members[columns]
+    different = from_members != to_members
+    return from_members[different], to_members[different]
+
+
+def build_nav_graph(positions, triangles, edge_neighbors_only=True):
+    """
+    `positions` has the shape `(vertices, 3)`, `triangles` the shape
+    `(triangles, 3)`, with each row indexing three positions. Returns a
+    `CSRGraph`.
+    """
+    positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+    triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    num_triangles = len(triangles)
+    centers = positions[triangles].mean(axis=1)
+
+    # Merge corners at the same (rounded) position.
+    rounded = np.round(np.round(positions, 4) * 4.0).astype(np.int64)
+    _, vertex_ids = np.unique(rounded, axis=0, return_inverse=True)
+    corners = vertex_ids.reshape(-1)[triangles]  # (triangles, 3)
+
+    triangle_ids = np.arange(num_triangles)
+    if edge_neighbors_only:
+        edges = np.concatenate([corners[:, [0, 1]], corners[:, [1, 2]], corners[:, [0, 2]]])
+        edges.sort(axis=1)
+        num_vertices = int(corners.max()) + 1 if num_triangles else 0
+        keys = edges[:, 0] * num_vertices + edges[:, 1]
+        members = np.tile(triangle_ids, 3)
+    else:
+        keys = corners.T.reshape(-1)
+        members = np.repeat(triangle_ids[np.newaxis], 3, axis=0).reshape(-1)
+    from_ids, to_ids = _pairs_within_groups(keys, members)
+
+    # Each pair once, sorted by the node it starts at
+    pair_keys = np.unique(from_ids * num_triangles + to_ids)
+    from_ids, to_ids = np.divmod(pair_keys, num_triangles)
+    offsets = np.zeros(num_triangles + 1, dtype=np.int64)
+    np.cumsum(np.bincount(from_ids, minlength=num_triangles), out=offsets[1:])
+    costs = np.linalg.norm(centers[to_ids] - centers[from_ids], axis=1)
+    return CSRGraph(offsets, to_ids, costs, centers,
+                    source_digest=mesh_digest(positions, triangles,
+                                              edge_neighbors_only))
+
+
+def cached_nav_graph(positions, triangles, filename, edge_neighbors_only=True):
+    """
+    Loads the nav graph from `filename`, memory-mapped, if it was built
+    from the same mesh; Otherwise builds it, and saves it there.
+    """
+    digest = mesh_digest(positions, triangles, edge_neighbors_only)
+    if os.path.exists(filename):
+        try:
+            graph = CSRGraph.load(filename)
+            if graph.source_digest == digest.rstrip(b'\0'):
+                return graph
+        except ValueError:
+            pass  # Outdated or broken; Rebuild it.
+    graph = build_nav_graph(positions, triangles, edge_neighbors_only)
+    graph.save(filename)
+    return graph
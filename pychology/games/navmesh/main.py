@@ -2,7 +2,10 @@ import sys
 import itertools
 from collections import defaultdict
 
+import numpy as np
+
 from panda3d.core import NodePath
+from panda3d.core import GeomEnums
 from panda3d.core import GeomVertexReader
 from panda3d.core import Vec3
 from panda3d.core import Point3
@@ -15,6 +18,10 @@ from panda3d.core import LineSegs
 
 from direct.showbase.ShowBase import ShowBase
 
+from pychology.games.navmesh.spatial_index import TriangleIndex
+from pychology.games.navmesh.builder import build_nav_graph
+from pychology.games.navmesh.builder import cached_nav_graph
+
 from pychology.search import TranspositionTable
 #from pychology.search import FullExpansion
 from pychology.search import PriorityLimitedExpansion
@@ -111,23 +118,66 @@ def make_nav_graph(mesh, edge_neighbors_only=True):
         for neighbor in triangle['neighbors']:
             cost[i][neighbor]=_distance(start, triangles[neighbor]['center'])
     lookup={round_vec3_to_tuple(value):key for (key, value) in positions.items()}
-    graph= {'neighbors':edges, 'cost':cost, 'pos':positions, 'lookup':lookup}
+    index=TriangleIndex([triangle['vertex_pos'] for triangle in triangles])
+    graph= {'neighbors':edges, 'cost':cost, 'pos':positions, 'lookup':lookup, 'index':index}
     return graph
 
 def find_nearest_node(nav_graph, pos):
-    pos=round_vec3_to_tuple(pos)
-    if pos in nav_graph['lookup']:
-        return nav_graph['lookup'][pos]
-    dist={0.0}
-    for i in range(50):
-        dist.add(i*0.25)
-        dist.add(i*-0.25)
-        for x in itertools.permutations(dist, 3):
-            key=(pos[0]+x[0], pos[1]+x[1], pos[2]+x[2])
-            if key in nav_graph['lookup']:
-                print(nav_graph['lookup'][key])
-                return nav_graph['lookup'][key]
-    return None
+    # The triangle that the position is on, or else the one with the
+    # nearest center.
+    return nav_graph['index'].snap(pos)
+
+def read_navmesh_arrays(mesh):
+    """
+    The navmesh's vertex positions as a `(vertices, 3)` array, and its
+    triangles as a `(triangles, 3)` array of vertex indices, read from
+    the first geom's buffers without going through Python per vertex.
+    """
+    geom = None
+    for child in mesh.get_children():
+        if child.node().is_geom_node():
+            geom = child.node().get_geom(0)
+            break
+    vdata = geom.get_vertex_data()
+    vertex_format = vdata.get_format()
+    column = vertex_format.get_column('vertex')
+    if column.get_numeric_type() != GeomEnums.NT_float32 or \
+       column.get_num_components() != 3:
+        raise ValueError("Navmesh vertices must be three 32 bit floats.")
+    array = vdata.get_array(vertex_format.get_array_with('vertex'))
+    stride = array.get_array_format().get_stride()
+    raw = np.frombuffer(memoryview(array), dtype=np.uint8).reshape(-1, stride)
+    start = column.get_start()
+    positions = raw[:, start:start + 12].copy().view(np.float32).reshape(-1, 3)
+
+    index_types = {
+        GeomEnums.NT_uint8: np.uint8,
+        GeomEnums.NT_uint16: np.uint16,
+        GeomEnums.NT_uint32: np.uint32,
+    }
+    triangles = []
+    for prim in geom.get_primitives():
+        prim = prim.decompose()  # Strips and fans become triangles.
+        if prim.is_indexed():
+            indices = np.frombuffer(memoryview(prim.get_vertices()),
+                                    dtype=index_types[prim.get_index_type()])
+        else:
+            first = prim.get_first_vertex()
+            indices = np.arange(first, first + prim.get_num_vertices())
+        triangles.append(indices.astype(np.int64).reshape(-1, 3))
+    return positions, np.concatenate(triangles)
+
+
+def make_csr_nav_graph(mesh, cache_file=None, edge_neighbors_only=True):
+    """
+    Like `make_nav_graph`, but returns a `CSRGraph`. With a `cache_file`,
+    it is only built if the file doesn't hold the graph for this mesh.
+    """
+    positions, triangles = read_navmesh_arrays(mesh)
+    if cache_file is None:
+        return build_nav_graph(positions, triangles, edge_neighbors_only)
+    return cached_nav_graph(positions, triangles, cache_file, edge_neighbors_only)
+
 
 def load_map(name):
     level = loader.load_model(name)
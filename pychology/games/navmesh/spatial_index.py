@@ -0,0 +1,190 @@
+"""
+A spatial index over the triangles of a navmesh.
+
+Navmeshes are mostly flat, so the triangles are sorted into a uniform
+grid over the x/y plane, with cells about the size of a triangle. Each
+cell lists the triangles whose centers lie in it, and those that overlap
+it at all. A query only looks at the cells around its position, so its
+cost depends on the local density of triangles, not on their number.
+
+Triangle IDs are their indices in the array of corners that the index
+was built from, which for `make_nav_graph` are the node IDs.
+"""
+import math
+
+import numpy as np
+
+
+class TriangleIndex:
+    def __init__(self, corners, cell_size=None):
+        """
+        `corners` is an array-like of shape `(triangles, 3, 3)`; For each
+        triangle, its three corners' x, y and z coordinates.
+        """
+        self.corners = np.asarray(corners, dtype=np.float64).reshape(-1, 3, 3)
+        self.centers = self.corners.mean(axis=1)
+        num_triangles = len(self.corners)
+        if num_triangles == 0:
+            raise ValueError("Can't index a navmesh without triangles.")
+        low = self.corners[:, :, :2].min(axis=1)
+        high = self.corners[:, :, :2].max(axis=1)
+        self.origin = low.min(axis=0)
+        extent = high.max(axis=0) - self.origin
+        if cell_size is None:
+            # About one triangle per cell
+            cell_size = math.sqrt(max(extent[0] * extent[1], 1e-12) / num_triangles)
+            cell_size = max(cell_size, extent.max() / 1024, 1e-6)
+        self.cell_size = cell_size
+        self.shape = np.maximum(np.ceil(extent / cell_size).astype(int), 1)
+
+        # Triangles by the cell of their center
+        center_cells = self._cell_ids(self._cells(self.centers[:, :2]))
+        self.center_order = np.argsort(center_cells, kind='stable')
+        self.center_start = np.searchsorted(
+            center_cells[self.center_order],
+            np.arange(self.shape[0] * self.shape[1] + 1),
+        )
+
+        # Triangles by the cells overlapped by their bounding box
+        low_cells = self._cells(low)
+        high_cells = self._cells(high)
+        cell_ids = []
+        triangle_ids = []
+        for triangle_id in range(num_triangles):
+            (x_low, y_low), (x_high, y_high) = low_cells[triangle_id], high_cells[triangle_id]
+            xs, ys = np.meshgrid(np.arange(x_low, x_high + 1),
+                                 np.arange(y_low, y_high + 1))
+            ids = self._cell_ids(np.stack([xs.ravel(), ys.ravel()], axis=1))
+            cell_ids.append(ids)
+            triangle_ids.append(np.full(len(ids), triangle_id))
+        cell_ids = np.concatenate(cell_ids)
+        triangle_ids = np.concatenate(triangle_ids)
+        order = np.argsort(cell_ids, kind='stable')
+        self.overlap_order = triangle_ids[order]
+        self.overlap_start = np.searchsorted(
+            cell_ids[order],
+            np.arange(self.shape[0] * self.shape[1] + 1),
+        )
+
+    def _cells(self, points):
+        cells = np.floor((points - self.origin) / self.cell_size).astype(int)
+        return np.clip(cells, 0, self.shape - 1)
+
+    def _cell_ids(self, cells):
+        return cells[:, 0] * self.shape[1] + cells[:, 1]
+
+    def _centers_in(self, x_low, x_high, y_low, y_high):
+        # IDs of the triangles with their centers in a block of cells
+        parts = []
+        for x in range(x_low, x_high + 1):
+            row_start = x * self.shape[1]
+            start = self.center_start[row_start + y_low]
+            end = self.center_start[row_start + y_high + 1]
+            if start < end:
+                parts.append(self.center_order[start:end])
+        return parts
+
+    def k_nearest(self, pos, k):
+        """
+        IDs of the `k` triangles with the centers closest to `pos`,
+        closest first.
+        """
+        point = np.asarray(tuple(pos), dtype=np.float64)
+        k = min(k, len(self.centers))
+        if k <= 0:
+            return []
+        cell_x, cell_y = self._cells(point[:2][np.newaxis])[0]
+        max_x, max_y = self.shape - 1
+        offset = (point[:2] - self.origin) / self.cell_size
+        candidates = []
+        distances = []
+        done = None  # The block of cells searched so far
+        radius = 0
+        while True:
+            x_low, x_high = max(cell_x - radius, 0), min(cell_x + radius, max_x)
+            y_low, y_high = max(cell_y - radius, 0), min(cell_y + radius, max_y)
+            if done is None:
+                blocks = [(x_low, x_high, y_low, y_high)]
+            else:  # Only the cells that weren't searched already
+                done_x_low, done_x_high, done_y_low, done_y_high = done
+                blocks = [
+                    (x_low, done_x_low - 1, y_low, y_high),
+                    (done_x_high + 1, x_high, y_low, y_high),
+                    (done_x_low, done_x_high, y_low, done_y_low - 1),
+                    (done_x_low, done_x_high, done_y_high + 1, y_high),
+                ]
+            for block in blocks:
+                if block[0] <= block[1] and block[2] <= block[3]:
+                    for ids in self._centers_in(*block):
+                        candidates.append(ids)
+                        distances.append(
+                            np.linalg.norm(self.centers[ids] - point, axis=1)
+                        )
+            done = (x_low, x_high, y_low, y_high)
+            # Triangles that haven't been seen are at least this far away.
+            bounds = []
+            if x_low > 0:
+                bounds.append(offset[0] - x_low)
+            if x_high < max_x:
+                bounds.append(x_high + 1 - offset[0])
+            if y_low > 0:
+                bounds.append(offset[1] - y_low)
+            if y_high < max_y:
+                bounds.append(y_high + 1 - offset[1])
+            num_candidates = sum(len(ids) for ids in candidates)
+            if not bounds:
+                break
+            if num_candidates >= k:
+                bound = max(min(bounds), 0.0) * self.cell_size
+                kth_distance = np.partition(np.concatenate(distances), k - 1)[k - 1]
+                if kth_distance <= bound:
+                    break
+            radius += 1
+        candidates = np.concatenate(candidates)
+        distances = np.concatenate(distances)
+        best = np.argsort(distances, kind='stable')[:k]
+        return [int(triangle_id) for triangle_id in candidates[best]]
+
+    def nearest(self, pos):
+        """
+        ID of the triangle with the center closest to `pos`.
+        """
+        return self.k_nearest(pos, 1)[0]
+
+    def containing(self, pos, tolerance=1e-6):
+        """
+        ID of the triangle that `pos` lies on or above or below, judged
+        on the x/y plane; Where several triangles are stacked, the one
+        closest in height. `None` if there is none.
+        """
+        point = np.asarray(tuple(pos), dtype=np.float64)
+        cell_id = self._cell_ids(self._cells(point[:2][np.newaxis]))[0]
+        ids = self.overlap_order[self.overlap_start[cell_id]:self.overlap_start[cell_id + 1]]
+        if not len(ids):
+            return None
+        corners = self.corners[ids]
+        a = corners[:, 0, :]
+        edge_1 = corners[:, 1, :] - a
+        edge_2 = corners[:, 2, :] - a
+        to_point = point - a
+        # Barycentric coordinates on the x/y plane
+        determinant = edge_1[:, 0] * edge_2[:, 1] - edge_1[:, 1] * edge_2[:, 0]
+        valid = np.abs(determinant) > 1e-12
+        determinant = np.where(valid, determinant, 1.0)
+        u = (to_point[:, 0] * edge_2[:, 1] - to_point[:, 1] * edge_2[:, 0]) / determinant
+        v = (edge_1[:, 0] * to_point[:, 1] - edge_1[:, 1] * to_point[:, 0]) / determinant
+        inside = valid & (u >= -tolerance) & (v >= -tolerance) & (u + v <= 1 + tolerance)
+        if not inside.any():
+            return None
+        heights = a[:, 2] + u * edge_1[:, 2] + v * edge_2[:, 2]
+        height_differences = np.where(inside, np.abs(heights - point[2]), np.inf)
+        return int(ids[np.argmin(height_differences)])
+
+    def snap(self, pos):
+        """
+        The triangle that `pos` is on, or else the nearest one.
+        """
+        triangle_id = self.containing(pos)
+        if triangle_id is None:
+            triangle_id = self.nearest(pos)
+        return triangle_id
@@ -7,6 +7,9 @@ from pychology.search import NoExpansion
 from pychology.search import FullExpansion
 from pychology.search import NodeLimitedExpansion
 from pychology.search import StepLimitedExpansion
+from pychology.search import AlphaBetaExpansion
+from pychology.search import TimeLimitedDeepening
+from pychology.search import MCTSExpansion
 from pychology.search import SingleNodeBreadthSearch
 from pychology.search import BreadthSearch
 from pychology.search import PriorityExpansionQueue
@@ -15,8 +18,12 @@ from pychology.search import Portfolio
 from pychology.search import ZeroSumPlayer
 from pychology.search import WinnerBasedEvaluation
 from pychology.search import MonteCarloBasedEvaluation
+from pychology.search import ParallelMonteCarloBasedEvaluation
+from pychology.search import VectorizedMonteCarloBasedEvaluation
 from pychology.search import GameBasedEvaluation
 from pychology.search import Minimax
+from pychology.search import AlphaBeta
+from pychology.search import UCT
 from pychology.search import RandomChooser
 from pychology.search import BestMovePlayer
 from pychology.search import Search
@@ -179,7 +186,25 @@ def assemble_search(spec_str):
 
     limit_type = properties["limit_type"]
     #import pdb; pdb.set_trace()
-    if limit_type == "none":
+    if limit_type == 'mcts':
+        bases.append(MCTSExpansion)
+        bases.append(NoExpansionQueue)
+        if 'time' in properties:
+            attribs['time_limit'] = float(properties['time'])
+            attribs['mcts_iterations'] = None
+        if 'limit' in properties:
+            attribs['mcts_iterations'] = int(properties['limit'])
+    elif 'time' in properties:
+        # Time budgets are spent on iterative deepening alpha-beta.
+        if limit_type not in ['none', 'alphabeta']:
+            raise Exception(f"Limit type '{limit_type}' can't have a time limit.")
+        limit_type = 'alphabeta'
+        bases.append(TimeLimitedDeepening)
+        bases.append(NoExpansionQueue)
+        attribs['time_limit'] = float(properties['time'])
+        if 'limit' in properties:
+            attribs['max_depth'] = int(properties['limit'])
+    elif limit_type == "none":
         bases.append(FullExpansion)
         bases.append(BreadthSearch)
     elif limit_type == "no_exp":
@@ -198,6 +223,11 @@ def assemble_search(spec_str):
     elif limit_type == 'priority':
         bases.append(FullExpansion)
         bases.append(PriorityExpansionQueue)
+    elif limit_type == 'alphabeta':
+        bases.append(AlphaBetaExpansion)
+        bases.append(NoExpansionQueue)
+        if 'limit' in properties:
+            attribs['search_depth'] = int(properties['limit'])
     else:
         raise Exception(f"Unknown limit type '{limit_type}'.")
 
@@ -217,12 +247,28 @@ def assemble_search(spec_str):
             attribs['evaluation_function'] = func
     else:
         if 'mcts' in properties:
-            bases.append(MonteCarloBasedEvaluation)
-            if isinstance(properties['mcts'], int):
-                attribs['mcts_width'] = properties['mcts']
+            if 'parallel' in properties:
+                bases.append(ParallelMonteCarloBasedEvaluation)
+                if isinstance(properties['parallel'], str):
+                    attribs['rollout_processes'] = int(properties['parallel'])
+                if 'seed' in properties:
+                    attribs['rollout_seed'] = int(properties['seed'])
+            elif 'vectorized' in properties:
+                bases.append(VectorizedMonteCarloBasedEvaluation)
+                if 'seed' in properties:
+                    attribs['rollout_seed'] = int(properties['seed'])
+            else:
+                bases.append(MonteCarloBasedEvaluation)
+            if isinstance(properties['mcts'], str):
+                attribs['mcts_width'] = int(properties['mcts'])
         else:
             bases.append(WinnerBasedEvaluation)
-    bases.append(Minimax)
+    if limit_type == 'alphabeta':
+        bases.append(AlphaBeta)
+    elif limit_type == 'mcts':
+        bases.append(UCT)
+    else:
+        bases.append(Minimax)
 
     action_selection = properties["select_action"]
     if action_selection == 'best':
@@ -80,6 +80,51 @@ def hash_state(state):
     h = ''.join([{X: 'X', O: 'O', None: ' '}[t] for t in board])
     return h
 
+### Vectorized playouts
+#
+# The same rules, applied to a batch of boards at once; See
+# `VectorizedMonteCarloBasedEvaluation` in `pychology.search`. Boards are
+# rows of a NumPy array, with 0 for empty tiles; NumPy is only imported
+# once they are used.
+
+
+def state_to_array(state):
+    import numpy as np
+    return np.array([0 if t is None else t for t in state['board']],
+                    dtype=np.int8)
+
+
+def batch_legal_moves(boards):
+    """
+    A boolean array; Whether each move can be made on each board.
+    """
+    return boards == 0
+
+
+def batch_make_move(boards, moves):
+    """
+    Makes one move on each board, in place, for whoever's turn it is.
+    """
+    import numpy as np
+    rows = np.arange(len(boards))
+    x_to_move = (boards == X).sum(axis=1) == (boards == O).sum(axis=1)
+    boards[rows, moves] = np.where(x_to_move, X, O)
+    return boards
+
+
+def batch_game_winner(boards):
+    """
+    The winner on each board, or 0 where the game goes on.
+    """
+    import numpy as np
+    tiles = boards[:, np.array(lines)]  # (boards, lines, tiles per line)
+    winners = np.zeros(len(boards), dtype=np.int8)
+    winners[(tiles == O).all(axis=2).any(axis=1)] = O
+    winners[(tiles == X).all(axis=2).any(axis=1)] = X
+    winners[(winners == 0) & (boards != 0).all(axis=1)] = DRAW
+    return winners
+
+
 ### User interaction
 
 def visualize_state(state):
@@ -157,3 +202,7 @@ class Game:
     query_ai_players = query_ai_players
     visualize_state = visualize_state
     query_action = query_action
+    state_to_array = state_to_array
+    batch_legal_moves = batch_legal_moves
+    batch_make_move = batch_make_move
+    batch_game_winner = batch_game_winner
@@ -20,10 +20,20 @@ import random
 import itertools
 from collections import defaultdict
 import math
-import queue
+import heapq
+import time
+import os
+import atexit
+import inspect
+import importlib
+from collections import deque
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 
 class Search:
+    evaluates_successors = True
+
     def __init__(self, game, state, player):
         self.game = game
         self.player = player
@@ -68,28 +78,41 @@ class Search:
         states = self.select_states_to_expand()
         if not states:
             return False  # Nothing left to expand
+        expanded_states = []
         for state in states:
             if self.game.game_winner(state):
                 continue  # Terminal states can't be expanded.
-            actions = self.get_expanding_actions(state)
-            for action in actions:
-                successor = self.game.make_move(state, action)
-                successor_is_new_state = self.store_state(successor)
-                self.store_transition(state, action, successor)
-                if successor_is_new_state:
-                    successor_hash = self.game.hash_state(successor)
-                    # FIXME: Hashes may only be used in extensions.
-                    self.value[successor_hash] = self.evaluate_state(successor)
-                    # Is the node terminal?
-                    # FIXME: This should be encapsulated in TT.
-                    terminal_value = self.game.game_winner(successor)
-                    if terminal_value is not None:
-                        self.terminal_states[successor_hash] = terminal_value
-
-                    self.enqueue_for_expansion(successor)
-            self.backpropagate(state)
+            expanded_states.append(state)
+            self.expand_state(state)
+        if expanded_states:
+            self.backpropagate(*expanded_states)
         return True  # Keep running
 
+    def expand_state(self, state):
+        """
+        Stores the successors of a non-terminal state, and the
+        transitions to them, and evaluates (unless
+        `evaluates_successors` is False) and enqueues those that are
+        new.
+        """
+        actions = self.get_expanding_actions(state)
+        for action in actions:
+            successor = self.game.make_move(state, action)
+            successor_is_new_state = self.store_state(successor)
+            self.store_transition(state, action, successor)
+            if successor_is_new_state:
+                successor_hash = self.game.hash_state(successor)
+                # FIXME: Hashes may only be used in extensions.
+                if self.evaluates_successors:
+                    self.value[successor_hash] = self.evaluate_state(successor)
+                # Is the node terminal?
+                # FIXME: This should be encapsulated in TT.
+                terminal_value = self.game.game_winner(successor)
+                if terminal_value is not None:
+                    self.terminal_states[successor_hash] = terminal_value
+
+                self.enqueue_for_expansion(successor)
+
     def build_tree(self):
         raise NotImplementedError
 
@@ -109,10 +132,11 @@ class Search:
         """
         raise NotImplementedError
 
-    def backpropagate(self, state):
+    def backpropagate(self, *states):
         """
-        Determine the actual value of the node based on states expanded
-        from it.
+        Determine the actual values of the nodes of the states that have
+        just been expanded, and of those of their ancestors that are
+        affected by that.
         """
         raise NotImplementedError
 
@@ -140,6 +164,8 @@ class Search:
 # Storage
 
 class TranspositionTable:
+    backpropagation_limit = 8
+
     def setup_storage(self):
         self.known_states = {}  # hash -> state
         self.terminal_states = {}  # hash -> winner
@@ -147,6 +173,18 @@ class TranspositionTable:
         self.parents = defaultdict(list)  # hash -> [(hash, action)]
         self.value = {}  # hash -> value
         self.opinion = {}  # hash -> (value, [action])
+        self.depth = {}  # hash -> plies from the root, as first reached
+        # hash -> (searched depth, value, bound type, [action]); See
+        # `AlphaBeta`.
+        self.bounds = {}
+        # Monte Carlo Tree Search statistics; See `UCT`.
+        self.visits = defaultdict(int)  # hash -> playouts through state
+        self.move_stats = {}  # hash -> {player: {move: [visits, reward]}}
+        self.reevaluations = 0  # In the last backpropagation
+        # In the last backpropagation, states on cycles that were left
+        # with a stale value by `backpropagation_limit`
+        self.truncated = set()
+        self.cyclic_states = set()  # Found to lie on a cycle
 
     def store_state(self, state):
         state_hash = self.game.hash_state(state)
@@ -161,24 +199,83 @@ class TranspositionTable:
         successor_hash = self.game.hash_state(successor)
         self.children[state_hash].append((successor_hash, action))
         self.parents[successor_hash].append((state_hash, action))
+        if successor_hash not in self.depth:
+            self.depth[successor_hash] = self.depth.get(state_hash, 0) + 1
 
-    def backpropagate(self, state):
-        state_hash = self.game.hash_state(state)
-        states_to_update = [state_hash]
-        while states_to_update:
-            state_hash = states_to_update.pop(0)
+    def backpropagate(self, *states):
+        """
+        Reevaluates the states, and then the parents of every state
+        whose value has changed, in one wave. States wait in a heap,
+        deepest first, so that a node is usually only reevaluated after
+        all its changed children, and thus only once; A set of the
+        waiting states keeps each in it only once. On cycles in the
+        graph, values could chase each other forever, so a state that
+        lies on a cycle is reevaluated at most `backpropagation_limit`
+        times per wave, and after that, keeps whatever value it has;
+        Those states are recorded in `self.truncated`. All other states
+        are reevaluated as often as their children change.
+        `self.reevaluations` counts how many reevaluations the last wave
+        took.
+        """
+        waiting = []  # (-depth, tie breaker, hash)
+        dirty = set()
+        evaluations = defaultdict(int)  # hash -> reevaluations in this wave
+        tie_breaker = itertools.count()
+        acyclic_states = set()  # The graph doesn't change during a wave.
+        truncated = set()
+
+        def on_cycle(state_hash):
+            # Whether the state is its own ancestor
+            if state_hash in self.cyclic_states:
+                return True
+            if state_hash in acyclic_states:
+                return False
+            seen = set()
+            ancestors = [parent for parent, _ in self.parents.get(state_hash, [])]
+            while ancestors:
+                ancestor = ancestors.pop()
+                if ancestor == state_hash:
+                    self.cyclic_states.add(state_hash)
+                    return True
+                if ancestor not in seen:
+                    seen.add(ancestor)
+                    ancestors.extend(
+                        parent for parent, _ in self.parents.get(ancestor, [])
+                    )
+            acyclic_states.add(state_hash)
+            return False
+
+        def mark_dirty(state_hash):
+            if state_hash in dirty:
+                return
+            if evaluations[state_hash] >= self.backpropagation_limit and \
+               on_cycle(state_hash):
+                truncated.add(state_hash)
+                return
+            dirty.add(state_hash)
+            depth = self.depth.get(state_hash, 0)
+            heapq.heappush(waiting, (-depth, next(tie_breaker), state_hash))
+
+        for state in states:
+            mark_dirty(self.game.hash_state(state))
+        reevaluations = 0
+        while waiting:
+            _, _, state_hash = heapq.heappop(waiting)
+            dirty.discard(state_hash)
+            evaluations[state_hash] += 1
+            reevaluations += 1
             state = self.known_states[state_hash]
             state_value, best_actions = self.reevaluate_node(state)
             self.opinion[state_hash] = (state_value, best_actions)
-            if state_hash not in self.value:
-                # Apparently this is the root node, and hasn't gotten a
-                # heuristic valuation at the beginning. FIXME: We should
-                # still propagate, as cycles may exist in the graph.
+            # The root has no heuristic value from being expanded to;
+            # It is propagated all the same, as cycles may lead to it.
+            if state_hash not in self.value or \
+               self.value[state_hash] != state_value:
                 self.value[state_hash] = state_value
-            elif self.value[state_hash] != state_value:
-                self.value[state_hash] = state_value
-                for s, a in self.parents[state_hash]:
-                    states_to_update.append(s)
+                for parent_hash, _ in self.parents[state_hash]:
+                    mark_dirty(parent_hash)
+        self.reevaluations = reevaluations
+        self.truncated = truncated
 
 
 # Tree expansion
@@ -200,6 +297,115 @@ class NodeLimitedExpansion:
             pass
 
 
+class AlphaBetaExpansion:
+    """
+    Instead of stepping the core loop, the tree is searched depth-first
+    by `alpha_beta()` (see `AlphaBeta`) up to `search_depth` plies, and
+    only those states are expanded that may still affect the root's
+    value. Use with `NoExpansionQueue`.
+    """
+    search_depth = 4
+
+    def build_tree(self):
+        self.alpha_beta(
+            self.current_state,
+            self.search_depth,
+            -math.inf,
+            math.inf,
+        )
+
+
+class OutOfTime(Exception):
+    pass
+
+
+class TimeLimitedDeepening:
+    """
+    Iterative deepening alpha-beta search: `alpha_beta()` (see
+    `AlphaBeta`) is run to a depth of 1, then 2, and so on, until
+    `time_limit` seconds have passed, the root's value is a sure win or
+    loss, or `max_depth` is reached. Each iteration tries the best
+    actions of the previous ones first, as they are stored in the
+    transposition table, so the shallow iterations make the deeper ones
+    cheaper.
+
+    The clock is checked every `clock_check_interval` visited nodes.
+    When the time is up, the current iteration is abandoned, and the
+    opinion of the last completed one is kept; The first iteration is
+    always completed. `completed_depth` is the depth that it had. Put
+    this before `AlphaBeta` in the bases, and use with
+    `NoExpansionQueue`.
+    """
+    time_limit = 1.0
+    max_depth = 100
+    clock_check_interval = 256
+
+    def build_tree(self):
+        root_hash = self.game.hash_state(self.current_state)
+        self.deadline = None
+        self.nodes_until_clock_check = self.clock_check_interval
+        self.completed_depth = 0
+        completed_opinion = None
+        deadline = time.perf_counter() + self.time_limit
+        for depth in range(1, self.max_depth + 1):
+            try:
+                value = self.alpha_beta(
+                    self.current_state,
+                    depth,
+                    -math.inf,
+                    math.inf,
+                )
+            except OutOfTime:
+                break
+            self.completed_depth = depth
+            completed_opinion = self.opinion.get(root_hash)
+            if value in (math.inf, -math.inf):
+                break  # Deeper search won't change a sure outcome.
+            self.deadline = deadline
+            if time.perf_counter() >= deadline:
+                break
+        if completed_opinion is not None:
+            self.opinion[root_hash] = completed_opinion
+
+    def alpha_beta(self, state, depth, alpha, beta):
+        if self.deadline is not None:
+            self.nodes_until_clock_check -= 1
+            if self.nodes_until_clock_check <= 0:
+                self.nodes_until_clock_check = self.clock_check_interval
+                if time.perf_counter() >= self.deadline:
+                    raise OutOfTime
+        return super().alpha_beta(state, depth, alpha, beta)
+
+
+class MCTSExpansion:
+    """
+    Runs `mcts_iteration()` (see `UCT`) `mcts_iterations` times, or
+    until `time_limit` seconds have passed, whichever comes first;
+    Either can be None, but not both. At least two iterations are run,
+    as the root is only expanded on its second visit, and without a
+    move tried from it, there would be no opinion. Use with
+    `NoExpansionQueue`.
+    """
+    mcts_iterations = 1000
+    time_limit = None
+
+    def build_tree(self):
+        if self.mcts_iterations is None and self.time_limit is None:
+            raise Exception("MCTS needs an iteration or a time limit.")
+        if self.time_limit is not None:
+            deadline = time.perf_counter() + self.time_limit
+        for iteration in itertools.count():
+            if iteration >= 2:
+                if self.mcts_iterations is not None and \
+                   iteration >= self.mcts_iterations:
+                    break
+                if self.time_limit is not None and \
+                   time.perf_counter() >= deadline:
+                    break
+            self.mcts_iteration()
+        self.update_mcts_opinion()
+
+
 class StepLimitedExpansion:
     def build_tree(self):
         for _ in range(self.expansion_steps):
@@ -212,8 +418,10 @@ class PriorityLimitedExpansion:
         best_terminal_value = math.inf
         known_terminal_states = set()
         while self.step():
-            priority, state = self.expansion_queue.get(block=False)
-            self.expansion_queue.put((priority, state))
+            next_expansion = self.peek_expansion()
+            if next_expansion is None:
+                continue  # Queue is empty, so the next step ends this.
+            priority, state = next_expansion
             if priority > best_terminal_value:
                 break  # Best state in queue is worse than a known one.
 
@@ -240,17 +448,38 @@ class NoExpansionQueue:
 
 
 class BasicExpansionQueue:
+    """
+    With `unique_expansions`, a state whose hash has already been
+    enqueued once is not enqueued again.
+    """
+    unique_expansions = False
+
     def setup_expansion(self):
-        self.expansion_queue = []  # hashes
+        self.expansion_queue = []  # states
+        self.enqueued_hashes = set()
+
+    def is_new_expansion(self, state):
+        if not self.unique_expansions:
+            return True
+        state_hash = self.game.hash_state(state)
+        if state_hash in self.enqueued_hashes:
+            return False
+        self.enqueued_hashes.add(state_hash)
+        return True
 
 
 class SingleNodeBreadthSearch(BasicExpansionQueue):
+    def setup_expansion(self):
+        super().setup_expansion()
+        self.expansion_queue = deque()
+
     def enqueue_for_expansion(self, state):
-        self.expansion_queue.append(state)
+        if self.is_new_expansion(state):
+            self.expansion_queue.append(state)
 
     def select_states_to_expand(self):
         try:
-            state = self.expansion_queue.pop(0)
+            state = self.expansion_queue.popleft()
         except IndexError:
             return []
         return [state]
@@ -258,11 +487,12 @@ class SingleNodeBreadthSearch(BasicExpansionQueue):
 
 class SingleNodeDepthSearch(BasicExpansionQueue):
     def enqueue_for_expansion(self, state):
-        self.expansion_queue.append(state)
+        if self.is_new_expansion(state):
+            self.expansion_queue.append(state)
 
     def select_states_to_expand(self):
         try:
-            state = self.expansion_queue.pop(-1)
+            state = self.expansion_queue.pop()
         except IndexError:
             return []
         return [state]
@@ -270,37 +500,54 @@ class SingleNodeDepthSearch(BasicExpansionQueue):
 
 class BreadthSearch(BasicExpansionQueue):
     def enqueue_for_expansion(self, state):
-        self.expansion_queue.append(state)
+        if self.is_new_expansion(state):
+            self.expansion_queue.append(state)
 
     def select_states_to_expand(self):
-        try:
-            states = self.expansion_queue
-            self.expansion_queue = []
-        except IndexError:
-            return []
+        states = self.expansion_queue
+        self.expansion_queue = []
         return states
 
 
-class PriorityExpansionQueue:
+class PriorityExpansionQueue(BasicExpansionQueue):
+    """
+    Expands the state with the lowest priority first, and of those with
+    the same priority, the one that was enqueued first; States are never
+    compared with each other.
+    """
     prioritization_func = 'default'
     def setup_expansion(self):
-        self.expansion_queue = queue.PriorityQueue()
+        super().setup_expansion()
+        self.expansion_queue = []  # heap of (priority, insertion, state)
+        self.insertion_counter = itertools.count()
 
     def enqueue_for_expansion(self, state):
+        if not self.is_new_expansion(state):
+            return
         p_func_name = self.prioritization_function
         p_func = self.game.prioritization_funcs[p_func_name]
         priority = p_func(state)
         #print(f"Enqueue: {state} @ {priority}")
-        self.expansion_queue.put(
-            (priority, state)
+        heapq.heappush(
+            self.expansion_queue,
+            (priority, next(self.insertion_counter), state),
         )
 
+    def peek_expansion(self):
+        """
+        Returns `(priority, state)` of the state to expand next, or None
+        if there is none, without removing it from the queue.
+        """
+        if not self.expansion_queue:
+            return None
+        priority, _, state = self.expansion_queue[0]
+        return priority, state
+
     def select_states_to_expand(self):
-        try:
-            priority, state = self.expansion_queue.get(block=False)
-            #print(f"Expand : {state} @ {priority}")
-        except queue.Empty:
+        if not self.expansion_queue:
             return []
+        priority, _, state = heapq.heappop(self.expansion_queue)
+        #print(f"Expand : {state} @ {priority}")
         return [state]
 
 
@@ -397,7 +644,29 @@ class WinnerBasedEvaluation:
             return valuations
 
 
-class MonteCarloBasedEvaluation:
+class RandomPlayouts:
+    """
+    Plays games out to their end, with each player making random moves.
+    Override `rollout_policy` to make the moves smarter.
+    """
+    def rollout_policy(self, state):
+        moves = self.game.legal_moves(state)
+        choices = {player: None for player in moves}
+        for player, options in moves.items():
+            if options:
+                choices[player] = random.choice(options)
+        return choices
+
+    def playout(self, state):
+        """
+        Returns the winner of the game played out from the state.
+        """
+        while not (winner := self.game.game_winner(state)):
+            state = self.game.make_move(state, self.rollout_policy(state))
+        return winner
+
+
+class MonteCarloBasedEvaluation(RandomPlayouts):
     mcts_width = 1
 
     def evaluate_state_by_player(self, state):
@@ -406,14 +675,7 @@ class MonteCarloBasedEvaluation:
         if winner is None:
             valuation = {p: 0 for p in players}
             for _ in range(self.mcts_width):
-                loop_state = state
-                while not (winner := self.game.game_winner(loop_state)):
-                    moves = self.game.legal_moves(loop_state)
-                    choices = {player: None for player in moves}
-                    for player, options in moves.items():
-                        if options:
-                            choices[player] = random.choice(options)
-                    loop_state = self.game.make_move(loop_state, choices)
+                winner = self.playout(state)
                 if winner in players:
                     valuation[winner] += 1
             return valuation
@@ -423,6 +685,157 @@ class MonteCarloBasedEvaluation:
             return valuations
 
 
+# Process pools for `ParallelMonteCarloBasedEvaluation`, kept across
+# searches, so that each worker gets the game only once.
+_rollout_pools = {}  # (game, processes, rollout class) -> pool
+_rollout_worker = {}  # The state of a worker process
+
+
+def _init_rollout_worker(game, rollout_class):
+    if isinstance(game, str):  # Modules are sent by name.
+        game = importlib.import_module(game)
+    playouts = rollout_class()
+    playouts.game = game
+    _rollout_worker['playouts'] = playouts
+
+
+def _run_playouts(state, seeds):
+    playouts = _rollout_worker['playouts']
+    winners = Counter()
+    for seed in seeds:
+        random.seed(seed)
+        winners[playouts.playout(state)] += 1
+    return winners
+
+
+def shutdown_rollout_pools():
+    for pool in _rollout_pools.values():
+        pool.shutdown()
+    _rollout_pools.clear()
+
+
+atexit.register(shutdown_rollout_pools)
+
+
+class ParallelMonteCarloBasedEvaluation(MonteCarloBasedEvaluation):
+    """
+    Like `MonteCarloBasedEvaluation`, but the `mcts_width` playouts of a
+    state are spread over `rollout_processes` worker processes (by
+    default, one per core), which send back only how often each player
+    won. This pays off once there are enough playouts per state to keep
+    the workers busy.
+
+    Every playout gets its own seed, drawn from a `random.Random` seeded
+    with `rollout_seed`, or from the `random` module if that is None, so
+    that the results don't depend on which worker plays which game. The
+    pool is kept for later searches; `shutdown_rollout_pools()` ends it.
+    The game has to be a module, or picklable, and the playouts are
+    played by a `rollout_class` instance, so custom rollout policies go
+    into a module-level subclass of `RandomPlayouts`.
+    """
+    rollout_processes = None
+    rollout_seed = None
+    rollout_class = RandomPlayouts
+
+    def num_rollout_processes(self):
+        return self.rollout_processes or os.cpu_count() or 1
+
+    def rollout_pool(self):
+        game = self.game
+        if inspect.ismodule(game):
+            game = game.__name__
+        processes = self.num_rollout_processes()
+        key = (game, processes, self.rollout_class)
+        if key not in _rollout_pools:
+            _rollout_pools[key] = ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=_init_rollout_worker,
+                initargs=(game, self.rollout_class),
+            )
+        return _rollout_pools[key]
+
+    def evaluate_state_by_player(self, state):
+        players = self.game.players()
+        if self.game.game_winner(state) is not None:
+            return super().evaluate_state_by_player(state)
+        if not hasattr(self, 'rollout_rng'):
+            if self.rollout_seed is None:
+                self.rollout_rng = random
+            else:
+                self.rollout_rng = random.Random(self.rollout_seed)
+        seeds = [self.rollout_rng.getrandbits(64)
+                 for _ in range(self.mcts_width)]
+        pool = self.rollout_pool()
+        chunks = self.num_rollout_processes()
+        batches = [pool.submit(_run_playouts, state, seeds[idx::chunks])
+                   for idx in range(min(chunks, len(seeds)))]
+        valuation = {p: 0 for p in players}
+        for batch in batches:
+            for winner, count in batch.result().items():
+                if winner in players:
+                    valuation[winner] += count
+        return valuation
+
+
+class VectorizedMonteCarloBasedEvaluation(MonteCarloBasedEvaluation):
+    """
+    Like `MonteCarloBasedEvaluation`, but all `mcts_width` playouts of a
+    state are played at once, one ply at a time, as NumPy operations on
+    an array with one board per playout. This needs the game to provide
+    these functions, and otherwise falls back to one playout at a time:
+
+    * `state_to_array(state)` turns a state into a 1D array board,
+    * `batch_legal_moves(boards)` returns a boolean array with a row per
+      board and a column per move, which is True where the move is
+      legal for the player whose turn it is,
+    * `batch_make_move(boards, moves)` makes one move (a column index of
+      the former) on each board, and returns the boards, and
+    * `batch_game_winner(boards)` returns an array with the winner on
+      each board, or 0 if the game isn't over yet.
+
+    As the playouts all start from the same state, it is always the
+    same player's turn in all of them; Games with simultaneous moves
+    can't do this yet. The random moves come from a NumPy generator
+    seeded with `rollout_seed`; NumPy is only imported once it is
+    needed.
+    """
+    rollout_seed = None
+
+    def evaluate_state_by_player(self, state):
+        if not hasattr(self.game, 'batch_game_winner') or \
+           self.game.game_winner(state) is not None:
+            return super().evaluate_state_by_player(state)
+        import numpy as np
+        if not hasattr(self, 'playout_rng'):
+            self.playout_rng = np.random.default_rng(self.rollout_seed)
+        winners = self.batch_playout(state, self.mcts_width)
+        players = self.game.players()
+        counts = np.bincount(winners, minlength=max(players) + 1)
+        return {p: int(counts[p]) for p in players}
+
+    def batch_playout(self, state, count):
+        """
+        Returns an array with the winners of `count` random playouts.
+        """
+        import numpy as np
+        game = self.game
+        boards = np.tile(game.state_to_array(state), (count, 1))
+        winners = np.zeros(count, dtype=np.int64)
+        ongoing = np.arange(count)
+        while len(ongoing):
+            ongoing_boards = boards[ongoing]
+            legal = game.batch_legal_moves(ongoing_boards)
+            # The legal move with the highest random score
+            scores = self.playout_rng.random(legal.shape)
+            moves = np.argmax(np.where(legal, scores, -1.0), axis=1)
+            ongoing_boards = game.batch_make_move(ongoing_boards, moves)
+            boards[ongoing] = ongoing_boards
+            ongoing_winners = game.batch_game_winner(ongoing_boards)
+            winners[ongoing] = ongoing_winners
+            ongoing = ongoing[ongoing_winners == 0]
+        return winners
+
+
 # Action Evaluation (game theory)
     
 class Minimax:
@@ -443,6 +856,225 @@ class Minimax:
         return state_value, best_actions
 
 
+EXACT = 0  # The value is the node's minimax value.
+LOWER_BOUND = 1  # The minimax value is at least the value.
+UPPER_BOUND = 2  # The minimax value is at most the value.
+
+
+class AlphaBeta(Minimax):
+    """
+    Minimax with alpha-beta pruning: Once an action is known to be
+    worse than one that we can already take, or an opponent's answer
+    makes the whole state worse than an alternative higher up in the
+    tree, the remaining successors aren't searched. `alpha` is the value
+    that we can already guarantee ourselves, `beta` the one that the
+    opponent can hold us to.
+
+    Results are kept in the transposition table's `bounds`, with the
+    depth that they were searched to, and whether they are exact values
+    or bounds; A later search of the same state to at most that depth
+    can use them. The actions that were best in a previous search are
+    tried first, the others in the order of their successors' heuristic
+    values, which makes cutoffs happen early.
+    """
+    def alpha_beta(self, state, depth, alpha, beta):
+        state_hash = self.game.hash_state(state)
+        if state_hash not in self.value:  # The root
+            self.value[state_hash] = self.evaluate_state(state)
+        if self.game.game_winner(state) is not None:
+            return self.value[state_hash]
+
+        previous_best = []
+        if state_hash in self.bounds:
+            known_depth, known_value, bound, previous_best = self.bounds[state_hash]
+            if known_depth >= depth:
+                if bound == EXACT:
+                    return known_value
+                elif bound == LOWER_BOUND:
+                    alpha = max(alpha, known_value)
+                else:
+                    beta = min(beta, known_value)
+                if alpha >= beta:
+                    return known_value
+        if depth == 0:
+            return self.value[state_hash]
+
+        if state_hash not in self.children:
+            self.expand_state(state)
+        children = self.children[state_hash]
+        if not children:  # This state has been dropped from expansion.
+            return -math.inf
+
+        # Our actions, each with the successors that the opponents'
+        # answers to it lead to.
+        answers = defaultdict(list)
+        for successor_hash, actions in children:
+            answers[actions[self.player]].append(successor_hash)
+        for successor_hashes in answers.values():
+            successor_hashes.sort(key=lambda h: self.value[h])
+        ordered_actions = sorted(
+            answers,
+            key=lambda a: (a not in previous_best,
+                           -self.value[answers[a][0]]),
+        )
+
+        original_alpha = alpha
+        state_value = -math.inf
+        best_actions = []
+        for action in ordered_actions:
+            action_value = math.inf
+            action_beta = beta
+            exact = True
+            for successor_hash in answers[action]:
+                successor_value = self.alpha_beta(
+                    self.known_states[successor_hash],
+                    depth - 1,
+                    alpha,
+                    action_beta,
+                )
+                action_value = min(action_value, successor_value)
+                if action_value <= alpha:
+                    # Not better than what we have; Its actual value
+                    # may be even lower, unless it is a sure loss.
+                    exact = action_value == -math.inf
+                    break
+                action_beta = min(action_beta, action_value)
+            if action_value > state_value:
+                state_value = action_value
+                best_actions = [action]
+            elif action_value == state_value and exact:
+                best_actions.append(action)
+            alpha = max(alpha, state_value)
+            if alpha >= beta:
+                break  # The opponent won't let it come to this state.
+
+        if state_value <= original_alpha:
+            bound = UPPER_BOUND
+        elif state_value >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.bounds[state_hash] = (depth, state_value, bound, best_actions)
+        self.opinion[state_hash] = (state_value, best_actions)
+        return state_value
+
+
+class UCT(RandomPlayouts):
+    """
+    Monte Carlo Tree Search: Each iteration walks down the graph from
+    the root, choosing moves by their upper confidence bound (UCB1),
+
+        mean reward + exploration * sqrt(ln(visits of state) / visits of move),
+
+    which favors moves that have done well, and those that have been
+    tried little. Once it reaches a state that hasn't been visited
+    before, that state's game is played out (see `RandomPlayouts`), and
+    each player's reward, 1 for a win, 0 for a loss, and 0.5 each for a
+    draw, is added to the moves that led there. States are expanded on
+    their second visit.
+
+    Moves are chosen per player, each from their own statistics (which
+    is known as decoupled UCT), so that simultaneous moves in the dict
+    format of `AllCombinations` work as well as players taking turns.
+    The statistics are kept in the transposition table's `visits` and
+    `move_stats`. After the search, the root's opinion is the robust
+    child: The move of ours that was tried most often, valued by its
+    mean reward. Use with `MCTSExpansion`. As the values come from the
+    playouts, expanded states are not evaluated.
+    """
+    exploration = math.sqrt(2)
+    evaluates_successors = False
+
+    def mcts_iteration(self):
+        players = self.game.players()
+        state = self.current_state
+        state_hash = self.game.hash_state(state)
+        path = []  # (state hash, action)
+        on_path = set()
+        while True:
+            on_path.add(state_hash)
+            winner = self.game.game_winner(state)
+            if winner is not None:
+                break
+            if self.visits[state_hash] == 0:
+                winner = self.playout(state)
+                break
+            if state_hash not in self.children:
+                self.expand_state(state)
+            children = self.children[state_hash]
+            if not children:  # This state has been dropped from expansion.
+                winner = self.playout(state)
+                break
+            action = self.select_ucb_action(state_hash, children)
+            successor_hash, action = self.find_successor(children, action)
+            path.append((state_hash, action))
+            state_hash = successor_hash
+            state = self.known_states[state_hash]
+            if state_hash in on_path:  # Went in a circle
+                winner = self.playout(state)
+                break
+
+        if winner in players:
+            rewards = {player: 0.0 for player in players}
+            rewards[winner] = 1.0
+        else:
+            rewards = {player: 0.5 for player in players}
+        self.visits[state_hash] += 1
+        for state_hash, action in path:
+            self.visits[state_hash] += 1
+            stats = self.move_stats[state_hash]
+            for player, move in action.items():
+                move_stats = stats[player][move]
+                move_stats[0] += 1
+                move_stats[1] += rewards[player]
+
+    def select_ucb_action(self, state_hash, children):
+        if state_hash not in self.move_stats:
+            stats = defaultdict(dict)  # player -> move -> [visits, reward]
+            for _, action in children:
+                for player, move in action.items():
+                    stats[player].setdefault(move, [0, 0.0])
+            self.move_stats[state_hash] = stats
+        stats = self.move_stats[state_hash]
+        log_visits = math.log(self.visits[state_hash])
+        action = {}
+        for player, moves in stats.items():
+            untried = [move for move, (visits, _) in moves.items() if visits == 0]
+            if untried:
+                action[player] = random.choice(untried)
+                continue
+            action[player] = max(
+                moves,
+                key=lambda move: (
+                    moves[move][1] / moves[move][0] +
+                    self.exploration * math.sqrt(log_visits / moves[move][0])
+                ),
+            )
+        return action
+
+    def find_successor(self, children, action):
+        """
+        Returns the successor's hash, and the action that leads there.
+        """
+        for successor_hash, child_action in children:
+            if child_action == action:
+                return successor_hash, child_action
+        # The action expansion didn't offer this combination of moves, so
+        # another one is played, and credited.
+        return random.choice(children)
+
+    def update_mcts_opinion(self):
+        state_hash = self.game.hash_state(self.current_state)
+        if state_hash not in self.move_stats:
+            return
+        moves = self.move_stats[state_hash][self.player]
+        most_visits = max(visits for visits, _ in moves.values())
+        best_actions = [move for move, (visits, _) in moves.items()
+                        if visits == most_visits]
+        visits, reward = moves[best_actions[0]]
+        self.opinion[state_hash] = (reward / visits, best_actions)
+
+
 # Action selection
 
 class RandomChooser:
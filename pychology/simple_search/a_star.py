@@ -1,9 +1,73 @@
-import queue
+import time
+
+from pychology.simple_search.frontiers import IndexedHeap
 
 
 class NoPath(Exception):
-    def __init__(self, explored):
-        self.explored = explored
+    """
+    Raised when a search can't find a path. Instead of the searched
+    nodes themselves, it only carries statistics about the search:
+    `expanded` nodes were expanded, `generated` nodes were reached as
+    their neighbors, and at most `stored` nodes were held in memory at
+    once.
+    """
+    def __init__(self, expanded=0, generated=0, stored=0):
+        super().__init__(expanded, generated, stored)
+        self.expanded = expanded
+        self.generated = generated
+        self.stored = stored
+
+    def __str__(self):
+        return (
+            f"No path found; {self.expanded} nodes expanded, "
+            f"{self.generated} generated, {self.stored} stored."
+        )
+
+
+class SearchStatistics:
+    """
+    What a search did, and where it spent its time. Pass one to
+    `search()` to have it filled in; The numbers add up over all
+    searches that it is passed to.
+
+    * `expanded`: Nodes taken from the frontier and expanded.
+    * `generated`: Nodes reached for the first time.
+    * `improved`: Nodes already in the frontier that a cheaper way was
+      found to.
+    * `skipped`: Transitions that were dropped, as they led to an
+      explored node, or weren't cheaper than a known way to the node.
+    * `peak_frontier`: The most nodes that were in the frontier at once.
+    * `heuristic_calls`: How often the cost heuristic was called.
+    * `time_frontier`, `time_transitions`, `time_heuristic`: Seconds
+      spent in pushing to and popping from the frontier, in the
+      transition function, and in the heuristic; `time_total` is the
+      whole search, including the bookkeeping around these.
+    """
+    def __init__(self):
+        self.searches = 0
+        self.expanded = 0
+        self.generated = 0
+        self.improved = 0
+        self.skipped = 0
+        self.peak_frontier = 0
+        self.heuristic_calls = 0
+        self.time_frontier = 0.0
+        self.time_transitions = 0.0
+        self.time_heuristic = 0.0
+        self.time_total = 0.0
+
+    def __repr__(self):
+        return (
+            f"SearchStatistics(searches={self.searches}, "
+            f"expanded={self.expanded}, generated={self.generated}, "
+            f"improved={self.improved}, skipped={self.skipped}, "
+            f"peak_frontier={self.peak_frontier}, "
+            f"heuristic_calls={self.heuristic_calls}, "
+            f"time_frontier={self.time_frontier:.6f}, "
+            f"time_transitions={self.time_transitions:.6f}, "
+            f"time_heuristic={self.time_heuristic:.6f}, "
+            f"time_total={self.time_total:.6f})"
+        )
 
 
 def get_neighbors_and_costs(nav_graph):
@@ -16,33 +80,113 @@ def estimate_zero(node_a, node_b):
     return 0.0
 
 
-def search(transition_func, start, goal, cost_heuristic=estimate_zero):
-    frontier = queue.PriorityQueue()  # (total_cost, fixed_cost, node, from_node)
-    explored = {}  # node: (fixed_cost, from_node)
-    frontier.put((0, 0, start, None))  # Total cost, fixed cost, node
-    try:
-        while True:
-            total_cost, fixed_cost, node, from_node = frontier.get(block=False)
-            if node in explored:
-                if explored[node][0] > fixed_cost:
-                    explored[node] = (fixed_cost, from_node)
+def estimate_manhattan(node_a, node_b):
+    """
+    Grid distance for nodes that are coordinate tuples, and moves along
+    one axis at a time with a cost of 1. Integer-valued, and thus usable
+    with a `BucketQueue` frontier.
+    """
+    return sum(abs(a - b) for a, b in zip(node_a, node_b))
+
+
+def reconstruct_path(reached, node):
+    path = [node]
+    while True:
+        _, from_node = reached[node]
+        if from_node is None:
+            break
+        path.append(from_node)
+        node = from_node
+    return list(reversed(path))
+
+
+def search(transition_func, start, goal, cost_heuristic=estimate_zero,
+           frontier=IndexedHeap, statistics=None, on_expand=None):
+    """
+    Returns `(cost, path)`, or raises `NoPath`. With a `SearchStatistics`
+    as `statistics`, it is filled in, and `on_expand(node, fixed_cost)`
+    is called for each node as it is expanded. Without either, the
+    search runs without any of the bookkeeping.
+    """
+    if statistics is not None or on_expand is not None:
+        return _traced_search(transition_func, start, goal, cost_heuristic,
+                              frontier, statistics, on_expand)
+    frontier = frontier()  # node -> total cost
+    reached = {start: (0, None)}  # node: (fixed_cost, from_node)
+    explored = set()
+    frontier.push(start, 0)
+    while frontier:
+        node, _ = frontier.pop()
+        fixed_cost, _ = reached[node]
+        if node == goal:  # Search succeeded
+            return fixed_cost, reconstruct_path(reached, node)
+        explored.add(node)
+
+        for next_node, transition_cost in transition_func(node):
+            if next_node in explored:
                 continue
-            explored[node] = (fixed_cost, from_node)
+            next_fixed_cost = fixed_cost + transition_cost
+            if next_node in reached and reached[next_node][0] <= next_fixed_cost:
+                continue  # We already know a way there that isn't worse.
+            reached[next_node] = (next_fixed_cost, node)
+            next_total_cost = next_fixed_cost + cost_heuristic(next_node, goal)
+            frontier.push(next_node, next_total_cost)
+    raise NoPath(len(explored), len(reached), len(reached))
+
+
+def _traced_search(transition_func, start, goal, cost_heuristic, frontier,
+                   statistics, on_expand):
+    # `search()`, with statistics and the expansion hook. Kept apart, so
+    # that searches without them don't pay for them.
+    if statistics is None:
+        statistics = SearchStatistics()
+    clock = time.perf_counter
+    search_started = clock()
+    statistics.searches += 1
+    frontier = frontier()  # node -> total cost
+    reached = {start: (0, None)}  # node: (fixed_cost, from_node)
+    explored = set()
+    frontier.push(start, 0)
+    statistics.generated += 1
+    statistics.peak_frontier = max(statistics.peak_frontier, 1)
+    try:
+        while frontier:
+            started = clock()
+            node, _ = frontier.pop()
+            statistics.time_frontier += clock() - started
+            fixed_cost, _ = reached[node]
             if node == goal:  # Search succeeded
-                path = [node]
-                while True:
-                    _, from_node = explored[node]
-                    if from_node is None:
-                        break
-                    path.append(from_node)
-                    node = from_node
-                return fixed_cost, list(reversed(path))
-
-            for next_node, transition_cost in transition_func(node):
+                return fixed_cost, reconstruct_path(reached, node)
+            explored.add(node)
+            statistics.expanded += 1
+            if on_expand is not None:
+                on_expand(node, fixed_cost)
+
+            started = clock()
+            transitions = list(transition_func(node))
+            statistics.time_transitions += clock() - started
+            for next_node, transition_cost in transitions:
                 if next_node in explored:
+                    statistics.skipped += 1
                     continue
                 next_fixed_cost = fixed_cost + transition_cost
-                next_total_cost = next_fixed_cost + cost_heuristic(next_node, goal)
-                frontier.put((next_total_cost, next_fixed_cost, next_node, node))
-    except queue.Empty:
-        raise NoPath(list(explored.keys()))
+                if next_node in reached:
+                    if reached[next_node][0] <= next_fixed_cost:
+                        statistics.skipped += 1
+                        continue  # We already know a way there that isn't worse.
+                    statistics.improved += 1
+                else:
+                    statistics.generated += 1
+                reached[next_node] = (next_fixed_cost, node)
+                started = clock()
+                estimate = cost_heuristic(next_node, goal)
+                pushing = clock()
+                statistics.time_heuristic += pushing - started
+                statistics.heuristic_calls += 1
+                frontier.push(next_node, next_fixed_cost + estimate)
+                statistics.time_frontier += clock() - pushing
+            if len(frontier) > statistics.peak_frontier:
+                statistics.peak_frontier = len(frontier)
+        raise NoPath(len(explored), len(reached), len(reached))
+    finally:
+        statistics.time_total += clock() - search_started
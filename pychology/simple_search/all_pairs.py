@@ -0,0 +1,144 @@
+"""
+All-pairs shortest paths for small nav graphs.
+
+For a nav graph of a few hundred nodes, the shortest paths between all
+pairs of nodes can be computed once, when the level is loaded, and then
+every query is a table lookup. `AllPairsTable` holds two matrices:
+
+* `distance[a, b]`, the cost of the shortest path from `a` to `b`
+  (infinite if there is none), as 64 bit floats, and
+* `next_hop[a, b]`, the node to move to from `a` to get to `b`, as the
+  smallest integer type that can hold the node indices.
+
+With integer costs, the distances are the same as `a_star.search`
+finds. Other costs are added up in a different order, so they may differ
+in the last bits.
+
+Memory grows with the square of the number of nodes, so for large
+graphs, use landmarks, flow fields or contraction hierarchies instead.
+
+The nav graph is in the dict-of-dicts format, `{node: {neighbor:
+cost}}`; For `make_nav_graph`, that is `nav_graph['cost']`.
+"""
+import pickle
+
+import numpy as np
+
+from pychology.simple_search.a_star import NoPath
+
+
+FILE_FORMAT_VERSION = 1
+NO_NEXT_HOP = -1
+
+
+def _index_dtype(num_nodes):
+    for dtype in (np.int8, np.int16, np.int32):
+        if num_nodes <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class AllPairsTable:
+    def __init__(self, nodes, distance, next_hop):
+        """
+        Use `build_all_pairs` to create the tables.
+        """
+        self.nodes = nodes
+        self.index = {node: idx for idx, node in enumerate(nodes)}
+        self.distance = distance
+        self.next_hop = next_hop
+
+    def cost(self, start, goal):
+        """
+        The cost of the shortest path; Infinite if there is none.
+        """
+        return float(self.distance[self.index[start], self.index[goal]])
+
+    def next_node(self, start, goal):
+        """
+        The node to move to from `start` on the way to `goal`; `None` if
+        `start` is the goal. Raises `NoPath` if the goal can't be
+        reached.
+        """
+        if start == goal:
+            return None
+        next_idx = self.next_hop[self.index[start], self.index[goal]]
+        if next_idx == NO_NEXT_HOP:
+            raise NoPath()
+        return self.nodes[next_idx]
+
+    def search(self, start, goal):
+        """
+        Returns `(cost, path)` like `a_star.search`, or raises `NoPath`.
+        """
+        idx = self.index[start]
+        goal_idx = self.index[goal]
+        cost = self.distance[idx, goal_idx]
+        if cost == np.inf:
+            raise NoPath()
+        next_hop = self.next_hop
+        path = [start]
+        while idx != goal_idx:
+            idx = int(next_hop[idx, goal_idx])
+            path.append(self.nodes[idx])
+        return float(cost), path
+
+    def save(self, filename):
+        data = dict(
+            version=FILE_FORMAT_VERSION,
+            nodes=self.nodes,
+            distance=self.distance,
+            next_hop=self.next_hop,
+        )
+        with open(filename, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        As the file is a pickle, only load files that you trust.
+        """
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != FILE_FORMAT_VERSION:
+            raise ValueError(
+                f"All-pairs file {filename} has version {data.get('version')}, "
+                f"expected {FILE_FORMAT_VERSION}."
+            )
+        return cls(data['nodes'], data['distance'], data['next_hop'])
+
+
+def build_all_pairs(nav_graph):
+    """
+    Computes the tables with the Floyd-Warshall algorithm, vectorized
+    over one node at a time, in O(n^3) time and O(n^2) memory.
+    """
+    nodes = list(nav_graph)
+    index = {node: idx for idx, node in enumerate(nodes)}
+    num_nodes = len(nodes)
+    distance = np.full((num_nodes, num_nodes), np.inf)
+    next_hop = np.full((num_nodes, num_nodes), NO_NEXT_HOP, dtype=np.int64)
+    for node, neighbors in nav_graph.items():
+        idx = index[node]
+        for neighbor, cost in neighbors.items():
+            neighbor_idx = index[neighbor]
+            if cost < distance[idx, neighbor_idx]:
+                distance[idx, neighbor_idx] = cost
+                next_hop[idx, neighbor_idx] = neighbor_idx
+    diagonal = np.arange(num_nodes)
+    distance[diagonal, diagonal] = 0.0
+    next_hop[diagonal, diagonal] = diagonal
+
+    for via in range(num_nodes):
+        # Paths from anywhere to anywhere through `via`
+        through = distance[:, via, np.newaxis] + distance[np.newaxis, via, :]
+        shorter = through < distance
+        np.copyto(distance, through, where=shorter)
+        np.copyto(next_hop, np.broadcast_to(next_hop[:, via, np.newaxis], shorter.shape),
+                  where=shorter)
+
+    return AllPairsTable(
+        nodes,
+        distance,
+        next_hop.astype(_index_dtype(num_nodes)),
+    )
@@ -0,0 +1,128 @@
+"""
+Resumable and anytime A*.
+
+`ResumableSearch` does the work of `a_star.search` in slices; Each call
+to `step()` expands at most a given number of nodes, or runs for at most
+a given time, and the next call continues where the last one stopped.
+This keeps long searches from stalling a frame.
+
+With a `weight` above 1, it becomes Anytime Repairing A* (ARA*): The
+heuristic is inflated by the weight, which finds a path quickly whose
+cost is at most `weight` times the optimal one. Then the weight is
+lowered step by step, and each time, the search repairs its previous
+result instead of starting over, until at a weight of 1 the path is
+optimal. Whenever `step()` returns, the best path found so far is
+available.
+"""
+import time
+
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.a_star import estimate_zero
+from pychology.simple_search.a_star import reconstruct_path
+from pychology.simple_search.frontiers import IndexedHeap
+
+
+class ResumableSearch:
+    def __init__(self, transition_func, start, goal,
+                 cost_heuristic=estimate_zero, weight=1.0, weight_step=0.5):
+        self.transition_func = transition_func
+        self.start = start
+        self.goal = goal
+        self.cost_heuristic = cost_heuristic
+        self.weight = weight
+        self.weight_step = weight_step
+        self.reached = {start: (0, None)}  # node: (fixed_cost, from_node)
+        self.frontier = IndexedHeap()
+        self.frontier.push(start, self._priority(start, 0))
+        self.closed = set()
+        self.inconsistent = set()  # Closed nodes that have gotten cheaper
+        self.solution = None  # (cost, path)
+        self.done = False
+        self.expansions = 0
+
+    def _priority(self, node, fixed_cost):
+        return fixed_cost + self.weight * self.cost_heuristic(node, self.goal)
+
+    def _improvement_finished(self):
+        if self.goal in self.reached:
+            if not self.frontier:
+                return True
+            return self.reached[self.goal][0] <= self.frontier.peek()[1]
+        if not self.frontier:
+            self.done = True
+            raise NoPath(self.expansions, len(self.reached), len(self.reached))
+        return False
+
+    def _publish_solution(self):
+        # Nodes on the way to the goal may have gotten cheaper since the
+        # goal was last reached, so the path's cost is added up anew.
+        path = reconstruct_path(self.reached, self.goal)
+        cost = 0
+        for node, next_node in zip(path, path[1:]):
+            cost += min(transition_cost
+                        for successor, transition_cost in self.transition_func(node)
+                        if successor == next_node)
+        if self.solution is None or cost < self.solution[0]:
+            self.solution = (cost, path)
+
+    def _lower_weight(self):
+        self.weight = max(1.0, self.weight - self.weight_step)
+        open_nodes = [node for _, node in self.frontier.heap] + list(self.inconsistent)
+        self.frontier = IndexedHeap()
+        for node in open_nodes:
+            self.frontier.push(node, self._priority(node, self.reached[node][0]))
+        self.closed = set()
+        self.inconsistent = set()
+
+    def _expand(self):
+        node, _ = self.frontier.pop()
+        self.closed.add(node)
+        self.expansions += 1
+        fixed_cost = self.reached[node][0]
+        for next_node, transition_cost in self.transition_func(node):
+            next_fixed_cost = fixed_cost + transition_cost
+            if next_node in self.reached and self.reached[next_node][0] <= next_fixed_cost:
+                continue
+            self.reached[next_node] = (next_fixed_cost, node)
+            if next_node in self.closed:
+                self.inconsistent.add(next_node)
+            else:
+                self.frontier.push(
+                    next_node,
+                    self._priority(next_node, next_fixed_cost),
+                )
+
+    def step(self, max_expansions=None, max_time=None):
+        """
+        Searches until `max_expansions` nodes have been expanded, or
+        `max_time` seconds have passed, or the optimal path has been
+        found. Returns the best `(cost, path)` found so far, or `None`
+        if there is none yet. Raises `NoPath` once it is clear that the
+        goal can't be reached. Check `done` to see whether the returned
+        path is optimal.
+        """
+        if max_time is not None:
+            deadline = time.perf_counter() + max_time
+        expansions = 0
+        while not self.done:
+            if self._improvement_finished():
+                self._publish_solution()
+                if self.weight <= 1.0:
+                    self.done = True
+                else:
+                    self._lower_weight()
+                continue
+            if max_expansions is not None and expansions >= max_expansions:
+                break
+            if max_time is not None and time.perf_counter() >= deadline:
+                break
+            self._expand()
+            expansions += 1
+        return self.solution
+
+    def run(self):
+        """
+        Searches to the end, and returns `(cost, path)` like
+        `a_star.search`.
+        """
+        return self.step()
@@ -0,0 +1,84 @@
+"""
+Bidirectional A*: One search runs forward from the start, another one
+backwards from the goal, and the path is found where they meet.
+
+To keep the heuristic consistent for both searches, they use the average
+of the forward and backward estimates as their common potential:
+
+    p(node) = (cost_heuristic(node, goal) - cost_heuristic(start, node)) / 2
+
+The forward search orders its frontier by `g_forward(node) + p(node)`,
+the backward one by `g_backward(node) - p(node)`. When the sum of both
+frontiers' lowest priorities reaches the cost of the best path found so
+far, no better path can exist, and the search stops.
+"""
+import math
+
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.a_star import estimate_zero
+from pychology.simple_search.a_star import reconstruct_path
+from pychology.simple_search.frontiers import IndexedHeap
+
+
+def bidirectional_search(transition_func, start, goal,
+                         cost_heuristic=estimate_zero,
+                         reverse_transition_func=None,
+                         frontier=IndexedHeap):
+    """
+    `reverse_transition_func(node)` returns `(predecessor, cost)` pairs
+    for the edges leading into `node`. For undirected graphs, it is the
+    same as `transition_func`, which is also the default.
+    """
+    if reverse_transition_func is None:
+        reverse_transition_func = transition_func
+
+    def potential(node):
+        return (cost_heuristic(node, goal) - cost_heuristic(start, node)) / 2
+
+    if start == goal:
+        return 0, [start]
+
+    forward = (transition_func, frontier(), {start: (0, None)}, set(), 1)
+    backward = (reverse_transition_func, frontier(), {goal: (0, None)}, set(), -1)
+    forward[1].push(start, potential(start))
+    backward[1].push(goal, -potential(goal))
+    best_cost = math.inf
+    meeting_node = None
+
+    while forward[1] and backward[1]:
+        if forward[1].peek()[1] + backward[1].peek()[1] >= best_cost:
+            break  # Neither side can find a cheaper connection anymore.
+        # Expand on the side with the smaller frontier.
+        if len(forward[1]) <= len(backward[1]):
+            this_side, other_side = forward, backward
+        else:
+            this_side, other_side = backward, forward
+        transitions, open_nodes, reached, explored, sign = this_side
+        other_reached = other_side[2]
+
+        node, _ = open_nodes.pop()
+        fixed_cost, _ = reached[node]
+        explored.add(node)
+        for next_node, transition_cost in transitions(node):
+            if next_node in explored:
+                continue
+            next_fixed_cost = fixed_cost + transition_cost
+            if next_node in reached and reached[next_node][0] <= next_fixed_cost:
+                continue
+            reached[next_node] = (next_fixed_cost, node)
+            open_nodes.push(next_node, next_fixed_cost + sign * potential(next_node))
+            if next_node in other_reached:
+                path_cost = next_fixed_cost + other_reached[next_node][0]
+                if path_cost < best_cost:
+                    best_cost = path_cost
+                    meeting_node = next_node
+
+    if meeting_node is None:
+        raise NoPath(
+            len(forward[3]) + len(backward[3]),
+            len(forward[2]) + len(backward[2]),
+            len(forward[2]) + len(backward[2]),
+        )
+    path = reconstruct_path(forward[2], meeting_node)
+    path += list(reversed(reconstruct_path(backward[2], meeting_node)))[1:]
+    return best_cost, path
@@ -0,0 +1,212 @@
+"""
+Contraction hierarchies for static nav graphs.
+
+During preprocessing, the nodes are contracted one by one, least
+important first. Contracting a node removes it from the remaining
+graph, and wherever a shortest path ran through it, a shortcut edge is
+added that bypasses it. Each node ends up with a rank (the order of its
+contraction), and a shortest path between any two nodes can then be
+found by a bidirectional search that only ever follows edges to nodes of
+higher rank. That search touches only a small fraction of the graph, so
+for graphs that don't change, like the navmesh graphs built by
+`make_nav_graph`, a lot of queries can be answered per frame.
+
+Shortcuts remember the node that they bypass, so found paths are
+unpacked into the sequence of original nodes.
+
+The nav graph is in the dict-of-dicts format, `{node: {neighbor:
+cost}}`; For `make_nav_graph`, that is `nav_graph['cost']`.
+"""
+import math
+import heapq
+
+from pychology.simple_search.a_star import NoPath
+
+
+class ContractionHierarchy:
+    def __init__(self, nav_graph, witness_settle_limit=50):
+        """
+        `witness_settle_limit` caps the searches that check whether a
+        shortcut is needed. Lower values speed up preprocessing, but may
+        add superfluous shortcuts, which slow down queries a bit.
+        """
+        self.nodes = list(nav_graph)
+        self.index = {node: idx for idx, node in enumerate(self.nodes)}
+        self.witness_settle_limit = witness_settle_limit
+        num_nodes = len(self.nodes)
+        # Edges including shortcuts; node index: {node index: cost}
+        self.out_edges = [{} for _ in range(num_nodes)]
+        self.in_edges = [{} for _ in range(num_nodes)]
+        self.middle = {}  # (from index, to index): bypassed node index
+        for node, neighbors in nav_graph.items():
+            idx = self.index[node]
+            for neighbor, cost in neighbors.items():
+                neighbor_idx = self.index[neighbor]
+                if neighbor_idx != idx:
+                    self._add_edge(idx, neighbor_idx, cost)
+        self._contract_all()
+        rank = self.rank
+        self.upward = [
+            [(other, cost) for other, cost in edges.items() if rank[other] > rank[idx]]
+            for idx, edges in enumerate(self.out_edges)
+        ]
+        self.downward = [  # Reversed edges from higher ranks
+            [(other, cost) for other, cost in edges.items() if rank[other] > rank[idx]]
+            for idx, edges in enumerate(self.in_edges)
+        ]
+
+    ### Preprocessing
+
+    def _add_edge(self, from_idx, to_idx, cost, middle=None):
+        if cost < self.out_edges[from_idx].get(to_idx, math.inf):
+            self.out_edges[from_idx][to_idx] = cost
+            self.in_edges[to_idx][from_idx] = cost
+            if middle is None:
+                self.middle.pop((from_idx, to_idx), None)
+            else:
+                self.middle[(from_idx, to_idx)] = middle
+
+    def _witness_search(self, source, excluded, limit):
+        # Dijkstra over the uncontracted nodes, avoiding `excluded`. The
+        # found distances are upper bounds on the shortest ones.
+        contracted = self.contracted
+        distances = {source: 0}
+        heap = [(0, source)]
+        settled = 0
+        while heap and settled < self.witness_settle_limit:
+            cost, idx = heapq.heappop(heap)
+            if cost > limit:
+                break
+            if cost > distances[idx]:
+                continue
+            settled += 1
+            for other, edge_cost in self.out_edges[idx].items():
+                if other == excluded or contracted[other]:
+                    continue
+                other_cost = cost + edge_cost
+                if other_cost < distances.get(other, math.inf):
+                    distances[other] = other_cost
+                    heapq.heappush(heap, (other_cost, other))
+        return distances
+
+    def _shortcuts(self, idx):
+        contracted = self.contracted
+        incoming = [(other, cost) for other, cost in self.in_edges[idx].items()
+                    if not contracted[other]]
+        outgoing = [(other, cost) for other, cost in self.out_edges[idx].items()
+                    if not contracted[other]]
+        shortcuts = []
+        if not outgoing:
+            return shortcuts, incoming, outgoing
+        max_outgoing = max(cost for _, cost in outgoing)
+        for from_idx, from_cost in incoming:
+            witnesses = self._witness_search(from_idx, idx, from_cost + max_outgoing)
+            for to_idx, to_cost in outgoing:
+                if to_idx == from_idx:
+                    continue
+                cost = from_cost + to_cost
+                if witnesses.get(to_idx, math.inf) > cost:
+                    shortcuts.append((from_idx, to_idx, cost))
+        return shortcuts, incoming, outgoing
+
+    def _priority(self, idx):
+        # Edge difference, plus the number of already contracted
+        # neighbors to spread contractions evenly over the graph.
+        shortcuts, incoming, outgoing = self._shortcuts(idx)
+        return (len(shortcuts) - len(incoming) - len(outgoing)
+                + self.contracted_neighbors[idx])
+
+    def _contract_all(self):
+        num_nodes = len(self.nodes)
+        self.contracted = [False] * num_nodes
+        self.contracted_neighbors = [0] * num_nodes
+        self.rank = [0] * num_nodes
+        heap = [(self._priority(idx), idx) for idx in range(num_nodes)]
+        heapq.heapify(heap)
+        next_rank = 0
+        while heap:
+            _, idx = heapq.heappop(heap)
+            # Priorities go stale as neighbors get contracted, so they
+            # are updated lazily.
+            priority = self._priority(idx)
+            if heap and priority > heap[0][0]:
+                heapq.heappush(heap, (priority, idx))
+                continue
+            shortcuts, incoming, outgoing = self._shortcuts(idx)
+            for from_idx, to_idx, cost in shortcuts:
+                self._add_edge(from_idx, to_idx, cost, middle=idx)
+            self.contracted[idx] = True
+            self.rank[idx] = next_rank
+            next_rank += 1
+            for other, _ in incoming + outgoing:
+                self.contracted_neighbors[other] += 1
+
+    ### Queries
+
+    def _unpack(self, from_idx, to_idx):
+        # Replaces shortcuts by the edges that they bypass; Returns the
+        # nodes after from_idx.
+        path = []
+        stack = [(from_idx, to_idx)]
+        while stack:
+            edge = stack.pop()
+            if edge in self.middle:
+                middle = self.middle[edge]
+                stack.append((middle, edge[1]))
+                stack.append((edge[0], middle))
+            else:
+                path.append(edge[1])
+        return path
+
+    def search(self, start, goal):
+        """
+        Returns `(cost, path)` like `a_star.search`, with the path
+        consisting of the nav graph's nodes, or raises `NoPath`.
+        """
+        start_idx = self.index[start]
+        goal_idx = self.index[goal]
+        if start_idx == goal_idx:
+            return 0, [start]
+        sides = [
+            (self.upward, {start_idx: 0}, {start_idx: None}, [(0, start_idx)]),
+            (self.downward, {goal_idx: 0}, {goal_idx: None}, [(0, goal_idx)]),
+        ]
+        best_cost = math.inf
+        meeting_idx = None
+        while True:
+            active = False
+            for side_idx, (edges, distances, parents, heap) in enumerate(sides):
+                if not heap or heap[0][0] >= best_cost:
+                    continue
+                active = True
+                cost, idx = heapq.heappop(heap)
+                if cost > distances[idx]:
+                    continue
+                other_distances = sides[1 - side_idx][1]
+                if idx in other_distances:
+                    if cost + other_distances[idx] < best_cost:
+                        best_cost = cost + other_distances[idx]
+                        meeting_idx = idx
+                for other, edge_cost in edges[idx]:
+                    other_cost = cost + edge_cost
+                    if other_cost < distances.get(other, math.inf):
+                        distances[other] = other_cost
+                        parents[other] = idx
+                        heapq.heappush(heap, (other_cost, other))
+            if not active:
+                break
+
+        if meeting_idx is None:
+            reached = len(sides[0][1]) + len(sides[1][1])
+            raise NoPath(generated=reached, stored=reached)
+        forward_parents = sides[0][2]
+        backward_parents = sides[1][2]
+        hops = [meeting_idx]
+        while forward_parents[hops[0]] is not None:
+            hops.insert(0, forward_parents[hops[0]])
+        while backward_parents[hops[-1]] is not None:
+            hops.append(backward_parents[hops[-1]])
+        path = [start_idx]
+        for from_idx, to_idx in zip(hops, hops[1:]):
+            path.extend(self._unpack(from_idx, to_idx))
+        return best_cost, [self.nodes[idx] for idx in path]
@@ -0,0 +1,294 @@
+"""
+Nav graphs in compressed sparse row (CSR) form.
+
+Instead of a dict per node, the edges of all nodes are stored in flat
+NumPy arrays: The edges of node `n` are at the positions from
+`offsets[n]` to `offsets[n + 1]` of `targets` (the neighbors' indices)
+and `costs`. Nodes are the integers from 0 to `num_nodes - 1`, and may
+have a position each in `centers`.
+
+Graphs with other nodes, like the dict-of-dicts nav graphs used by
+`a_star.search`, are converted with `CSRGraph.from_nav_graph`, which
+numbers the nodes, and keeps the original ones as labels.
+
+A `CSRGraph` can be saved to a binary file, and loaded from it as
+memory-mapped arrays, so that loading takes no time even for large
+graphs, and the operating system only reads the parts that are used.
+
+`CSRSearch` is A* specialized for `CSRGraph`s. It keeps its per-node
+bookkeeping in lists that are allocated once and reused by all queries,
+so a query allocates little more than its frontier and its result.
+"""
+import math
+import heapq
+import struct
+
+import numpy as np
+
+from pychology.simple_search.a_star import NoPath
+
+
+FILE_MAGIC = b'PYCHCSR\0'
+FILE_FORMAT_VERSION = 2  # 2: Costs are 64 bit floats.
+_HEADER = struct.Struct('<8sIIQQ16s')  # magic, version, flags, nodes, edges, digest
+_HEADER_SIZE = 64
+_HAS_CENTERS = 1
+
+
+def _aligned(position):
+    return (position + 7) // 8 * 8
+
+
+class CSRGraph:
+    def __init__(self, offsets, targets, costs, centers=None, source_digest=b'',
+                 nodes=None):
+        """
+        `source_digest` is up to 16 bytes that identify what the graph
+        was built from, so that a cached graph can be checked against
+        its source. `nodes` are optional labels for the nodes, in index
+        order; They are not saved to files.
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.targets = np.asarray(targets, dtype=np.int32)
+        # 64 bits, so that costs add up exactly as they do in Python.
+        self.costs = np.asarray(costs, dtype=np.float64)
+        if centers is not None:
+            centers = np.asarray(centers, dtype=np.float32).reshape(-1, 3)
+        self.centers = centers
+        self.source_digest = bytes(source_digest)[:16]
+        if len(self.offsets) == 0 or self.offsets[-1] != len(self.targets):
+            raise ValueError("offsets don't match the number of edges.")
+        if len(self.targets) != len(self.costs):
+            raise ValueError("targets and costs differ in length.")
+        if centers is not None and len(centers) != self.num_nodes:
+            raise ValueError("There must be one center per node.")
+        self.nodes = nodes
+        self.index = None
+        if nodes is not None:
+            if len(nodes) != self.num_nodes:
+                raise ValueError("There must be one label per node.")
+            self.index = {node: idx for idx, node in enumerate(nodes)}
+
+    @classmethod
+    def from_nav_graph(cls, nav_graph, centers=None):
+        """
+        Converts a dict-of-dicts nav graph, `{node: {neighbor: cost}}`.
+        `centers`, if given, maps nodes to their positions.
+        """
+        nodes = list(nav_graph)
+        index = {node: idx for idx, node in enumerate(nodes)}
+        offsets = [0]
+        targets = []
+        costs = []
+        for node in nodes:
+            for neighbor, cost in nav_graph[node].items():
+                targets.append(index[neighbor])
+                costs.append(cost)
+            offsets.append(len(targets))
+        if centers is not None:
+            centers = [tuple(centers[node]) for node in nodes]
+        return cls(offsets, targets, costs, centers, nodes=nodes)
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    def neighbors(self, node):
+        return self.targets[self.offsets[node]:self.offsets[node + 1]]
+
+    def transitions(self, node):
+        """
+        `(neighbor, cost)` pairs; Usable as the `transition_func` of
+        `a_star.search`.
+        """
+        start, end = self.offsets[node], self.offsets[node + 1]
+        return zip(self.targets[start:end].tolist(), self.costs[start:end].tolist())
+
+    def to_nav_graph(self):
+        """
+        The graph in dict-of-dicts form, `{node: {neighbor: cost}}`.
+        """
+        targets = self.targets.tolist()
+        costs = self.costs.tolist()
+        offsets = self.offsets.tolist()
+        nodes = self.nodes if self.nodes is not None else range(self.num_nodes)
+        return {
+            nodes[idx]: {
+                nodes[target]: cost
+                for target, cost in zip(targets[offsets[idx]:offsets[idx + 1]],
+                                        costs[offsets[idx]:offsets[idx + 1]])
+            }
+            for idx in range(self.num_nodes)
+        }
+
+    def save(self, filename):
+        flags = _HAS_CENTERS if self.centers is not None else 0
+        header = _HEADER.pack(
+            FILE_MAGIC,
+            FILE_FORMAT_VERSION,
+            flags,
+            self.num_nodes,
+            self.num_edges,
+            self.source_digest.ljust(16, b'\0'),
+        )
+        sections = [self.offsets, self.targets, self.costs]
+        if self.centers is not None:
+            sections.append(self.centers)
+        with open(filename, 'wb') as f:
+            f.write(header.ljust(_HEADER_SIZE, b'\0'))
+            for section in sections:
+                f.write(b'\0' * (_aligned(f.tell()) - f.tell()))
+                f.write(np.ascontiguousarray(section).tobytes())
+
+    @classmethod
+    def load(cls, filename, mmap=True):
+        """
+        With `mmap`, the arrays are read-only views on the file.
+        """
+        with open(filename, 'rb') as f:
+            header = f.read(_HEADER_SIZE)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"{filename} is not a CSR graph file.")
+        magic, version, flags, num_nodes, num_edges, digest = _HEADER.unpack_from(header)
+        if magic != FILE_MAGIC:
+            raise ValueError(f"{filename} is not a CSR graph file.")
+        if version != FILE_FORMAT_VERSION:
+            raise ValueError(
+                f"CSR graph file {filename} has version {version}, "
+                f"expected {FILE_FORMAT_VERSION}."
+            )
+        layout = [(np.int64, num_nodes + 1), (np.int32, num_edges), (np.float64, num_edges)]
+        if flags & _HAS_CENTERS:
+            layout.append((np.float32, num_nodes * 3))
+        arrays = []
+        position = _HEADER_SIZE
+        for dtype, count in layout:
+            position = _aligned(position)
+            if count == 0:
+                arrays.append(np.zeros(0, dtype=dtype))
+            elif mmap:
+                arrays.append(np.memmap(filename, dtype=dtype, mode='r',
+                                        offset=position, shape=(count, )))
+            else:
+                arrays.append(np.fromfile(filename, dtype=dtype, count=count,
+                                          offset=position))
+            position += count * np.dtype(dtype).itemsize
+        centers = arrays[3].reshape(-1, 3) if flags & _HAS_CENTERS else None
+        return cls(arrays[0], arrays[1], arrays[2], centers,
+                   source_digest=digest.rstrip(b'\0'))
+
+
+def euclidean_heuristic(graph):
+    """
+    Straight-line distance between the centers of two nodes, by index,
+    for `CSRSearch`. It is shrunk by a hair, as the centers are rounded
+    to 32 bit floats, and it might otherwise be a bit more than the
+    costs.
+    """
+    centers = graph.centers.astype(np.float64).tolist()
+    shrink = 1.0 - 1e-6
+
+    def estimate(idx_a, idx_b):
+        a = centers[idx_a]
+        b = centers[idx_b]
+        return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 +
+                         (a[2] - b[2]) ** 2) * shrink
+    return estimate
+
+
+class CSRSearch:
+    """
+    A* on a `CSRGraph`. The `cost_heuristic`, if any, is called with
+    node indices. One instance can answer any number of queries, but
+    not several at once.
+    """
+    def __init__(self, graph, cost_heuristic=None):
+        self.graph = graph
+        self.cost_heuristic = cost_heuristic
+        # Python lists, as they are faster to index than NumPy arrays.
+        self.offsets = graph.offsets.tolist()
+        self.targets = graph.targets.tolist()
+        self.costs = graph.costs.tolist()
+        num_nodes = graph.num_nodes
+        self.fixed_cost = [0.0] * num_nodes
+        self.parent = [-1] * num_nodes
+        # Instead of clearing the lists for each query, entries are
+        # marked with the number of the query that they belong to.
+        self.reached = [0] * num_nodes
+        self.closed = [0] * num_nodes
+        self.query = 0
+        self.frontier = []
+
+    def search_indices(self, start, goal):
+        """
+        Like `a_star.search`, but with node indices.
+        """
+        self.query += 1
+        query = self.query
+        offsets = self.offsets
+        targets = self.targets
+        costs = self.costs
+        fixed_cost = self.fixed_cost
+        parent = self.parent
+        reached = self.reached
+        closed = self.closed
+        heuristic = self.cost_heuristic
+        frontier = self.frontier
+        frontier.clear()
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        fixed_cost[start] = 0.0
+        parent[start] = -1
+        reached[start] = query
+        frontier.append((0.0, start))
+        expanded = 0
+        generated = 1
+        while frontier:
+            _, node = heappop(frontier)
+            if closed[node] == query:
+                continue  # Stale entry
+            if node == goal:
+                path = [node]
+                while parent[node] != -1:
+                    node = parent[node]
+                    path.append(node)
+                path.reverse()
+                return fixed_cost[goal], path
+            closed[node] = query
+            expanded += 1
+            node_cost = fixed_cost[node]
+            for edge in range(offsets[node], offsets[node + 1]):
+                next_node = targets[edge]
+                if closed[next_node] == query:
+                    continue
+                next_cost = node_cost + costs[edge]
+                if reached[next_node] == query:
+                    if fixed_cost[next_node] <= next_cost:
+                        continue
+                else:
+                    reached[next_node] = query
+                    generated += 1
+                fixed_cost[next_node] = next_cost
+                parent[next_node] = node
+                if heuristic is None:
+                    heappush(frontier, (next_cost, next_node))
+                else:
+                    heappush(frontier, (next_cost + heuristic(next_node, goal), next_node))
+        raise NoPath(expanded, generated, generated)
+
+    def search(self, start, goal):
+        """
+        Like `a_star.search`; If the graph has node labels, `start`,
+        `goal` and the path consist of them.
+        """
+        index = self.graph.index
+        if index is None:
+            return self.search_indices(start, goal)
+        cost, path = self.search_indices(index[start], index[goal])
+        nodes = self.graph.nodes
+        return cost, [nodes[idx] for idx in path]
@@ -0,0 +1,155 @@
+"""
+Flow fields: Many agents, one goal.
+
+Instead of one search per agent, a single Dijkstra search runs backwards
+from the goal over the whole nav graph. For every node, it yields the
+distance to the goal and the next node to move to, so each agent's path
+is just a series of table lookups.
+
+Nodes are mapped to integer indices, and the tables are NumPy arrays
+indexed by them. A `FlowFieldCache` keeps the fields for recently used
+goals, and drops them when the nav graph changes.
+"""
+import math
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+
+from pychology.simple_search.a_star import NoPath
+
+
+NO_NEXT_HOP = -1
+
+
+class NodeIndex:
+    """
+    Maps the nodes of a dict-of-dicts nav graph to integer indices, and
+    holds the graph's reversed edges in index form.
+    """
+    def __init__(self, nav_graph):
+        self.nodes = list(nav_graph)
+        for neighbors in nav_graph.values():
+            for neighbor in neighbors:
+                if neighbor not in nav_graph:
+                    raise KeyError(f"Edge to {neighbor}, which is not in the graph.")
+        self.index = {node: idx for idx, node in enumerate(self.nodes)}
+        self.incoming = [[] for _ in self.nodes]  # [(from index, cost)]
+        # With integer costs, the distances are returned as integers,
+        # like `a_star.search` would.
+        self.integer_costs = True
+        for node, neighbors in nav_graph.items():
+            node_idx = self.index[node]
+            for neighbor, cost in neighbors.items():
+                self.incoming[self.index[neighbor]].append((node_idx, cost))
+                if not isinstance(cost, int):
+                    self.integer_costs = False
+
+    def __len__(self):
+        return len(self.nodes)
+
+
+class FlowField:
+    def __init__(self, node_index, goal):
+        self.node_index = node_index
+        self.goal = goal
+        num_nodes = len(node_index)
+        self.distance = np.full(num_nodes, np.inf, dtype=np.float64)
+        self.next_hop = np.full(num_nodes, NO_NEXT_HOP, dtype=np.int32)
+        self._compute()
+
+    def _compute(self):
+        # Reverse Dijkstra; The heap is used with lazy deletion, and the
+        # tables are filled from Python lists at the end, as element-wise
+        # NumPy access is slow.
+        incoming = self.node_index.incoming
+        goal_idx = self.node_index.index[self.goal]
+        distance = [float('inf')] * len(self.node_index)
+        next_hop = [NO_NEXT_HOP] * len(self.node_index)
+        distance[goal_idx] = 0.0
+        heap = [(0.0, goal_idx)]
+        while heap:
+            cost, idx = heapq.heappop(heap)
+            if cost > distance[idx]:
+                continue
+            for from_idx, edge_cost in incoming[idx]:
+                from_cost = cost + edge_cost
+                if from_cost < distance[from_idx]:
+                    distance[from_idx] = from_cost
+                    next_hop[from_idx] = idx
+                    heapq.heappush(heap, (from_cost, from_idx))
+        self.distance[:] = distance
+        self.next_hop[:] = next_hop
+
+    def _cost(self, distance):
+        if self.node_index.integer_costs:
+            return int(distance)
+        return float(distance)
+
+    def cost(self, node):
+        distance = self.distance[self.node_index.index[node]]
+        if distance == np.inf:
+            return math.inf
+        return self._cost(distance)
+
+    def next_node(self, node):
+        """
+        The node to move to from `node`; `None` at the goal. Raises
+        `NoPath` if the goal can't be reached.
+        """
+        idx = self.node_index.index[node]
+        next_idx = self.next_hop[idx]
+        if next_idx == NO_NEXT_HOP:
+            if node == self.goal:
+                return None
+            raise NoPath()
+        return self.node_index.nodes[next_idx]
+
+    def search(self, start):
+        """
+        Returns `(cost, path)` from `start` to the goal, like
+        `a_star.search`.
+        """
+        nodes = self.node_index.nodes
+        next_hop = self.next_hop
+        idx = self.node_index.index[start]
+        cost = self.distance[idx]
+        if cost == np.inf:
+            raise NoPath()
+        path = [idx]
+        while next_hop[idx] != NO_NEXT_HOP:
+            idx = next_hop[idx]
+            path.append(idx)
+        return self._cost(cost), [nodes[idx] for idx in path]
+
+
+class FlowFieldCache:
+    """
+    Flow fields for a nav graph, by goal. At most `max_fields` are kept;
+    The least recently used one is dropped first. After changing the nav
+    graph, call `graph_changed()`.
+    """
+    def __init__(self, nav_graph, max_fields=16):
+        self.nav_graph = nav_graph
+        self.max_fields = max_fields
+        self.node_index = None
+        self.fields = OrderedDict()  # goal: FlowField
+
+    def graph_changed(self):
+        self.node_index = None
+        self.fields.clear()
+
+    def field(self, goal):
+        if goal in self.fields:
+            self.fields.move_to_end(goal)
+            return self.fields[goal]
+        if self.node_index is None:
+            self.node_index = NodeIndex(self.nav_graph)
+        field = FlowField(self.node_index, goal)
+        self.fields[goal] = field
+        if len(self.fields) > self.max_fields:
+            self.fields.popitem(last=False)
+        return field
+
+    def search(self, start, goal):
+        return self.field(goal).search(start)
@@ -0,0 +1,205 @@
+"""
+Frontiers (open lists) for the searches in `pychology.simple_search`.
+
+A frontier holds the nodes that have been reached but not yet expanded,
+each with a priority. Unlike `queue.PriorityQueue`, the frontiers here
+do not lock, and each node is held at most once; Pushing a node that is
+already in the frontier with a better priority replaces the old entry
+(decrease-key) instead of adding a stale duplicate.
+
+All frontiers share the same interface:
+
+* `push(node, priority)` adds the node, or lowers its priority if it is
+  already in the frontier with a higher one. Returns whether the
+  frontier was changed.
+* `pop()` removes the node with the lowest priority and returns it as
+  `(node, priority)`. Raises `IndexError` if the frontier is empty.
+* `peek()` is like `pop()`, but leaves the node in the frontier.
+* `remove(node)` drops the node from the frontier.
+* `priority(node)` returns the node's current priority.
+* `len(frontier)` and `node in frontier` work as expected.
+"""
+
+
+class IndexedHeap:
+    """
+    Binary min-heap with a position index, so that the priority of a node
+    in it can be changed in place. Priorities can be anything comparable,
+    e.g. numbers or tuples; Nodes are never compared with each other.
+    """
+    def __init__(self):
+        self.heap = []  # [(priority, node)]
+        self.position = {}  # node: index into heap
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, node):
+        return node in self.position
+
+    def priority(self, node):
+        return self.heap[self.position[node]][0]
+
+    def push(self, node, priority):
+        if node in self.position:
+            idx = self.position[node]
+            if not priority < self.heap[idx][0]:
+                return False
+            self.heap[idx] = (priority, node)
+            self._sift_up(idx)
+            return True
+        self.heap.append((priority, node))
+        self.position[node] = len(self.heap) - 1
+        self._sift_up(len(self.heap) - 1)
+        return True
+
+    def update(self, node, priority):
+        """
+        Set the node's priority, whether it is better or worse than the
+        current one, adding the node if necessary.
+        """
+        if node not in self.position:
+            self.push(node, priority)
+            return
+        idx = self.position[node]
+        old_priority = self.heap[idx][0]
+        self.heap[idx] = (priority, node)
+        if priority < old_priority:
+            self._sift_up(idx)
+        else:
+            self._sift_down(idx)
+
+    def peek(self):
+        priority, node = self.heap[0]
+        return node, priority
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()  # Raises IndexError if empty.
+        if heap:
+            priority, node = heap[0]
+            heap[0] = last
+            self.position[last[1]] = 0
+            self._sift_down(0)
+        else:
+            priority, node = last
+        del self.position[node]
+        return node, priority
+
+    def remove(self, node):
+        idx = self.position.pop(node)
+        heap = self.heap
+        last = heap.pop()
+        if idx == len(heap):  # Removed the last element
+            return
+        old_priority = heap[idx][0]
+        heap[idx] = last
+        self.position[last[1]] = idx
+        if last[0] < old_priority:
+            self._sift_up(idx)
+        else:
+            self._sift_down(idx)
+
+    def _sift_up(self, idx):
+        # Move the hole upwards until the entry fits in, then place it.
+        heap = self.heap
+        position = self.position
+        entry = heap[idx]
+        priority = entry[0]
+        while idx > 0:
+            parent_idx = (idx - 1) >> 1
+            parent = heap[parent_idx]
+            if not priority < parent[0]:
+                break
+            heap[idx] = parent
+            position[parent[1]] = idx
+            idx = parent_idx
+        heap[idx] = entry
+        position[entry[1]] = idx
+
+    def _sift_down(self, idx):
+        heap = self.heap
+        position = self.position
+        size = len(heap)
+        entry = heap[idx]
+        priority = entry[0]
+        child_idx = 2 * idx + 1
+        while child_idx < size:
+            right_idx = child_idx + 1
+            if right_idx < size and heap[right_idx][0] < heap[child_idx][0]:
+                child_idx = right_idx
+            child = heap[child_idx]
+            if not child[0] < priority:
+                break
+            heap[idx] = child
+            position[child[1]] = idx
+            idx = child_idx
+            child_idx = 2 * idx + 1
+        heap[idx] = entry
+        position[entry[1]] = idx
+
+
+class BucketQueue:
+    """
+    Monotone bucket queue for integer priorities, e.g. A* on grids with
+    integer step costs and an integer heuristic like the Manhattan
+    distance. Pushing and popping are O(1) as long as the priorities that
+    are popped grow in small steps, which they do for consistent
+    heuristics. Non-integer priorities are truncated to their bucket, so
+    the order within a bucket is arbitrary (last in, first out).
+    """
+    def __init__(self):
+        self.buckets = {}  # int priority: {node: None}
+        self.priorities = {}  # node: priority
+        self.lowest = 0  # No non-empty bucket below this one.
+
+    def __len__(self):
+        return len(self.priorities)
+
+    def __contains__(self, node):
+        return node in self.priorities
+
+    def priority(self, node):
+        return self.priorities[node]
+
+    def push(self, node, priority):
+        if node in self.priorities:
+            old_priority = self.priorities[node]
+            if not priority < old_priority:
+                return False
+            del self.buckets[int(old_priority)][node]
+        bucket_idx = int(priority)
+        if bucket_idx not in self.buckets:
+            self.buckets[bucket_idx] = {}
+        self.buckets[bucket_idx][node] = None
+        self.priorities[node] = priority
+        if bucket_idx < self.lowest or len(self.priorities) == 1:
+            self.lowest = bucket_idx
+        return True
+
+    def update(self, node, priority):
+        if node in self.priorities:
+            self.remove(node)
+        self.push(node, priority)
+
+    def _lowest_bucket(self):
+        if not self.priorities:
+            raise IndexError("pop from empty frontier")
+        buckets = self.buckets
+        while not buckets.get(self.lowest):
+            buckets.pop(self.lowest, None)
+            self.lowest += 1
+        return buckets[self.lowest]
+
+    def peek(self):
+        bucket = self._lowest_bucket()
+        node = next(reversed(bucket))
+        return node, self.priorities[node]
+
+    def pop(self):
+        node, _ = self._lowest_bucket().popitem()
+        return node, self.priorities.pop(node)
+
+    def remove(self, node):
+        priority = self.priorities.pop(node)
+        del self.buckets[int(priority)][node]
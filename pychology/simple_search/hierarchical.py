@@ -0,0 +1,256 @@
+"""
+Hierarchical pathfinding (HPA*) on dict-of-dicts nav graphs.
+
+The nav graph is split into clusters by a function that maps each node
+to a cluster ID. Wherever two clusters touch, each stretch of connected
+border edges (an entrance) is represented by one of its edges; The
+nodes at its ends are the cluster's entrance nodes. Once, at creation
+time, the distances between the entrance nodes of each cluster are
+precomputed, which yields an abstract graph that is much smaller than
+the nav graph.
+
+A query connects start and goal to the entrance nodes of their clusters
+and searches the abstract graph. The resulting abstract path can then
+be refined into nav graph nodes one segment at a time, each segment
+being a short search within a single cluster, so that an agent can
+start moving before the full path is known.
+
+Paths are near-optimal; They only leave and enter clusters through the
+chosen entrances.
+"""
+from collections import defaultdict
+
+from pychology.simple_search.a_star import estimate_zero
+from pychology.simple_search.a_star import search
+from pychology.simple_search.frontiers import IndexedHeap
+
+
+def grid_clusters(size):
+    """
+    Clusters for grids with `(row, column)` nodes, e.g. those built by
+    `create_adjacency_from_string`, as squares with `size` long sides.
+    """
+    def cluster_of(node):
+        row, column = node
+        return (row // size, column // size)
+    return cluster_of
+
+
+class HierarchicalPlanner:
+    def __init__(self, nav_graph, cluster_of, cost_heuristic=estimate_zero):
+        self.nav_graph = nav_graph
+        self.cluster_of = cluster_of
+        self.cost_heuristic = cost_heuristic
+        self.members = defaultdict(set)  # cluster: {node}
+        for node in nav_graph:
+            self.members[cluster_of(node)].add(node)
+        self.borders = {}  # frozenset of two clusters: [(node, node)]
+        self.entrances = defaultdict(set)  # cluster: {node}
+        self.distances = {}  # entrance node: {node: cost within cluster}
+        self.inter_edges = defaultdict(dict)  # node: {node: cost}
+        self.intra_edges = defaultdict(dict)  # node: {node: cost}
+        for cluster in self.members:
+            for other_cluster, edges in self._border_edges(cluster).items():
+                border = frozenset((cluster, other_cluster))
+                if border not in self.borders:
+                    self._set_border(border, edges)
+        for cluster in self.members:
+            self._collect_entrances(cluster)
+            self._update_distances(cluster)
+
+    ### Building the abstraction
+
+    def _border_edges(self, cluster):
+        # Returns {other_cluster: {(node_here, node_there)}} for all
+        # edges between this cluster and others, in either direction.
+        cluster_of = self.cluster_of
+        edges = defaultdict(set)
+        for node in self.members[cluster]:
+            for neighbor in self.nav_graph[node]:
+                other_cluster = cluster_of(neighbor)
+                if other_cluster != cluster:
+                    edges[other_cluster].add((node, neighbor))
+        for other_cluster in list(edges):
+            for node in self.members[other_cluster]:
+                for neighbor in self.nav_graph[node]:
+                    if cluster_of(neighbor) == cluster:
+                        edges[other_cluster].add((neighbor, node))
+        return edges
+
+    def _adjacent(self, node_a, node_b):
+        return node_b in self.nav_graph[node_a] or node_a in self.nav_graph[node_b]
+
+    def _pick_entrances(self, edges):
+        # Groups the border edges into stretches of edges lying side by
+        # side, and picks the edge in the middle of each stretch.
+        edges = set(edges)
+
+        def touching(edge):
+            return [other for other in edges
+                    if other != edge
+                    and self._adjacent(edge[0], other[0])
+                    and self._adjacent(edge[1], other[1])]
+
+        def ordered_by_distance(first):
+            order = [first]
+            seen = {first}
+            for edge in order:
+                for other in touching(edge):
+                    if other not in seen:
+                        seen.add(other)
+                        order.append(other)
+            return order
+
+        entrances = []
+        while edges:
+            stretch = ordered_by_distance(next(iter(edges)))
+            stretch = ordered_by_distance(stretch[-1])  # From one end on
+            entrances.append(stretch[len(stretch) // 2])
+            edges -= set(stretch)
+        return entrances
+
+    def _set_border(self, border, edges):
+        entrances = self._pick_entrances(edges)
+        self.borders[border] = entrances
+        for node_a, node_b in entrances:
+            for node_from, node_to in [(node_a, node_b), (node_b, node_a)]:
+                if node_to in self.nav_graph[node_from]:
+                    cost = self.nav_graph[node_from][node_to]
+                    self.inter_edges[node_from][node_to] = cost
+
+    def _collect_entrances(self, cluster):
+        # Returns whether the cluster's entrance nodes have changed.
+        entrances = set()
+        for border, pairs in self.borders.items():
+            if cluster in border:
+                for node_a, node_b in pairs:
+                    for node in (node_a, node_b):
+                        if self.cluster_of(node) == cluster:
+                            entrances.add(node)
+        changed = entrances != self.entrances[cluster]
+        self.entrances[cluster] = entrances
+        return changed
+
+    def _update_borders(self, cluster):
+        # Returns the clusters whose entrance nodes have changed.
+        touched = set()
+        for border in [b for b in self.borders if cluster in b]:
+            for node_a, node_b in self.borders.pop(border):
+                for node_from, node_to in [(node_a, node_b), (node_b, node_a)]:
+                    self.inter_edges[node_from].pop(node_to, None)
+            touched |= border
+        for other_cluster, edges in self._border_edges(cluster).items():
+            border = frozenset((cluster, other_cluster))
+            self._set_border(border, edges)
+            touched |= border
+        return set(c for c in touched if self._collect_entrances(c))
+
+    def _cluster_transitions(self, cluster):
+        members = self.members[cluster]
+        nav_graph = self.nav_graph
+
+        def inner(node):
+            return [(neighbor, cost)
+                    for neighbor, cost in nav_graph[node].items()
+                    if neighbor in members]
+        return inner
+
+    def _cluster_distances(self, source):
+        # Dijkstra from the source, restricted to its cluster.
+        transitions = self._cluster_transitions(self.cluster_of(source))
+        distances = {source: 0}
+        frontier = IndexedHeap()
+        frontier.push(source, 0)
+        while frontier:
+            node, cost = frontier.pop()
+            for neighbor, transition_cost in transitions(node):
+                next_cost = cost + transition_cost
+                if neighbor not in distances or next_cost < distances[neighbor]:
+                    distances[neighbor] = next_cost
+                    frontier.push(neighbor, next_cost)
+        return distances
+
+    def _update_distances(self, cluster):
+        entrances = self.entrances[cluster]
+        for node in list(self.distances):
+            if self.cluster_of(node) == cluster and node not in entrances:
+                del self.distances[node]
+                del self.intra_edges[node]
+        for entrance in entrances:
+            distances = self._cluster_distances(entrance)
+            self.distances[entrance] = distances
+            self.intra_edges[entrance] = {
+                other: distances[other]
+                for other in entrances
+                if other != entrance and other in distances
+            }
+
+    def update_cluster(self, cluster):
+        """
+        Call this after changing edges that start or end in the cluster.
+        Only this cluster's borders are recomputed, and the distances in
+        the clusters whose entrances have changed.
+        """
+        changed = self._update_borders(cluster) | {cluster}
+        for changed_cluster in changed:
+            self._update_distances(changed_cluster)
+
+    ### Queries
+
+    def abstract_search(self, start, goal):
+        """
+        Returns `(cost, abstract_path)`. The abstract path starts with
+        `start`, ends with `goal`, and has entrance nodes in between.
+        """
+        if start == goal:
+            return 0, [start]
+        start_cluster = self.cluster_of(start)
+        goal_cluster = self.cluster_of(goal)
+        start_distances = self._cluster_distances(start)
+        from_start = {entrance: start_distances[entrance]
+                      for entrance in self.entrances.get(start_cluster, ())
+                      if entrance in start_distances and entrance != start}
+        if start_cluster == goal_cluster and goal in start_distances:
+            from_start[goal] = start_distances[goal]
+        to_goal = {entrance: self.distances[entrance][goal]
+                   for entrance in self.entrances.get(goal_cluster, ())
+                   if goal in self.distances[entrance] and entrance != goal}
+
+        def transitions(node):
+            # Queries must not add entries to the abstraction.
+            edges = list(self.inter_edges.get(node, {}).items())
+            edges += self.intra_edges.get(node, {}).items()
+            if node == start:
+                edges += from_start.items()
+            if node in to_goal:
+                edges.append((goal, to_goal[node]))
+            return edges
+
+        return search(transitions, start, goal, self.cost_heuristic)
+
+    def refine(self, abstract_path):
+        """
+        Generator of the nav graph nodes along the abstract path. Each
+        segment is only searched for once the previous one is used up.
+        """
+        yield abstract_path[0]
+        for node, next_node in zip(abstract_path, abstract_path[1:]):
+            cluster = self.cluster_of(node)
+            if self.cluster_of(next_node) != cluster:
+                yield next_node  # Edge between clusters
+            else:
+                _, segment = search(
+                    self._cluster_transitions(cluster),
+                    node,
+                    next_node,
+                    self.cost_heuristic,
+                )
+                yield from segment[1:]
+
+    def search(self, start, goal):
+        """
+        Like `a_star.search`, returns `(cost, path)`, with the path fully
+        refined.
+        """
+        cost, abstract_path = self.abstract_search(start, goal)
+        return cost, list(self.refine(abstract_path))
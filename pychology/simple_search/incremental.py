@@ -0,0 +1,135 @@
+"""
+Incremental replanning with D* Lite.
+
+When edge costs change after a path has been found, searching again from
+scratch repeats most of the previous work. D* Lite searches backwards
+from the goal, and keeps its search state between queries. When it is
+told which edges have changed, only the nodes whose distance to the goal
+is affected by the change get reevaluated. The start may move, e.g. as
+an agent is walking along the path, without invalidating the state.
+
+The costs are read through the same `transition_func` as `a_star.search`
+uses, so for a dict-of-dicts nav graph, change the costs in the dicts,
+then tell the planner about the changed edges.
+"""
+import math
+
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.a_star import estimate_zero
+from pychology.simple_search.frontiers import IndexedHeap
+
+
+class DStarLite:
+    def __init__(self, transition_func, start, goal,
+                 cost_heuristic=estimate_zero, reverse_transition_func=None):
+        """
+        `reverse_transition_func(node)` returns `(predecessor, cost)`
+        pairs for the edges leading into `node`. For undirected graphs,
+        it is the same as `transition_func`, which is also the default.
+        """
+        if reverse_transition_func is None:
+            reverse_transition_func = transition_func
+        self.transition_func = transition_func
+        self.reverse_transition_func = reverse_transition_func
+        self.cost_heuristic = cost_heuristic
+        self.start = start
+        self.goal = goal
+        self.key_modifier = 0
+        self.distance = {}  # node: cost to goal, as of its last expansion
+        self.lookahead = {goal: 0}  # node: cost to goal via best successor
+        self.frontier = IndexedHeap()  # node: (primary key, secondary key)
+        self.frontier.push(goal, self._key(goal))
+        self.expansions = 0  # Expansions done by the last `search()`
+
+    def _key(self, node):
+        best = min(self.distance.get(node, math.inf),
+                   self.lookahead.get(node, math.inf))
+        return (best + self.cost_heuristic(self.start, node) + self.key_modifier,
+                best)
+
+    def _update_node(self, node):
+        if node != self.goal:
+            best = math.inf
+            distance = self.distance
+            for successor, cost in self.transition_func(node):
+                successor_distance = distance.get(successor, math.inf) + cost
+                if successor_distance < best:
+                    best = successor_distance
+            self.lookahead[node] = best
+        if node in self.frontier:
+            self.frontier.remove(node)
+        if self.distance.get(node, math.inf) != self.lookahead.get(node, math.inf):
+            self.frontier.push(node, self._key(node))
+
+    def _compute_shortest_path(self):
+        frontier = self.frontier
+        distance = self.distance
+        lookahead = self.lookahead
+        start = self.start
+        self.expansions = 0
+        while frontier:
+            node, old_key = frontier.peek()
+            start_lookahead = lookahead.get(start, math.inf)
+            if not (old_key < self._key(start) or
+                    start_lookahead != distance.get(start, math.inf)):
+                break
+            self.expansions += 1
+            new_key = self._key(node)
+            if old_key < new_key:
+                frontier.update(node, new_key)
+            elif distance.get(node, math.inf) > lookahead.get(node, math.inf):
+                # Overconsistent: The node got cheaper.
+                distance[node] = lookahead[node]
+                frontier.pop()
+                for predecessor, _ in self.reverse_transition_func(node):
+                    self._update_node(predecessor)
+            else:
+                # Underconsistent: The node got more expensive.
+                distance[node] = math.inf
+                self._update_node(node)
+                for predecessor, _ in self.reverse_transition_func(node):
+                    self._update_node(predecessor)
+
+    def search(self):
+        """
+        Returns `(cost, path)` from the current start to the goal, like
+        `a_star.search`, or raises `NoPath`.
+        """
+        self._compute_shortest_path()
+        cost = self.lookahead.get(self.start, math.inf)
+        if cost == math.inf:
+            raise NoPath(self.expansions, len(self.lookahead), len(self.lookahead))
+        path = [self.start]
+        visited = {self.start}
+        node = self.start
+        while node != self.goal:
+            best_node = None
+            best = math.inf
+            for successor, transition_cost in self.transition_func(node):
+                successor_cost = transition_cost + self.distance.get(successor, math.inf)
+                if successor_cost < best:
+                    best = successor_cost
+                    best_node = successor
+            if best_node is None or best_node in visited:
+                raise NoPath(self.expansions, len(self.lookahead), len(self.lookahead))
+            node = best_node
+            visited.add(node)
+            path.append(node)
+        return cost, path
+
+    def move_start(self, start):
+        """
+        Sets a new start, e.g. the next node on the path after the agent
+        has moved there.
+        """
+        self.key_modifier += self.cost_heuristic(self.start, start)
+        self.start = start
+
+    def edges_changed(self, edges):
+        """
+        Call this with `(from_node, to_node)` pairs for the edges whose
+        costs have changed (or that have been added or removed), after
+        the change has been made to the graph.
+        """
+        for from_node in set(from_node for from_node, _ in edges):
+            self._update_node(from_node)
@@ -0,0 +1,276 @@
+"""
+Jump Point Search (JPS) on uniform-cost grids.
+
+On a grid where every step costs the same, there are usually many paths
+of equal length between two cells, and A* expands the cells of all of
+them. JPS only expands "jump points", cells at which an optimal path may
+have to change direction because an obstacle forces it to, and skips
+over the cells in between by scanning along straight lines.
+
+Nodes are `(row, column)` tuples, the same as in the adjacency that
+`examples/a_star_on_text_labyrinth.py` builds from text levels, and paths
+are returned cell by cell, so that the result can be used just like that
+of `a_star.search`. Straight steps cost 1, diagonal ones `math.sqrt(2)`.
+Diagonal steps may not cut corners; Both cells that they pass between
+have to be passable.
+"""
+import math
+import time
+
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.frontiers import IndexedHeap
+
+
+SQRT_2 = math.sqrt(2)
+
+
+class OccupancyGrid:
+    """
+    A compact grid of passable and blocked cells. Internally, the grid is
+    surrounded by a border of blocked cells, so that the search never has
+    to check whether it ran off the map.
+    """
+    def __init__(self, rows, columns):
+        self.rows = rows
+        self.columns = columns
+        self.stride = columns + 2
+        self.cells = bytearray(self.stride * (rows + 2))  # 1 is passable
+
+    def index(self, node):
+        row, column = node
+        if not (0 <= row < self.rows and 0 <= column < self.columns):
+            raise IndexError(f"{node} is not on the grid.")
+        return (row + 1) * self.stride + column + 1
+
+    def node(self, index):
+        row, column = divmod(index, self.stride)
+        return (row - 1, column - 1)
+
+    def is_passable(self, node):
+        try:
+            return bool(self.cells[self.index(node)])
+        except IndexError:
+            return False
+
+    def set_passable(self, node, passable=True):
+        self.cells[self.index(node)] = 1 if passable else 0
+
+
+def grid_from_string(level, passable_tiles='.IO'):
+    """
+    Returns `(grid, start, goal)` for a text level in which the start is
+    marked with `I` and the goal with `O`.
+    """
+    lines = level.split('\n')
+    grid = OccupancyGrid(len(lines), max(len(line) for line in lines))
+    start = None
+    goal = None
+    for l_idx, line in enumerate(lines):
+        for t_idx, tile in enumerate(line):
+            if tile in passable_tiles:
+                grid.set_passable((l_idx, t_idx))
+            if tile == 'I':
+                start = (l_idx, t_idx)
+            elif tile == 'O':
+                goal = (l_idx, t_idx)
+    return grid, start, goal
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+def jump_point_search(grid, start, goal, diagonal=False, statistics=None):
+    """
+    With `statistics` (an `a_star.SearchStatistics`), the number of
+    searches, expanded and generated jump points, and the time taken
+    are added up in it.
+    """
+    if statistics is None:
+        return _jump_point_search(grid, start, goal, diagonal, None)
+    start_time = time.perf_counter()
+    counts = {}
+    try:
+        return _jump_point_search(grid, start, goal, diagonal, counts)
+    finally:
+        statistics.searches += 1
+        statistics.expanded += counts.get('expanded', 0)
+        statistics.generated += counts.get('generated', 0)
+        statistics.peak_frontier = max(statistics.peak_frontier,
+                                       counts.get('peak_frontier', 0))
+        statistics.time_total += time.perf_counter() - start_time
+
+
+def _jump_point_search(grid, start, goal, diagonal, counts):
+    cells = grid.cells
+    stride = grid.stride
+    start_idx = grid.index(start)
+    goal_idx = grid.index(goal)
+    if not (cells[start_idx] and cells[goal_idx]):
+        raise NoPath()
+    goal_row, goal_column = divmod(goal_idx, stride)
+    # The result of a straight scan only depends on the cells ahead of
+    # where it starts, so every cell that a scan passes gets the same
+    # result. Remembering them keeps the scans to the sides that
+    # diagonal (and, on 4-connected grids, vertical) jumps do at every
+    # cell from running over the same cells again and again.
+    jumps = {}  # (index, step): jump point or None
+
+    def jump_straight(idx, d_row, d_column):
+        # Moves along a row or column until a jump point is found (which
+        # is returned), or the way is blocked (None).
+        step = d_row * stride + d_column
+        if (idx, step) in jumps:
+            return jumps[idx, step]
+        side = stride if d_column else 1  # Offset to the cells to the side
+        scanned = [idx]
+        while True:
+            idx += step
+            if not cells[idx]:
+                result = None
+                break
+            if idx == goal_idx:
+                result = idx
+                break
+            behind = idx - step
+            if (cells[idx + side] and not cells[behind + side]) or \
+               (cells[idx - side] and not cells[behind - side]):
+                result = idx  # Forced neighbor
+                break
+            if not diagonal and d_row:
+                # On a 4-connected grid, vertical moves play the role
+                # that diagonal ones do on 8-connected grids; At every
+                # cell, we check for jump points to the sides.
+                if jump_straight(idx, 0, 1) is not None or \
+                   jump_straight(idx, 0, -1) is not None:
+                    result = idx
+                    break
+            if (idx, step) in jumps:
+                result = jumps[idx, step]
+                break
+            scanned.append(idx)
+        for scanned_idx in scanned:
+            jumps[scanned_idx, step] = result
+        return result
+
+    def jump_diagonal(idx, d_row, d_column):
+        step = d_row * stride + d_column
+        while True:
+            idx += step
+            if not cells[idx]:
+                return None
+            if idx == goal_idx:
+                return idx
+            if jump_straight(idx, 0, d_column) is not None or \
+               jump_straight(idx, d_row, 0) is not None:
+                return idx
+            if not (cells[idx + d_column] and cells[idx + d_row * stride]):
+                return None  # Can't cut the corner
+
+    def directions(idx, from_idx):
+        if from_idx is None:  # Start node; All directions are open.
+            candidates = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+            if diagonal:
+                candidates += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        else:
+            row, column = divmod(idx, stride)
+            from_row, from_column = divmod(from_idx, stride)
+            d_row = _sign(row - from_row)
+            d_column = _sign(column - from_column)
+            if d_row and d_column:
+                candidates = [(d_row, 0), (0, d_column), (d_row, d_column)]
+            elif diagonal:
+                # Straight move on an 8-connected grid: Continue, and
+                # where a side is open that was blocked next to the cell
+                # behind, turn to it and to the forward diagonal there;
+                # Other side cells are reached better by a diagonal from
+                # the cell behind.
+                candidates = [(d_row, d_column)]
+                behind = idx - d_row * stride - d_column
+                for side_row, side_column in [(d_column, d_row), (-d_column, -d_row)]:
+                    side = side_row * stride + side_column
+                    if cells[idx + side] and not cells[behind + side]:
+                        candidates.append((side_row, side_column))
+                        candidates.append((d_row + side_row, d_column + side_column))
+            elif d_row:
+                candidates = [(d_row, 0), (0, -1), (0, 1)]
+            else:
+                candidates = [(0, d_column)]
+                for side in (-1, 1):
+                    if cells[idx + side * stride] and \
+                       not cells[idx - d_column + side * stride]:
+                        candidates.append((side, 0))
+        for d_row, d_column in candidates:
+            if not cells[idx + d_row * stride + d_column]:
+                continue
+            if d_row and d_column and not (cells[idx + d_column] and
+                                           cells[idx + d_row * stride]):
+                continue
+            yield d_row, d_column
+
+    def heuristic(idx):
+        row, column = divmod(idx, stride)
+        d_row = abs(row - goal_row)
+        d_column = abs(column - goal_column)
+        if diagonal:
+            return max(d_row, d_column) + (SQRT_2 - 1) * min(d_row, d_column)
+        return d_row + d_column
+
+    def distance(idx_a, idx_b):
+        row_a, column_a = divmod(idx_a, stride)
+        row_b, column_b = divmod(idx_b, stride)
+        d_row = abs(row_a - row_b)
+        d_column = abs(column_a - column_b)
+        if d_row and d_column:  # Jumps are straight lines or diagonals.
+            return d_row * SQRT_2
+        return d_row + d_column
+
+    frontier = IndexedHeap()
+    reached = {start_idx: (0, None)}  # index: (fixed_cost, from_index)
+    explored = set()
+    frontier.push(start_idx, heuristic(start_idx))
+    peak_frontier = 1
+    while frontier:
+        peak_frontier = max(peak_frontier, len(frontier))
+        idx, _ = frontier.pop()
+        fixed_cost, from_idx = reached[idx]
+        if idx == goal_idx:
+            if counts is not None:
+                counts.update(expanded=len(explored), generated=len(reached),
+                              peak_frontier=peak_frontier)
+            return fixed_cost, _unpack_path(grid, reached, idx)
+        explored.add(idx)
+        for d_row, d_column in directions(idx, from_idx):
+            if d_row and d_column:
+                jump_idx = jump_diagonal(idx, d_row, d_column)
+            else:
+                jump_idx = jump_straight(idx, d_row, d_column)
+            if jump_idx is None or jump_idx in explored:
+                continue
+            next_fixed_cost = fixed_cost + distance(idx, jump_idx)
+            if jump_idx in reached and reached[jump_idx][0] <= next_fixed_cost:
+                continue
+            reached[jump_idx] = (next_fixed_cost, idx)
+            frontier.push(jump_idx, next_fixed_cost + heuristic(jump_idx))
+    if counts is not None:
+        counts.update(expanded=len(explored), generated=len(reached),
+                      peak_frontier=peak_frontier)
+    raise NoPath(len(explored), len(reached), len(reached))
+
+
+def _unpack_path(grid, reached, idx):
+    # Fill in the cells between the jump points.
+    stride = grid.stride
+    jump_points = [idx]
+    while reached[idx][1] is not None:
+        idx = reached[idx][1]
+        jump_points.append(idx)
+    jump_points.reverse()
+    path = [jump_points[0]]
+    for from_idx, to_idx in zip(jump_points, jump_points[1:]):
+        from_row, from_column = divmod(from_idx, stride)
+        to_row, to_column = divmod(to_idx, stride)
+        step = _sign(to_row - from_row) * stride + _sign(to_column - from_column)
+        while path[-1] != to_idx:
+            path.append(path[-1] + step)
+    return [grid.node(idx) for idx in path]
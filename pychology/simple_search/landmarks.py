@@ -0,0 +1,148 @@
+"""
+ALT (A*, Landmarks, Triangle inequality) heuristics for nav graphs.
+
+A few nodes are picked as landmarks, and the distances from each of
+them to every node, and from every node to each of them, are computed
+once. Because of the triangle inequality, for any landmark L,
+
+    distance(a, b) >= distance(L, b) - distance(L, a)
+    distance(a, b) >= distance(a, L) - distance(b, L)
+
+and the largest of these lower bounds is an admissible and consistent
+estimate for `a_star.search`. On maze-like graphs it is usually much
+tighter than the straight-line distance, as it knows about the walls.
+
+The distances are kept in flat `array('d')`s, and can be saved to and
+loaded from a file, so that they only have to be computed once per map.
+"""
+import math
+import pickle
+from array import array
+
+from pychology.simple_search.frontiers import IndexedHeap
+
+
+FILE_FORMAT_VERSION = 1
+
+
+def reverse_nav_graph(nav_graph):
+    reverse = {node: {} for node in nav_graph}
+    for node, neighbors in nav_graph.items():
+        for neighbor, cost in neighbors.items():
+            reverse.setdefault(neighbor, {})[node] = cost
+    return reverse
+
+
+def distances_from(nav_graph, source):
+    """
+    Dijkstra's algorithm; Returns `{node: cost}` for all nodes that can
+    be reached from the source.
+    """
+    distances = {source: 0.0}
+    frontier = IndexedHeap()
+    frontier.push(source, 0.0)
+    while frontier:
+        node, cost = frontier.pop()
+        for neighbor, transition_cost in nav_graph[node].items():
+            next_cost = cost + transition_cost
+            if neighbor not in distances or next_cost < distances[neighbor]:
+                distances[neighbor] = next_cost
+                frontier.push(neighbor, next_cost)
+    return distances
+
+
+class LandmarkHeuristic:
+    def __init__(self, nodes, landmarks, from_landmarks, to_landmarks):
+        """
+        `from_landmarks` and `to_landmarks` hold the distances from / to
+        each landmark, for each node, in the order of `nodes`, one
+        landmark after another. Use `build_landmarks` to create them.
+        """
+        self.nodes = nodes
+        self.index = {node: idx for idx, node in enumerate(nodes)}
+        self.landmarks = landmarks
+        self.from_landmarks = from_landmarks
+        self.to_landmarks = to_landmarks
+        self.offsets = [idx * len(nodes) for idx in range(len(landmarks))]
+
+    def __call__(self, node_a, node_b):
+        idx_a = self.index[node_a]
+        idx_b = self.index[node_b]
+        from_landmarks = self.from_landmarks
+        to_landmarks = self.to_landmarks
+        best = 0.0
+        # Where distances are infinite, the difference is either
+        # infinite (node_b can't be reached at all), negative infinite,
+        # or NaN, which fails the comparison; Either way, it's right.
+        for offset in self.offsets:
+            estimate = from_landmarks[offset + idx_b] - from_landmarks[offset + idx_a]
+            if estimate > best:
+                best = estimate
+            estimate = to_landmarks[offset + idx_a] - to_landmarks[offset + idx_b]
+            if estimate > best:
+                best = estimate
+        return best
+
+    def save(self, filename):
+        data = dict(
+            version=FILE_FORMAT_VERSION,
+            nodes=self.nodes,
+            landmarks=self.landmarks,
+            from_landmarks=self.from_landmarks,
+            to_landmarks=self.to_landmarks,
+        )
+        with open(filename, 'wb') as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, filename):
+        """
+        As the file is a pickle, only load files that you trust.
+        """
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
+        if data.get('version') != FILE_FORMAT_VERSION:
+            raise ValueError(
+                f"Landmark file {filename} has version {data.get('version')}, "
+                f"expected {FILE_FORMAT_VERSION}."
+            )
+        return cls(
+            data['nodes'],
+            data['landmarks'],
+            data['from_landmarks'],
+            data['to_landmarks'],
+        )
+
+
+def build_landmarks(nav_graph, num_landmarks, first_node=None):
+    """
+    Picks landmarks on a dict-of-dicts nav graph, and computes their
+    distance tables. The first landmark is the node farthest away from
+    `first_node` (by default, any node), each further one is the node
+    farthest away from all landmarks picked so far.
+    """
+    nodes = list(nav_graph)
+    reverse_graph = reverse_nav_graph(nav_graph)
+    if first_node is None:
+        first_node = nodes[0]
+    closest_landmark = distances_from(nav_graph, first_node)
+    landmarks = []
+    from_landmarks = array('d')
+    to_landmarks = array('d')
+    for _ in range(min(num_landmarks, len(nodes))):
+        # Unreachable nodes are the farthest away of all.
+        landmark = max(
+            (node for node in nodes if node not in landmarks),
+            key=lambda node: closest_landmark.get(node, math.inf),
+        )
+        landmarks.append(landmark)
+        from_landmark = distances_from(nav_graph, landmark)
+        to_landmark = distances_from(reverse_graph, landmark)
+        from_landmarks.extend(from_landmark.get(node, math.inf) for node in nodes)
+        to_landmarks.extend(to_landmark.get(node, math.inf) for node in nodes)
+        if len(landmarks) == 1:  # Forget the distances from first_node.
+            closest_landmark = {}
+        for node, cost in from_landmark.items():
+            if cost < closest_landmark.get(node, math.inf):
+                closest_landmark[node] = cost
+    return LandmarkHeuristic(nodes, landmarks, from_landmarks, to_landmarks)
@@ -0,0 +1,226 @@
+"""
+Memory-bounded search for state spaces too large to keep in memory.
+
+`a_star.search` remembers every node that it has reached. When the
+states are generated on the fly by `transition_func`, as in planning,
+there may be far too many of them for that.
+
+`ida_star` (Iterative Deepening A*) runs depth-first searches, each one
+cut off at nodes whose estimated total cost exceeds a bound. The first
+bound is the start's estimate; Each further one is the lowest estimate
+that the previous search cut off. Only the current path is kept in
+memory, but nodes get expanded again in every iteration, and nodes that
+can be reached on several paths are expanded once per path.
+
+`sma_star` (Simplified Memory-bounded A*) works like A* until it holds
+`node_limit` nodes. Then it forgets the leaves of its search tree that
+look worst, remembering in their parents how good they looked, so that
+they can be regenerated if all else turns out to be worse. It keeps as
+much of the search as fits into memory, and finds an optimal path if
+one fits into it.
+
+Both take the same arguments as `a_star.search`, and return
+`(cost, path)`, or raise `NoPath`, for which `stored` tells how much
+memory was used.
+"""
+import math
+import heapq
+import itertools
+
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.a_star import estimate_zero
+
+
+def ida_star(transition_func, start, goal, cost_heuristic=estimate_zero,
+             max_cost=math.inf):
+    """
+    Gives up once the bound exceeds `max_cost`; On infinite state spaces
+    without a path, it would run forever otherwise.
+    """
+    if start == goal:
+        return 0, [start]
+    bound = cost_heuristic(start, goal)
+    expanded = 0
+    generated = 1
+    stored = 1
+    while True:
+        next_bound = math.inf
+        path = [start]
+        on_path = {start}
+        fixed_costs = [0]
+        successors = [iter(transition_func(start))]
+        expanded += 1
+        while successors:
+            for next_node, transition_cost in successors[-1]:
+                if next_node in on_path:
+                    continue
+                generated += 1
+                next_fixed_cost = fixed_costs[-1] + transition_cost
+                next_total_cost = next_fixed_cost + cost_heuristic(next_node, goal)
+                if next_total_cost > bound:
+                    if next_total_cost < next_bound:
+                        next_bound = next_total_cost
+                    continue
+                if next_node == goal:
+                    return next_fixed_cost, path + [next_node]
+                path.append(next_node)
+                on_path.add(next_node)
+                fixed_costs.append(next_fixed_cost)
+                successors.append(iter(transition_func(next_node)))
+                expanded += 1
+                if len(path) > stored:
+                    stored = len(path)
+                break
+            else:  # All successors are done; Backtrack.
+                on_path.remove(path.pop())
+                fixed_costs.pop()
+                successors.pop()
+        if next_bound == math.inf or next_bound > max_cost:
+            raise NoPath(expanded, generated, stored)
+        bound = next_bound
+
+
+class _TreeNode:
+    __slots__ = ('state', 'fixed_cost', 'total_cost', 'forgotten',
+                 'forgotten_cost', 'parent', 'children', 'depth', 'in_memory')
+
+    def __init__(self, state, fixed_cost, total_cost, parent):
+        self.state = state
+        self.fixed_cost = fixed_cost
+        # For expanded nodes, backed up from the children.
+        self.total_cost = total_cost
+        # Children that are not in memory, {state: total cost}; `None`
+        # until the node gets expanded.
+        self.forgotten = None
+        # Lowest total cost of children that need to be generated.
+        self.forgotten_cost = total_cost
+        self.parent = parent
+        self.children = []
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.in_memory = True
+
+
+def sma_star(transition_func, start, goal, cost_heuristic=estimate_zero,
+             node_limit=10000):
+    """
+    `node_limit` is the number of nodes of the search tree that may be
+    kept in memory at once; As all children of a node are generated at
+    once, it may be exceeded by up to the branching factor in between.
+    If it is lower than the number of nodes on the path to the goal, no
+    path can be found, and finding that out can take very long.
+    """
+    if node_limit < 2:
+        raise ValueError("sma_star needs a node_limit of at least 2.")
+    counter = itertools.count()  # Tie breaker, as tree nodes don't compare
+    root = _TreeNode(start, 0, cost_heuristic(start, goal), None)
+    best = {start: root}  # state: tree node with the lowest fixed cost
+    in_memory = 1
+    expanded = 0
+    generated = 1
+    stored = 1
+    # Both heaps use lazy deletion; Entries are checked against their
+    # tree node when they are popped. Of the nodes that can generate
+    # children, the one with the lowest cost is expanded, the deepest
+    # one in case of ties; Of the leaves, the one with the highest cost
+    # is forgotten, the shallowest one in case of ties.
+    open_nodes = [(root.forgotten_cost, 0, next(counter), root)]
+    leaves = []
+
+    def push_open(node):
+        heapq.heappush(open_nodes,
+                       (node.forgotten_cost, -node.depth, next(counter), node))
+
+    def push_leaf(node):
+        heapq.heappush(leaves, (-node.total_cost, node.depth, next(counter), node))
+
+    def back_up(node):
+        while node is not None:
+            total_cost = min([child.total_cost for child in node.children],
+                             default=math.inf)
+            total_cost = min(total_cost, node.forgotten_cost)
+            if total_cost == node.total_cost:
+                break
+            node.total_cost = total_cost
+            if not node.children:
+                push_leaf(node)
+            node = node.parent
+
+    def forget_worst_leaf():
+        while leaves:
+            neg_total_cost, _, _, node = heapq.heappop(leaves)
+            if not node.in_memory or node.children or node is root or \
+               -neg_total_cost != node.total_cost:
+                continue
+            node.in_memory = False
+            if best.get(node.state) is node:
+                del best[node.state]
+            parent = node.parent
+            parent.children.remove(node)
+            # Dead ends are forgotten for good.
+            if node.total_cost < math.inf:
+                parent.forgotten[node.state] = node.total_cost
+                if node.total_cost < parent.forgotten_cost:
+                    parent.forgotten_cost = node.total_cost
+                    push_open(parent)
+            back_up(parent)
+            if not parent.children:
+                push_leaf(parent)
+            return True
+        return False
+
+    while open_nodes:
+        forgotten_cost, _, _, node = heapq.heappop(open_nodes)
+        if not node.in_memory or forgotten_cost != node.forgotten_cost:
+            continue
+        if forgotten_cost == math.inf:
+            break
+        if node.state == goal:
+            cost = node.fixed_cost
+            path = []
+            while node is not None:
+                path.append(node.state)
+                node = node.parent
+            return cost, list(reversed(path))
+
+        # Generate the children for the first time, or the forgotten
+        # ones again, with the costs that were backed up from them.
+        expanded += 1
+        forgotten = node.forgotten
+        node.forgotten = {}
+        node.forgotten_cost = math.inf
+        for next_state, transition_cost in transition_func(node.state):
+            if forgotten is None:
+                # The children of a node are at least as costly as it.
+                min_total_cost = forgotten_cost
+            elif next_state in forgotten:
+                min_total_cost = forgotten[next_state]
+            else:
+                continue
+            next_fixed_cost = node.fixed_cost + transition_cost
+            # Unless there's a path there that is at least as cheap and
+            # as short, this one is kept; A cheaper but longer one may be
+            # cut off by the node limit, where this one wouldn't be.
+            other = best.get(next_state)
+            if other is not None and other.fixed_cost <= next_fixed_cost and \
+               other.depth <= node.depth + 1:
+                continue
+            generated += 1
+            if next_state != goal and node.depth + 2 >= node_limit:
+                total_cost = math.inf  # Its children won't fit into memory.
+            else:
+                total_cost = max(min_total_cost,
+                                 next_fixed_cost + cost_heuristic(next_state, goal))
+            child = _TreeNode(next_state, next_fixed_cost, total_cost, node)
+            node.children.append(child)
+            if other is None or next_fixed_cost <= other.fixed_cost:
+                best[next_state] = child
+            in_memory += 1
+            push_open(child)
+            push_leaf(child)
+        back_up(node)
+        if not node.children:
+            push_leaf(node)
+        stored = max(stored, in_memory)
+        while in_memory > node_limit and forget_worst_leaf():
+            in_memory -= 1
+    raise NoPath(expanded, generated, stored)
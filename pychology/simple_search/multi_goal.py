@@ -0,0 +1,73 @@
+"""
+A* towards the nearest of several goals, like the closest health pack or
+cover point, in a single search instead of one search per goal.
+
+The heuristic is the minimum of `cost_heuristic(node, goal)` over all
+goals; If `cost_heuristic` is admissible (and consistent), so is that.
+The goals are settled in the order of their costs, so the first one is
+the nearest, and the search may go on for the k nearest ones. Goals that
+have already been found remain part of the heuristic, which keeps it
+consistent, at the price of being a bit less well-informed.
+"""
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.a_star import estimate_zero
+from pychology.simple_search.a_star import reconstruct_path
+from pychology.simple_search.frontiers import IndexedHeap
+
+
+def min_over_goals(cost_heuristic, goals):
+    """
+    The estimated cost from a node to the nearest of the `goals`.
+    """
+    goals = list(goals)
+
+    def estimate(node):
+        return min(cost_heuristic(node, goal) for goal in goals)
+    return estimate
+
+
+def nearest_goals(transition_func, start, goals, k=1,
+                  cost_heuristic=estimate_zero, frontier=IndexedHeap):
+    """
+    Returns a list of `(cost, path)` to the `k` nearest `goals`, nearest
+    first; Fewer if fewer of them can be reached. Raises `NoPath` if
+    none can.
+    """
+    goals = set(goals)
+    estimate = min_over_goals(cost_heuristic, goals)
+    frontier = frontier()  # node -> total cost
+    reached = {start: (0, None)}  # node: (fixed_cost, from_node)
+    explored = set()
+    found = []
+    frontier.push(start, 0)
+    while frontier:
+        node, _ = frontier.pop()
+        fixed_cost, _ = reached[node]
+        if node in goals:
+            found.append((fixed_cost, reconstruct_path(reached, node)))
+            if len(found) == k or len(found) == len(goals):
+                return found
+        explored.add(node)
+
+        for next_node, transition_cost in transition_func(node):
+            if next_node in explored:
+                continue
+            next_fixed_cost = fixed_cost + transition_cost
+            if next_node in reached and reached[next_node][0] <= next_fixed_cost:
+                continue  # We already know a way there that isn't worse.
+            reached[next_node] = (next_fixed_cost, node)
+            next_total_cost = next_fixed_cost + estimate(next_node)
+            frontier.push(next_node, next_total_cost)
+    if not found:
+        raise NoPath(len(explored), len(reached), len(reached))
+    return found
+
+
+def nearest_goal_search(transition_func, start, goals,
+                        cost_heuristic=estimate_zero, frontier=IndexedHeap):
+    """
+    Like `a_star.search`, but to whichever of the `goals` is nearest;
+    The path ends at that goal.
+    """
+    return nearest_goals(transition_func, start, goals, 1, cost_heuristic,
+                         frontier)[0]
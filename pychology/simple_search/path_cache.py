@@ -0,0 +1,161 @@
+"""
+A cache for path queries that get asked again and again.
+
+`PathCache` answers queries like `a_star.search`, and remembers the
+answers of the most recent ones. As every part of a shortest path is a
+shortest path itself, a cached path from A to B also answers the query
+from any node on it to B.
+
+When the graph changes, the cache has to be told. `edges_changed()`
+drops only the entries that may be affected: Those whose path uses one
+of the edges, and those that a cheaper edge might offer a shortcut to,
+as judged by their heuristic. `graph_changed()` drops everything. For
+that, each entry records the `graph_version` that it was computed on.
+"""
+from collections import OrderedDict
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import estimate_zero
+
+
+class _Entry:
+    __slots__ = ('path', 'costs', 'cost_heuristic', 'graph_version')
+
+    def __init__(self, path, costs, cost_heuristic, graph_version):
+        self.path = path
+        self.costs = costs  # Fixed costs along the path
+        self.cost_heuristic = cost_heuristic
+        self.graph_version = graph_version
+
+
+class PathCache:
+    def __init__(self, transition_func, max_entries=256, search_func=search):
+        """
+        `search_func` is called like `a_star.search` on cache misses.
+        """
+        self.transition_func = transition_func
+        self.max_entries = max_entries
+        self.search_func = search_func
+        self.entries = OrderedDict()  # (start, goal, cost_heuristic): _Entry
+        self.through = {}  # goal: {node on the path: key of the entry}
+        self.edge_users = {}  # (from_node, to_node): {keys of entries}
+        self.graph_version = 0
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+
+    def _edge_cost(self, from_node, to_node):
+        return min((cost for node, cost in self.transition_func(from_node)
+                    if node == to_node),
+                   default=float('inf'))
+
+    def _remove(self, key):
+        entry = self.entries.pop(key)
+        # Later entries to the same goal may have taken over all the
+        # nodes of this one, and have been removed already.
+        goal = key[1]
+        through = self.through.get(goal, {})
+        for node in entry.path:
+            if through.get(node) == key:
+                del through[node]
+        if not through:
+            self.through.pop(goal, None)
+        for edge in zip(entry.path, entry.path[1:]):
+            users = self.edge_users[edge]
+            users.discard(key)
+            if not users:
+                del self.edge_users[edge]
+
+    def lookup(self, start, goal, cost_heuristic=estimate_zero):
+        """
+        Returns the cached `(cost, path)`, or `None`.
+        """
+        key = (start, goal, cost_heuristic)
+        entry = self.entries.get(key)
+        if entry is not None and entry.graph_version != self.graph_version:
+            self._remove(key)
+            entry = None
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry.costs[-1], list(entry.path)
+        # Is there a cached path to the goal that passes the start?
+        key = self.through.get(goal, {}).get(start)
+        if key is not None:
+            entry = self.entries[key]
+            if entry.graph_version != self.graph_version:
+                self._remove(key)
+                return None
+            self.entries.move_to_end(key)
+            self.subpath_hits += 1
+            position = entry.path.index(start)
+            return (entry.costs[-1] - entry.costs[position],
+                    entry.path[position:])
+        return None
+
+    def add(self, start, goal, cost_heuristic, cost, path):
+        """
+        Stores a path that was found some other way.
+        """
+        key = (start, goal, cost_heuristic)
+        if key in self.entries:
+            self._remove(key)
+        costs = [0]
+        for from_node, to_node in zip(path, path[1:]):
+            costs.append(costs[-1] + self._edge_cost(from_node, to_node))
+        costs[-1] = cost
+        self.entries[key] = _Entry(list(path), costs, cost_heuristic,
+                                   self.graph_version)
+        through = self.through.setdefault(goal, {})
+        for node in path:
+            through[node] = key
+        for edge in zip(path, path[1:]):
+            self.edge_users.setdefault(edge, set()).add(key)
+        while len(self.entries) > self.max_entries:
+            self._remove(next(iter(self.entries)))
+
+    def search(self, start, goal, cost_heuristic=estimate_zero):
+        """
+        Like `a_star.search`, from the cache if possible.
+        """
+        result = self.lookup(start, goal, cost_heuristic)
+        if result is None:
+            self.misses += 1
+            cost, path = self.search_func(self.transition_func, start, goal,
+                                          cost_heuristic)
+            self.add(start, goal, cost_heuristic, cost, path)
+            result = cost, list(path)
+        return result
+
+    def edges_changed(self, edges):
+        """
+        `edges` are the `(from_node, to_node)` pairs whose costs have
+        changed, or that have been added or removed, with the graph
+        already showing the change.
+        """
+        affected = set()
+        for from_node, to_node in edges:
+            affected |= self.edge_users.get((from_node, to_node), set())
+            cost = self._edge_cost(from_node, to_node)
+            if cost == float('inf'):
+                continue
+            # A path through the edge costs at least this much; If it is
+            # less than the cached path's cost, it might be better.
+            for key, entry in self.entries.items():
+                start, goal, cost_heuristic = key
+                lower_bound = (cost_heuristic(start, from_node) + cost +
+                               cost_heuristic(to_node, goal))
+                if lower_bound < entry.costs[-1]:
+                    affected.add(key)
+        for key in affected:
+            self._remove(key)
+
+    def graph_changed(self):
+        """
+        Invalidates all entries.
+        """
+        self.graph_version += 1
+
+    def clear(self):
+        for key in list(self.entries):
+            self._remove(key)
@@ -0,0 +1,206 @@
+"""
+A path service for servers where many agents request paths each tick.
+
+Agents call `request(start, goal)`, and get an `asyncio.Future` that
+resolves to `(cost, path)`, or raises `NoPath`, like `a_star.search`
+(or whatever else the search raised, e.g. a `KeyError` for a node that
+is not in the nav graph).
+The requests are collected, and solved in batches by `tick()`:
+
+* Identical requests share a future, and are solved once.
+* Requests to the same goal from at least `min_group` different starts
+  are answered by a single reverse search from the goal (a flow field),
+  instead of one search per start.
+* Each tick stops starting new batches once its time budget is used up
+  (but starts at least one); The remaining requests wait for the next
+  tick.
+* With `processes`, batches are solved in a process pool, and `tick()`
+  waits for them at most until the budget is used up; Batches that take
+  longer resolve their futures whenever they are done.
+
+The nav graph is in the dict-of-dicts format, `{node: {neighbor:
+cost}}`. After changing it, call `graph_changed()`.
+"""
+import time
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import estimate_zero
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.flow_field import FlowFieldCache
+
+
+def _solve_batch(field_cache, cost_heuristic, min_group, goal, starts):
+    # Returns a list of `(cost, path)` results or exceptions (usually
+    # `NoPath`), in the order of the starts. Failing requests, e.g. for
+    # nodes that are not in the nav graph, don't affect the others.
+    results = []
+    if len(starts) >= min_group:
+        try:
+            field = field_cache.field(goal)
+        except Exception as exception:
+            return [exception] * len(starts)
+        for start in starts:
+            try:
+                results.append(field.search(start))
+            except Exception as exception:
+                results.append(exception)
+    else:
+        transitions = get_neighbors_and_costs(field_cache.nav_graph)
+        for start in starts:
+            try:
+                results.append(search(transitions, start, goal, cost_heuristic))
+            except Exception as exception:
+                results.append(exception)
+    return results
+
+
+# State of the worker processes
+_worker = {}
+
+
+def _init_worker(nav_graph, cost_heuristic, min_group, max_fields):
+    _worker['field_cache'] = FlowFieldCache(nav_graph, max_fields)
+    _worker['cost_heuristic'] = cost_heuristic
+    _worker['min_group'] = min_group
+
+
+def _solve_batch_in_worker(goal, starts):
+    return _solve_batch(_worker['field_cache'], _worker['cost_heuristic'],
+                        _worker['min_group'], goal, starts)
+
+
+class PathService:
+    def __init__(self, nav_graph, cost_heuristic=estimate_zero, min_group=3,
+                 processes=None, max_fields=16):
+        """
+        With `processes`, batches are solved by that many worker
+        processes; `nav_graph` and `cost_heuristic` must then be
+        picklable, so the heuristic has to be a module-level function.
+        """
+        self.nav_graph = nav_graph
+        self.cost_heuristic = cost_heuristic
+        self.min_group = min_group
+        self.processes = processes
+        self.max_fields = max_fields
+        self.field_cache = FlowFieldCache(nav_graph, max_fields)
+        self.pool = None
+        self.pending = {}  # goal: {start: future}
+        self.in_flight = set()  # asyncio futures of batches in the pool
+        self.requests = 0
+        self.coalesced = 0
+        self.searches = 0
+        self.batches = 0
+
+    def request(self, start, goal):
+        self.requests += 1
+        starts = self.pending.setdefault(goal, {})
+        if start in starts:
+            self.coalesced += 1
+            return starts[start]
+        future = asyncio.get_running_loop().create_future()
+        starts[start] = future
+        return future
+
+    def graph_changed(self):
+        """
+        Call this after changing the nav graph. Requests that are not
+        being solved yet will be solved on the changed graph.
+        """
+        self.field_cache.graph_changed()
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
+
+    def _resolve(self, futures, results):
+        for future, result in zip(futures, results):
+            if future.done():  # Cancelled by the caller
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _next_batch(self):
+        goal, starts = next(iter(self.pending.items()))
+        del self.pending[goal]
+        self.batches += 1
+        self.searches += 1 if len(starts) >= self.min_group else len(starts)
+        return goal, list(starts), list(starts.values())
+
+    async def tick(self, max_time=None):
+        """
+        Solves pending requests, for at most `max_time` seconds. Returns
+        the number of requests that remain pending.
+        """
+        if max_time is not None:
+            deadline = time.perf_counter() + max_time
+        if self.processes is None:
+            solved_any = False
+            while self.pending:
+                # At least one batch per tick, so that nothing starves
+                if solved_any and max_time is not None and \
+                   time.perf_counter() >= deadline:
+                    break
+                solved_any = True
+                goal, starts, futures = self._next_batch()
+                results = _solve_batch(self.field_cache, self.cost_heuristic,
+                                       self.min_group, goal, starts)
+                self._resolve(futures, results)
+        else:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    max_workers=self.processes,
+                    initializer=_init_worker,
+                    initargs=(self.nav_graph, self.cost_heuristic,
+                              self.min_group, self.max_fields),
+                )
+            loop = asyncio.get_running_loop()
+            submitted_any = False
+            while self.pending:
+                if submitted_any and max_time is not None and \
+                   time.perf_counter() >= deadline:
+                    break
+                submitted_any = True
+                goal, starts, futures = self._next_batch()
+                batch = loop.run_in_executor(self.pool, _solve_batch_in_worker,
+                                             goal, starts)
+                batch.add_done_callback(
+                    lambda batch, futures=futures: self._batch_done(batch, futures),
+                )
+                self.in_flight.add(batch)
+            if self.in_flight:
+                timeout = None
+                if max_time is not None:
+                    timeout = max(deadline - time.perf_counter(), 0.0)
+                await asyncio.wait(set(self.in_flight), timeout=timeout)
+        return sum(len(starts) for starts in self.pending.values())
+
+    def _batch_done(self, batch, futures):
+        self.in_flight.discard(batch)
+        if batch.cancelled():
+            return
+        exception = batch.exception()
+        if exception is not None:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+        self._resolve(futures, batch.result())
+
+    async def serve(self, tick_interval=0.05, max_time=None):
+        """
+        Runs `tick()` every `tick_interval` seconds, until cancelled.
+        """
+        try:
+            while True:
+                await self.tick(max_time)
+                await asyncio.sleep(tick_interval)
+        finally:
+            self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+            self.pool = None
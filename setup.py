@@ -21,6 +21,11 @@ setup(
     packages=find_packages(exclude=['tests', 'examples']),
     python_requires='>=3.6, <4',
     install_requires=[],
+    # Vectorized playouts, flow fields, CSR nav graphs, all-pairs tables
+    # and the navmesh need NumPy.
+    extras_require={
+        'numpy': ['numpy'],
+    },
     project_urls={
         'Source': 'https://github.com/TheCheapestPixels/pychology',
     },
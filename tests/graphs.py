@@ -0,0 +1,43 @@
+"""
+Grid nav graphs for the path finding tests, in the dict-of-dicts
+format, `{node: {neighbor: cost}}`.
+"""
+import random
+
+
+def square(size):
+    """
+    The tiles of a `size` x `size` grid.
+    """
+    return set((x, y) for x in range(size) for y in range(size))
+
+
+def grid_graph(tiles, rng=None, max_cost=1):
+    """
+    Connects each `(x, y)` tile to the tiles next to it. Moving costs 1,
+    or with `rng`, a random cost from 1 to `max_cost`, drawn for each
+    direction separately.
+    """
+    return {
+        (x, y): {
+            (x + dx, y + dy): 1 if rng is None else rng.randint(1, max_cost)
+            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+            if (x + dx, y + dy) in tiles
+        }
+        for x, y in tiles
+    }
+
+
+def random_grid(seed, size=12, holes=0.25, max_cost=5, keep_corners=False):
+    """
+    A `size` x `size` grid with each tile missing at a chance of
+    `holes`, and random costs from 1 to `max_cost`. With `keep_corners`,
+    `(0, 0)` and `(size - 1, size - 1)` are never missing.
+    """
+    rng = random.Random(seed)
+    tiles = set((x, y)
+                for x in range(size) for y in range(size)
+                if not holes or rng.random() > holes)
+    if keep_corners:
+        tiles |= {(0, 0), (size - 1, size - 1)}
+    return grid_graph(tiles, rng if max_cost > 1 else None, max_cost)
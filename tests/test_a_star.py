@@ -1,7 +1,15 @@
+import pickle
+
 import pytest
 
 from pychology.simple_search.a_star import search
 from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.a_star import SearchStatistics
+from pychology.simple_search.frontiers import BucketQueue
+from tests.graphs import square
+from tests.graphs import grid_graph
 
 
 def constant_zero(a, b):
@@ -42,3 +50,74 @@ def test_short_expensive_path():
     )
     path = search(get_neighbors_and_costs(navgrid), 'start', 'goal')
     assert path == (4, ['start', 'long_path_1', 'long_path_2', 'long_path_3', 'goal'])
+
+
+def test_bucket_queue_on_grid():
+    tiles = square(10)
+    tiles -= set((5, y) for y in range(9))  # A wall with a gap at y=9
+    navgrid = grid_graph(tiles)
+    expected = search(get_neighbors_and_costs(navgrid), (0, 0), (9, 0))
+    cost, path = search(
+        get_neighbors_and_costs(navgrid),
+        (0, 0),
+        (9, 0),
+        estimate_manhattan,
+        frontier=BucketQueue,
+    )
+    assert cost == expected[0] == 27
+    assert len(path) == 28
+    assert (5, 9) in path
+
+
+def test_statistics_and_expansion_hook():
+    tiles = square(10)
+    tiles -= set((5, y) for y in range(9))
+    navgrid = grid_graph(tiles)
+    expected = search(get_neighbors_and_costs(navgrid), (0, 0), (9, 0),
+                      estimate_manhattan)
+    statistics = SearchStatistics()
+    expansions = []
+    result = search(
+        get_neighbors_and_costs(navgrid),
+        (0, 0),
+        (9, 0),
+        estimate_manhattan,
+        statistics=statistics,
+        on_expand=lambda node, cost: expansions.append((node, cost)),
+    )
+    assert result == expected
+    assert statistics.searches == 1
+    assert statistics.expanded == len(expansions) > 0
+    assert expansions[0] == ((0, 0), 0)
+    assert len(set(node for node, _ in expansions)) == len(expansions)
+    assert statistics.heuristic_calls == \
+        statistics.generated - 1 + statistics.improved
+    assert 0 < statistics.peak_frontier <= statistics.generated
+    assert statistics.skipped > 0
+    assert statistics.time_total >= (statistics.time_frontier +
+                                     statistics.time_transitions +
+                                     statistics.time_heuristic)
+
+
+def test_statistics_on_failure():
+    navgrid = dict(
+        start=dict(middle=1),
+        middle=dict(start=1),
+        goal=dict(middle=1),
+    )
+    statistics = SearchStatistics()
+    for _ in range(2):
+        with pytest.raises(NoPath) as no_path:
+            search(get_neighbors_and_costs(navgrid), 'start', 'goal',
+                   statistics=statistics)
+        assert no_path.value.expanded == 2
+    assert statistics.searches == 2
+    assert statistics.expanded == 4
+    assert statistics.time_total > 0.0
+
+
+def test_no_path_survives_pickling():
+    no_path = pickle.loads(pickle.dumps(NoPath(3, 5, 4)))
+    assert (no_path.expanded, no_path.generated, no_path.stored) == (3, 5, 4)
+    assert str(no_path) == str(NoPath(3, 5, 4))
+    assert str(no_path) == "No path found; 3 nodes expanded, 5 generated, 4 stored."
@@ -0,0 +1,80 @@
+import random
+
+import numpy as np
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.all_pairs import AllPairsTable
+from pychology.simple_search.all_pairs import build_all_pairs
+
+
+def random_directed_graph(seed, num_nodes=40):
+    rng = random.Random(seed)
+    return {
+        node: {
+            neighbor: rng.randint(1, 9)
+            for neighbor in rng.sample(range(num_nodes), rng.randint(0, 3))
+            if neighbor != node
+        }
+        for node in range(num_nodes)
+    }
+
+
+@pytest.mark.parametrize('fraction', [0, 0.1])
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_a_star(seed, fraction):
+    nav_graph = random_directed_graph(seed)
+    for neighbors in nav_graph.values():
+        for neighbor in neighbors:
+            neighbors[neighbor] += fraction
+    table = build_all_pairs(nav_graph)
+    transitions = get_neighbors_and_costs(nav_graph)
+    for start in nav_graph:
+        for goal in nav_graph:
+            try:
+                expected, _ = search(transitions, start, goal)
+            except NoPath:
+                assert table.cost(start, goal) == float('inf')
+                with pytest.raises(NoPath):
+                    table.search(start, goal)
+                if start != goal:
+                    with pytest.raises(NoPath):
+                        table.next_node(start, goal)
+                continue
+            cost, path = table.search(start, goal)
+            # Fractional costs may be added up in a different order.
+            assert cost == pytest.approx(expected, rel=1e-12)
+            if not fraction:
+                assert cost == expected
+            assert path[0] == start and path[-1] == goal
+            path_cost = sum(nav_graph[a][b] for a, b in zip(path, path[1:]))
+            assert path_cost == pytest.approx(cost, rel=1e-12)
+            if start != goal:
+                assert table.next_node(start, goal) == path[1]
+
+
+def test_labels_and_dtypes():
+    nav_graph = dict(
+        start=dict(middle=1.5),
+        middle=dict(start=1.5, goal=2.0),
+        goal=dict(middle=2.0),
+    )
+    table = build_all_pairs(nav_graph)
+    assert table.search('start', 'goal') == (3.5, ['start', 'middle', 'goal'])
+    assert table.next_node('goal', 'goal') is None
+    assert table.distance.dtype == np.float64
+    assert table.next_hop.dtype == np.int8
+    table = build_all_pairs({node: {} for node in range(300)})
+    assert table.next_hop.dtype == np.int16
+
+
+def test_save_and_load(tmp_path):
+    nav_graph = random_directed_graph(0)
+    table = build_all_pairs(nav_graph)
+    table.save(tmp_path / 'level.allpairs')
+    loaded = AllPairsTable.load(tmp_path / 'level.allpairs')
+    assert loaded.nodes == table.nodes
+    assert np.array_equal(loaded.distance, table.distance)
+    assert np.array_equal(loaded.next_hop, table.next_hop)
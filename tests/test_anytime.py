@@ -0,0 +1,56 @@
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.anytime import ResumableSearch
+from tests.graphs import random_grid
+
+
+def test_resumes_in_slices():
+    nav_graph = random_grid(0, 20, holes=0.2, keep_corners=True)
+    transitions = get_neighbors_and_costs(nav_graph)
+    expected = search(transitions, (0, 0), (19, 19), estimate_manhattan)
+    pathfinder = ResumableSearch(transitions, (0, 0), (19, 19), estimate_manhattan)
+    steps = 0
+    while not pathfinder.done:
+        assert pathfinder.step(max_expansions=10) is None or pathfinder.done
+        steps += 1
+    assert steps > 1
+    assert pathfinder.solution[0] == expected[0]
+
+
+def test_time_budget():
+    nav_graph = random_grid(0, 20, holes=0.2, keep_corners=True)
+    transitions = get_neighbors_and_costs(nav_graph)
+    pathfinder = ResumableSearch(transitions, (0, 0), (19, 19))
+    pathfinder.step(max_time=0.0)
+    assert not pathfinder.done
+    assert pathfinder.expansions <= 1
+    assert pathfinder.run()[0] == search(transitions, (0, 0), (19, 19))[0]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_anytime_improves_to_optimal(seed):
+    nav_graph = random_grid(seed, 20, holes=0.2, keep_corners=True)
+    transitions = get_neighbors_and_costs(nav_graph)
+    try:
+        expected, _ = search(transitions, (0, 0), (19, 19), estimate_manhattan)
+    except NoPath:
+        with pytest.raises(NoPath):
+            ResumableSearch(transitions, (0, 0), (19, 19), weight=3.0).run()
+        return
+    pathfinder = ResumableSearch(
+        transitions, (0, 0), (19, 19), estimate_manhattan, weight=3.0,
+    )
+    costs = []
+    while not pathfinder.done:
+        solution = pathfinder.step(max_expansions=5)
+        if solution is not None:
+            cost, path = solution
+            assert cost <= expected * 3.0
+            assert sum(nav_graph[a][b] for a, b in zip(path, path[1:])) == cost
+            costs.append(cost)
+    assert costs == sorted(costs, reverse=True)
+    assert costs[-1] == expected
@@ -0,0 +1,71 @@
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.bidirectional import bidirectional_search
+from tests.graphs import random_grid
+
+
+def reverse_graph(nav_graph):
+    reverse = {node: {} for node in nav_graph}
+    for node, neighbors in nav_graph.items():
+        for neighbor, cost in neighbors.items():
+            reverse[neighbor][node] = cost
+    return reverse
+
+
+def path_cost(nav_graph, path):
+    return sum(nav_graph[a][b] for a, b in zip(path, path[1:]))
+
+
+def test_basic():
+    navgrid = dict(
+        start=dict(middle=1),
+        middle=dict(start=1, goal=1),
+        goal=dict(middle=1),
+    )
+    path = bidirectional_search(get_neighbors_and_costs(navgrid), 'start', 'goal')
+    assert path == (2, ['start', 'middle', 'goal'])
+
+
+def test_start_is_goal():
+    navgrid = dict(start=dict())
+    transitions = get_neighbors_and_costs(navgrid)
+    assert bidirectional_search(transitions, 'start', 'start') == (0, ['start'])
+
+
+def test_unconnected():
+    navgrid = dict(
+        start=dict(middle=1),
+        middle=dict(start=1),
+        goal=dict(),
+    )
+    with pytest.raises(NoPath):
+        bidirectional_search(get_neighbors_and_costs(navgrid), 'start', 'goal')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_same_cost_as_a_star(seed):
+    # Edge costs differ per direction, so the graph is directed.
+    navgrid = random_grid(seed, 15, holes=0.3, max_cost=3, keep_corners=True)
+    goal = (14, 14)
+    transitions = get_neighbors_and_costs(navgrid)
+    reverse_transitions = get_neighbors_and_costs(reverse_graph(navgrid))
+    try:
+        expected, _ = search(transitions, (0, 0), goal, estimate_manhattan)
+    except NoPath:
+        with pytest.raises(NoPath):
+            bidirectional_search(
+                transitions, (0, 0), goal, estimate_manhattan,
+                reverse_transition_func=reverse_transitions,
+            )
+        return
+    cost, path = bidirectional_search(
+        transitions, (0, 0), goal, estimate_manhattan,
+        reverse_transition_func=reverse_transitions,
+    )
+    assert cost == expected
+    assert path[0] == (0, 0) and path[-1] == goal
+    assert path_cost(navgrid, path) == cost
@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.contraction import ContractionHierarchy
+from pychology.simple_search.landmarks import distances_from
+
+
+def random_graph(seed, num_nodes=60, num_edges=150):
+    rng = random.Random(seed)
+    nav_graph = {idx: {} for idx in range(num_nodes)}
+    for _ in range(num_edges):
+        node_a, node_b = rng.sample(range(num_nodes), 2)
+        nav_graph[node_a][node_b] = rng.randint(1, 10)
+        if rng.random() < 0.7:  # Mostly undirected
+            nav_graph[node_b][node_a] = nav_graph[node_a][node_b]
+    return nav_graph
+
+
+def test_basic():
+    nav_graph = dict(
+        start=dict(middle=1, goal=5),
+        middle=dict(start=1, goal=1),
+        goal=dict(middle=1, start=5),
+    )
+    hierarchy = ContractionHierarchy(nav_graph)
+    assert hierarchy.search('start', 'goal') == (2, ['start', 'middle', 'goal'])
+    assert hierarchy.search('goal', 'goal') == (0, ['goal'])
+
+
+def test_unconnected():
+    nav_graph = dict(start=dict(middle=1), middle=dict(start=1), goal=dict())
+    hierarchy = ContractionHierarchy(nav_graph)
+    with pytest.raises(NoPath):
+        hierarchy.search('start', 'goal')
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_same_costs_as_dijkstra(seed):
+    nav_graph = random_graph(seed)
+    hierarchy = ContractionHierarchy(nav_graph)
+    for start in range(0, 60, 7):
+        distances = distances_from(nav_graph, start)
+        for goal in nav_graph:
+            if goal not in distances:
+                with pytest.raises(NoPath):
+                    hierarchy.search(start, goal)
+                continue
+            cost, path = hierarchy.search(start, goal)
+            assert cost == distances[goal]
+            assert path[0] == start and path[-1] == goal
+            assert sum(nav_graph[a][b] for a, b in zip(path, path[1:])) == cost
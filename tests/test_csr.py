@@ -0,0 +1,144 @@
+import random
+
+import numpy as np
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.csr import CSRGraph
+from pychology.simple_search.csr import CSRSearch
+from pychology.simple_search.csr import euclidean_heuristic
+from pychology.simple_search.csr import FILE_FORMAT_VERSION
+from tests.graphs import random_grid
+
+
+def random_csr_graph(seed, num_nodes=30, with_centers=True):
+    rng = random.Random(seed)
+    offsets = [0]
+    targets = []
+    costs = []
+    for node in range(num_nodes):
+        neighbors = rng.sample(range(num_nodes), rng.randint(0, 4))
+        targets.extend(neighbors)
+        costs.extend(rng.randint(1, 8) for _ in neighbors)
+        offsets.append(len(targets))
+    centers = None
+    if with_centers:
+        centers = [(rng.random(), rng.random(), 0) for _ in range(num_nodes)]
+    return CSRGraph(offsets, targets, costs, centers, source_digest=b'level')
+
+
+def test_transitions_and_nav_graph():
+    graph = random_csr_graph(0)
+    nav_graph = graph.to_nav_graph()
+    assert len(nav_graph) == graph.num_nodes
+    for node in range(graph.num_nodes):
+        assert dict(graph.transitions(node)) == nav_graph[node]
+        assert list(graph.neighbors(node)) == list(nav_graph[node])
+    for goal in range(1, 10):
+        try:
+            expected = search(get_neighbors_and_costs(nav_graph), 0, goal)
+        except NoPath:
+            with pytest.raises(NoPath):
+                search(graph.transitions, 0, goal)
+            continue
+        assert search(graph.transitions, 0, goal) == expected
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+@pytest.mark.parametrize('with_centers', [True, False])
+def test_save_and_load(tmp_path, mmap, with_centers):
+    graph = random_csr_graph(1, with_centers=with_centers)
+    filename = tmp_path / 'graph.csr'
+    graph.save(filename)
+    loaded = CSRGraph.load(filename, mmap=mmap)
+    assert np.array_equal(loaded.offsets, graph.offsets)
+    assert np.array_equal(loaded.targets, graph.targets)
+    assert np.array_equal(loaded.costs, graph.costs)
+    if with_centers:
+        assert np.array_equal(loaded.centers, graph.centers)
+    else:
+        assert loaded.centers is None
+    assert loaded.source_digest == b'level'
+    assert loaded.to_nav_graph() == graph.to_nav_graph()
+
+
+def test_empty_graph(tmp_path):
+    graph = CSRGraph([0], [], [])
+    graph.save(tmp_path / 'empty.csr')
+    assert CSRGraph.load(tmp_path / 'empty.csr').num_nodes == 0
+
+
+def test_rejects_other_files(tmp_path):
+    filename = tmp_path / 'graph.csr'
+    random_csr_graph(2).save(filename)
+    data = bytearray(filename.read_bytes())
+    data[8] = FILE_FORMAT_VERSION + 1
+    filename.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        CSRGraph.load(filename)
+    filename.write_bytes(b'Not a graph at all')
+    with pytest.raises(ValueError):
+        CSRGraph.load(filename)
+
+
+def test_inconsistent_arrays():
+    with pytest.raises(ValueError):
+        CSRGraph([0, 2], [1], [1.0])
+    with pytest.raises(ValueError):
+        CSRGraph([0, 1], [0], [1.0, 2.0])
+
+
+def test_from_nav_graph():
+    nav_graph = random_grid(0, 15)
+    centers = {node: (node[0], node[1], 0) for node in nav_graph}
+    graph = CSRGraph.from_nav_graph(nav_graph, centers)
+    assert graph.num_nodes == len(nav_graph)
+    assert graph.to_nav_graph() == nav_graph
+    for node, idx in graph.index.items():
+        assert tuple(graph.centers[idx]) == centers[node]
+
+
+@pytest.mark.parametrize('fraction', [0, 0.1])
+@pytest.mark.parametrize('seed', range(5))
+def test_csr_search_matches_a_star(seed, fraction):
+    nav_graph = random_grid(seed, 15)
+    for neighbors in nav_graph.values():
+        for neighbor in neighbors:
+            neighbors[neighbor] += fraction
+    centers = {node: (node[0], node[1], 0) for node in nav_graph}
+    graph = CSRGraph.from_nav_graph(nav_graph, centers)
+    searches = [CSRSearch(graph), CSRSearch(graph, euclidean_heuristic(graph))]
+    transitions = get_neighbors_and_costs(nav_graph)
+    rng = random.Random(seed)
+    nodes = sorted(nav_graph)
+    for _ in range(20):  # The searches are reused for all queries.
+        start, goal = rng.choice(nodes), rng.choice(nodes)
+        try:
+            expected, _ = search(transitions, start, goal)
+        except NoPath:
+            for csr_search in searches:
+                with pytest.raises(NoPath):
+                    csr_search.search(start, goal)
+            continue
+        for csr_search in searches:
+            cost, path = csr_search.search(start, goal)
+            assert cost == expected
+            assert path[0] == start and path[-1] == goal
+            assert sum(nav_graph[a][b] for a, b in zip(path, path[1:])) == cost
+
+
+def test_csr_search_by_index():
+    graph = random_csr_graph(3)
+    nav_graph = graph.to_nav_graph()
+    csr_search = CSRSearch(graph)
+    assert csr_search.search(0, 0) == (0.0, [0])
+    for goal in range(graph.num_nodes):
+        try:
+            expected = search(get_neighbors_and_costs(nav_graph), 0, goal)[0]
+        except NoPath:
+            with pytest.raises(NoPath):
+                csr_search.search(0, goal)
+            continue
+        assert csr_search.search(0, goal)[0] == expected
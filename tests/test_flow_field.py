@@ -0,0 +1,75 @@
+import math
+
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.flow_field import FlowFieldCache
+from tests.graphs import random_grid
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_same_costs_as_a_star(seed):
+    nav_graph = random_grid(seed, 10, max_cost=4)
+    cache = FlowFieldCache(nav_graph)
+    goal = min(nav_graph)
+    for start in nav_graph:
+        try:
+            expected, _ = search(get_neighbors_and_costs(nav_graph), start, goal)
+        except NoPath:
+            with pytest.raises(NoPath):
+                cache.search(start, goal)
+            continue
+        cost, path = cache.search(start, goal)
+        assert cost == expected
+        assert path[0] == start and path[-1] == goal
+        assert sum(nav_graph[a][b] for a, b in zip(path, path[1:])) == cost
+
+
+def test_next_node():
+    nav_graph = dict(
+        start=dict(middle=1),
+        middle=dict(start=1, goal=1),
+        goal=dict(middle=1),
+        island=dict(),
+    )
+    field = FlowFieldCache(nav_graph).field('goal')
+    assert field.next_node('start') == 'middle'
+    assert field.next_node('goal') is None
+    assert field.cost('start') == 2
+    assert field.cost('island') == math.inf
+    with pytest.raises(NoPath):
+        field.next_node('island')
+
+
+def test_cache_and_invalidation():
+    nav_graph = dict(
+        start=dict(middle=1, goal=5),
+        middle=dict(start=1, goal=1),
+        goal=dict(middle=1, start=5),
+    )
+    cache = FlowFieldCache(nav_graph, max_fields=2)
+    field = cache.field('goal')
+    assert cache.field('goal') is field
+    cache.field('start')
+    cache.field('middle')  # Drops the least recently used field.
+    assert 'goal' not in cache.fields
+    assert cache.search('start', 'goal') == (2, ['start', 'middle', 'goal'])
+    del nav_graph['middle']['goal']
+    cache.graph_changed()
+    assert cache.search('start', 'goal') == (5, ['start', 'goal'])
+
+
+def test_cost_types_match_a_star():
+    nav_graph = random_grid(0, 10, max_cost=4)
+    cost, _ = FlowFieldCache(nav_graph).search((0, 0), (9, 9))
+    assert type(cost) is int
+    for node, neighbors in nav_graph.items():
+        for neighbor in neighbors:
+            neighbors[neighbor] += 0.1
+    transitions = get_neighbors_and_costs(nav_graph)
+    expected, _ = search(transitions, (0, 0), (9, 9))
+    cost, _ = FlowFieldCache(nav_graph).search((0, 0), (9, 9))
+    # Summed up from the other end, so it may differ in the last bits.
+    assert type(cost) is float and cost == pytest.approx(expected)
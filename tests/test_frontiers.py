@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from pychology.simple_search.frontiers import IndexedHeap
+from pychology.simple_search.frontiers import BucketQueue
+
+
+@pytest.mark.parametrize('frontier_cls', [IndexedHeap, BucketQueue])
+def test_pop_order(frontier_cls):
+    frontier = frontier_cls()
+    priorities = list(range(100))
+    random.shuffle(priorities)
+    for node, priority in enumerate(priorities):
+        frontier.push(node, priority)
+    assert len(frontier) == 100
+    popped = [frontier.pop()[1] for _ in range(100)]
+    assert popped == list(range(100))
+    with pytest.raises(IndexError):
+        frontier.pop()
+
+
+@pytest.mark.parametrize('frontier_cls', [IndexedHeap, BucketQueue])
+def test_decrease_key(frontier_cls):
+    frontier = frontier_cls()
+    frontier.push('a', 5)
+    frontier.push('b', 3)
+    assert frontier.push('a', 1)
+    assert not frontier.push('b', 4)  # Not an improvement
+    assert len(frontier) == 2
+    assert frontier.peek() == ('a', 1)
+    assert frontier.pop() == ('a', 1)
+    assert frontier.pop() == ('b', 3)
+    assert 'a' not in frontier
+
+
+@pytest.mark.parametrize('frontier_cls', [IndexedHeap, BucketQueue])
+def test_remove_and_update(frontier_cls):
+    frontier = frontier_cls()
+    for node in range(10):
+        frontier.push(node, node)
+    frontier.remove(0)
+    frontier.remove(5)
+    frontier.update(9, 0)
+    frontier.update(1, 20)
+    assert frontier.priority(1) == 20
+    popped = [frontier.pop()[0] for _ in range(len(frontier))]
+    assert popped == [9, 2, 3, 4, 6, 7, 8, 1]
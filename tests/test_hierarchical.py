@@ -0,0 +1,89 @@
+import copy
+import random
+
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.hierarchical import HierarchicalPlanner
+from pychology.simple_search.hierarchical import grid_clusters
+from tests.graphs import random_grid
+
+
+def check_path(nav_graph, start, goal, cost, path):
+    assert path[0] == start
+    assert path[-1] == goal
+    assert sum(nav_graph[a][b] for a, b in zip(path, path[1:])) == cost
+
+
+def test_start_is_goal():
+    nav_graph = random_grid(0, 24, max_cost=1)
+    planner = HierarchicalPlanner(nav_graph, grid_clusters(6))
+    node = next(iter(nav_graph))
+    assert planner.search(node, node) == (0, [node])
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_paths_are_valid_and_near_optimal(seed):
+    nav_graph = random_grid(seed, 24, max_cost=1)
+    planner = HierarchicalPlanner(nav_graph, grid_clusters(6), estimate_manhattan)
+    rng = random.Random(seed)
+    nodes = sorted(nav_graph)
+    for _ in range(20):
+        start, goal = rng.choice(nodes), rng.choice(nodes)
+        try:
+            optimal, _ = search(get_neighbors_and_costs(nav_graph), start, goal)
+        except NoPath:
+            continue  # Different components.
+        cost, path = planner.search(start, goal)
+        check_path(nav_graph, start, goal, cost, path)
+        assert optimal <= cost <= optimal * 1.5 + 6
+
+
+def test_lazy_refinement():
+    nav_graph = random_grid(1, 24, holes=0, max_cost=1)
+    planner = HierarchicalPlanner(nav_graph, grid_clusters(6))
+    cost, abstract_path = planner.abstract_search((0, 0), (23, 23))
+    assert cost == 46
+    assert 2 < len(abstract_path) < 47
+    refinement = planner.refine(abstract_path)
+    assert next(refinement) == (0, 0)
+    path = [(0, 0)] + list(refinement)
+    check_path(nav_graph, (0, 0), (23, 23), cost, path)
+
+
+def test_queries_leave_the_planner_unchanged():
+    nav_graph = random_grid(0, 24, max_cost=1)
+    planner = HierarchicalPlanner(nav_graph, grid_clusters(6))
+    abstraction = [planner.members, planner.borders, planner.entrances,
+                   planner.distances, planner.inter_edges, planner.intra_edges]
+    before = copy.deepcopy(abstraction)
+    nodes = sorted(nav_graph)
+    rng = random.Random(0)
+    for _ in range(20):
+        try:
+            planner.search(rng.choice(nodes), rng.choice(nodes))
+        except NoPath:
+            pass
+    assert abstraction == before
+
+
+def test_update_cluster():
+    nav_graph = random_grid(2, 24, holes=0, max_cost=1)
+    planner = HierarchicalPlanner(nav_graph, grid_clusters(6))
+    # Close the doors between the two top left clusters, except for one.
+    closed = [((x, 5), (x, 6)) for x in range(6) if x != 4]
+    for node_a, node_b in closed:
+        del nav_graph[node_a][node_b]
+        del nav_graph[node_b][node_a]
+    planner.update_cluster((0, 1))
+    cost, path = planner.search((0, 0), (0, 10))
+    check_path(nav_graph, (0, 0), (0, 10), cost, path)
+    assert cost >= 18
+    # The updated abstraction matches a freshly built one.
+    fresh = HierarchicalPlanner(nav_graph, grid_clusters(6))
+    assert planner.borders.keys() == fresh.borders.keys()
+    for cluster, entrances in fresh.entrances.items():
+        assert len(planner.entrances[cluster]) == len(entrances)
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.incremental import DStarLite
+from tests.graphs import square
+from tests.graphs import grid_graph
+
+
+def path_cost(nav_graph, path):
+    return sum(nav_graph[a][b] for a, b in zip(path, path[1:]))
+
+
+def test_initial_search():
+    nav_graph = grid_graph(square(8))
+    transitions = get_neighbors_and_costs(nav_graph)
+    planner = DStarLite(transitions, (0, 0), (7, 7), estimate_manhattan)
+    cost, path = planner.search()
+    assert cost == 14
+    assert path[0] == (0, 0) and path[-1] == (7, 7)
+    assert path_cost(nav_graph, path) == 14
+
+
+def test_door_closes():
+    nav_graph = {
+        'start': {'door': 1, 'detour': 2},
+        'door': {'start': 1, 'goal': 1},
+        'detour': {'start': 2, 'goal': 2},
+        'goal': {'door': 1, 'detour': 2},
+    }
+    planner = DStarLite(get_neighbors_and_costs(nav_graph), 'start', 'goal')
+    assert planner.search() == (2, ['start', 'door', 'goal'])
+    del nav_graph['door']['goal']
+    del nav_graph['goal']['door']
+    planner.edges_changed([('door', 'goal'), ('goal', 'door')])
+    assert planner.search() == (4, ['start', 'detour', 'goal'])
+    del nav_graph['detour']['goal']
+    del nav_graph['goal']['detour']
+    planner.edges_changed([('detour', 'goal'), ('goal', 'detour')])
+    with pytest.raises(NoPath):
+        planner.search()
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_replanning_matches_search_from_scratch(seed):
+    rng = random.Random(seed)
+    nav_graph = grid_graph(square(10))
+    transitions = get_neighbors_and_costs(nav_graph)
+    planner = DStarLite(transitions, (0, 0), (9, 9), estimate_manhattan)
+    planner.search()
+    edges = [(a, b) for a in nav_graph for b in nav_graph[a]]
+    for _ in range(10):
+        changed = rng.sample(edges, 10)
+        for node_a, node_b in changed:
+            nav_graph[node_a][node_b] = rng.randint(1, 5)
+        planner.edges_changed(changed)
+        # The agent takes a step along its path.
+        cost, path = planner.search()
+        if len(path) > 1:
+            planner.move_start(path[1])
+            cost, path = planner.search()
+        expected, _ = search(transitions, planner.start, (9, 9), estimate_manhattan)
+        assert cost == expected
+        assert path_cost(nav_graph, path) == cost
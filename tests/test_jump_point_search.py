@@ -0,0 +1,156 @@
+import math
+import random
+
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.a_star import SearchStatistics
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.jump_point_search import OccupancyGrid
+from pychology.simple_search.jump_point_search import grid_from_string
+from pychology.simple_search.jump_point_search import jump_point_search
+
+
+level = """
+I.... ....
+.  .. . ..
+.  .. . ..
+....  ....
+ ...... .O"""[1:]
+
+
+def grid_adjacency(grid, diagonal):
+    adjacency = {}
+    for row in range(grid.rows):
+        for column in range(grid.columns):
+            if not grid.is_passable((row, column)):
+                continue
+            neighbors = {}
+            for d_row in (-1, 0, 1):
+                for d_column in (-1, 0, 1):
+                    if (d_row, d_column) == (0, 0):
+                        continue
+                    if d_row and d_column:
+                        if not diagonal:
+                            continue
+                        if not (grid.is_passable((row + d_row, column)) and
+                                grid.is_passable((row, column + d_column))):
+                            continue
+                    neighbor = (row + d_row, column + d_column)
+                    if grid.is_passable(neighbor):
+                        cost = math.sqrt(2) if d_row and d_column else 1
+                        neighbors[neighbor] = cost
+            adjacency[(row, column)] = neighbors
+    return adjacency
+
+
+def path_cost(adjacency, path):
+    return sum(adjacency[a][b] for a, b in zip(path, path[1:]))
+
+
+def test_grid_from_string():
+    grid, start, goal = grid_from_string(level)
+    assert (grid.rows, grid.columns) == (5, 10)
+    assert start == (0, 0)
+    assert goal == (4, 9)
+    assert grid.is_passable((0, 4))
+    assert not grid.is_passable((0, 5))
+    assert not grid.is_passable((-1, 0))
+
+
+@pytest.mark.parametrize('diagonal', [False, True])
+def test_level(diagonal):
+    grid, start, goal = grid_from_string(level)
+    adjacency = grid_adjacency(grid, diagonal)
+    expected, _ = search(get_neighbors_and_costs(adjacency), start, goal)
+    cost, path = jump_point_search(grid, start, goal, diagonal=diagonal)
+    assert cost == pytest.approx(expected)
+    assert path[0] == start and path[-1] == goal
+    assert path_cost(adjacency, path) == pytest.approx(cost)
+
+
+def test_unconnected():
+    grid, start, goal = grid_from_string("I. .O")
+    with pytest.raises(NoPath):
+        jump_point_search(grid, start, goal)
+
+
+@pytest.mark.parametrize('diagonal', [False, True])
+@pytest.mark.parametrize('seed', range(50))
+def test_same_cost_as_a_star(seed, diagonal):
+    rng = random.Random(seed)
+    grid = OccupancyGrid(rng.randint(1, 12), rng.randint(1, 12))
+    for row in range(grid.rows):
+        for column in range(grid.columns):
+            if rng.random() > 0.3:
+                grid.set_passable((row, column))
+    start = (rng.randrange(grid.rows), rng.randrange(grid.columns))
+    goal = (rng.randrange(grid.rows), rng.randrange(grid.columns))
+    grid.set_passable(start)
+    grid.set_passable(goal)
+    adjacency = grid_adjacency(grid, diagonal)
+    try:
+        expected, _ = search(get_neighbors_and_costs(adjacency), start, goal)
+    except NoPath:
+        with pytest.raises(NoPath):
+            jump_point_search(grid, start, goal, diagonal=diagonal)
+        return
+    cost, path = jump_point_search(grid, start, goal, diagonal=diagonal)
+    assert cost == pytest.approx(expected)
+    assert path[0] == start and path[-1] == goal
+    assert path_cost(adjacency, path) == pytest.approx(cost)
+
+
+@pytest.mark.parametrize('diagonal', [False, True])
+def test_expands_fewer_nodes_than_a_star(diagonal):
+    # The goal is walled in, so both searches expand all they can.
+    rng = random.Random(0)
+    grid = OccupancyGrid(40, 40)
+    for row in range(grid.rows):
+        for column in range(grid.columns):
+            if rng.random() > 0.1:
+                grid.set_passable((row, column))
+    for row in range(29, 32):
+        for column in range(29, 32):
+            grid.set_passable((row, column), False)
+    start, goal = (0, 0), (30, 30)
+    grid.set_passable(start)
+    grid.set_passable(goal)
+    adjacency = grid_adjacency(grid, diagonal)
+    with pytest.raises(NoPath) as a_star_no_path:
+        search(get_neighbors_and_costs(adjacency), start, goal)
+    with pytest.raises(NoPath) as jps_no_path:
+        jump_point_search(grid, start, goal, diagonal=diagonal)
+    assert jps_no_path.value.expanded < a_star_no_path.value.expanded / 2
+
+
+def estimate_octile(node, goal):
+    d_row = abs(node[0] - goal[0])
+    d_column = abs(node[1] - goal[1])
+    return max(d_row, d_column) + (math.sqrt(2) - 1) * min(d_row, d_column)
+
+
+@pytest.mark.parametrize('diagonal', [False, True])
+def test_order_of_magnitude_fewer_expansions_on_open_maps(diagonal):
+    # An open map with a wall across the middle, which A* has to flood
+    # the space in front of to get around, even with a good heuristic.
+    size = 32
+    grid = OccupancyGrid(size, size)
+    for row in range(size):
+        for column in range(size):
+            grid.set_passable((row, column))
+    for column in range(size - 1):
+        grid.set_passable((size // 2, column), False)
+    start, goal = (0, 0), (size - 1, 0)
+    heuristic = estimate_octile if diagonal else estimate_manhattan
+    a_star_statistics = SearchStatistics()
+    expected, _ = search(get_neighbors_and_costs(grid_adjacency(grid, diagonal)),
+                         start, goal, heuristic, statistics=a_star_statistics)
+    jps_statistics = SearchStatistics()
+    cost, _ = jump_point_search(grid, start, goal, diagonal=diagonal,
+                                statistics=jps_statistics)
+    assert cost == pytest.approx(expected)
+    assert jps_statistics.searches == 1
+    assert jps_statistics.expanded * 10 <= a_star_statistics.expanded
@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.landmarks import build_landmarks
+from pychology.simple_search.landmarks import distances_from
+from pychology.simple_search.landmarks import LandmarkHeuristic
+from tests.graphs import random_grid
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_admissible(seed):
+    nav_graph = random_grid(seed, holes=0.3, max_cost=4)
+    heuristic = build_landmarks(nav_graph, 4)
+    assert len(heuristic.landmarks) == 4
+    nodes = sorted(nav_graph)
+    for node_a in random.Random(seed).sample(nodes, 10):
+        distances = distances_from(nav_graph, node_a)
+        for node_b in nodes:
+            estimate = heuristic(node_a, node_b)
+            assert estimate <= distances.get(node_b, float('inf'))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_a_star_stays_optimal(seed):
+    nav_graph = random_grid(seed, holes=0.3, max_cost=4)
+    heuristic = build_landmarks(nav_graph, 4)
+    transitions = get_neighbors_and_costs(nav_graph)
+    start, goal = max(nav_graph), min(nav_graph)
+    distances = distances_from(nav_graph, start)
+    if goal not in distances:
+        return
+    cost, path = search(transitions, start, goal, heuristic)
+    assert cost == distances[goal]
+
+
+def test_save_and_load(tmp_path):
+    nav_graph = random_grid(0, holes=0.3, max_cost=4)
+    heuristic = build_landmarks(nav_graph, 3)
+    filename = tmp_path / 'landmarks.alt'
+    heuristic.save(filename)
+    loaded = LandmarkHeuristic.load(filename)
+    assert loaded.landmarks == heuristic.landmarks
+    nodes = sorted(nav_graph)
+    for node_a, node_b in zip(nodes, reversed(nodes)):
+        assert loaded(node_a, node_b) == heuristic(node_a, node_b)
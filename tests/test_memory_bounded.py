@@ -0,0 +1,115 @@
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import estimate_zero
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.memory_bounded import ida_star
+from pychology.simple_search.memory_bounded import sma_star
+from tests.graphs import square
+from tests.graphs import grid_graph
+from tests.graphs import random_grid
+
+
+def count_or_double(number):
+    # An infinite, implicit state space.
+    return [(number + 1, 1), (number - 1, 1), (number * 2, 1)]
+
+
+def estimate_difference(node_a, node_b):
+    return 0 if node_a == node_b else 1
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_ida_star_is_optimal(seed):
+    nav_graph = random_grid(seed, 8, holes=0.2, keep_corners=True)
+    transitions = get_neighbors_and_costs(nav_graph)
+    try:
+        expected, _ = search(transitions, (0, 0), (7, 7), estimate_manhattan)
+    except NoPath:
+        with pytest.raises(NoPath):
+            ida_star(transitions, (0, 0), (7, 7), estimate_manhattan)
+        return
+    cost, path = ida_star(transitions, (0, 0), (7, 7), estimate_manhattan)
+    assert cost == expected
+    assert path[0] == (0, 0) and path[-1] == (7, 7)
+
+
+@pytest.mark.parametrize('seed', range(10))
+@pytest.mark.parametrize('node_limit', [40, 1000])
+def test_sma_star_is_optimal(seed, node_limit):
+    nav_graph = random_grid(seed, 8, holes=0.2, keep_corners=True)
+    transitions = get_neighbors_and_costs(nav_graph)
+    try:
+        expected, _ = search(transitions, (0, 0), (7, 7), estimate_manhattan)
+    except NoPath:
+        with pytest.raises(NoPath):
+            sma_star(transitions, (0, 0), (7, 7), estimate_manhattan, node_limit)
+        return
+    cost, path = sma_star(transitions, (0, 0), (7, 7), estimate_manhattan,
+                          node_limit)
+    assert cost == expected
+    assert sum(nav_graph[a][b] for a, b in zip(path, path[1:])) == cost
+
+
+def test_sma_star_respects_node_limit():
+    nav_graph = random_grid(3, 12, holes=0.2, keep_corners=True)
+    transitions = get_neighbors_and_costs(nav_graph)
+    expected, path = search(transitions, (0, 0), (11, 11), estimate_manhattan)
+    node_limit = len(path) + 10
+    cost, _ = sma_star(transitions, (0, 0), (11, 11), estimate_manhattan,
+                       node_limit)
+    assert cost == expected
+
+
+@pytest.mark.parametrize('seed, size', [(48, 6), (237, 9), (392, 9)])
+@pytest.mark.parametrize('cost_heuristic', [estimate_zero, estimate_manhattan])
+def test_sma_star_keeps_shorter_equal_cost_routes(seed, size, cost_heuristic):
+    # Cheaper but longer routes used to shadow ones that fit into memory.
+    nav_graph = random_grid(seed, size, holes=0.2, keep_corners=True)
+    transitions = get_neighbors_and_costs(nav_graph)
+    goal = (size - 1, size - 1)
+    expected, path = search(transitions, (0, 0), goal, cost_heuristic)
+    for node_limit in [len(path), len(path) + 1]:
+        cost, _ = sma_star(transitions, (0, 0), goal, cost_heuristic, node_limit)
+        assert cost == expected
+
+
+def test_sma_star_path_does_not_fit():
+    nav_graph = grid_graph(square(5))
+    transitions = get_neighbors_and_costs(nav_graph)
+    assert sma_star(transitions, (0, 0), (4, 4), estimate_manhattan, 9)[0] == 8
+    with pytest.raises(NoPath) as no_path:
+        sma_star(transitions, (0, 0), (4, 4), estimate_manhattan, 8)
+    # All children of a node are generated at once, before leaves are
+    # forgotten to get back to the limit.
+    assert no_path.value.stored <= 8 + 3
+
+
+def test_implicit_state_space():
+    assert ida_star(count_or_double, 1, 20, estimate_difference) == \
+        (5, [1, 2, 4, 5, 10, 20])
+    cost, path = sma_star(count_or_double, 1, 20, estimate_difference, node_limit=500)
+    assert cost == 5
+
+
+def test_ida_star_max_cost():
+    with pytest.raises(NoPath) as no_path:
+        ida_star(count_or_double, 1, 20, estimate_difference, max_cost=3)
+    assert no_path.value.stored <= 4
+
+
+def test_start_is_goal():
+    assert ida_star(count_or_double, 1, 1) == (0, [1])
+    assert sma_star(count_or_double, 1, 1) == (0, [1])
+
+
+def test_no_path_reports_statistics():
+    nav_graph = dict(start=dict(middle=1), middle=dict(start=1), goal={})
+    transitions = get_neighbors_and_costs(nav_graph)
+    for search_func in (search, ida_star, sma_star):
+        with pytest.raises(NoPath) as no_path:
+            search_func(transitions, 'start', 'goal')
+        assert no_path.value.expanded >= 2
+        assert no_path.value.stored <= 2
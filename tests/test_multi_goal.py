@@ -0,0 +1,83 @@
+import random
+
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.frontiers import BucketQueue
+from pychology.simple_search.multi_goal import nearest_goals
+from pychology.simple_search.multi_goal import nearest_goal_search
+from tests.graphs import random_grid
+
+
+def path_cost(nav_graph, path):
+    return sum(nav_graph[a][b] for a, b in zip(path, path[1:]))
+
+
+def costs_to_goals(nav_graph, start, goals):
+    transitions = get_neighbors_and_costs(nav_graph)
+    costs = []
+    for goal in goals:
+        try:
+            costs.append(search(transitions, start, goal)[0])
+        except NoPath:
+            pass
+    return sorted(costs)
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('heuristic', [None, estimate_manhattan])
+def test_same_as_one_search_per_goal(seed, heuristic):
+    nav_graph = random_grid(seed)
+    rng = random.Random(seed)
+    nodes = sorted(nav_graph)
+    start = rng.choice(nodes)
+    goals = rng.sample(nodes, 6)
+    expected = costs_to_goals(nav_graph, start, goals)
+    kwargs = dict(cost_heuristic=heuristic) if heuristic else {}
+    found = nearest_goals(get_neighbors_and_costs(nav_graph), start, goals,
+                          k=4, **kwargs)
+    assert [cost for cost, _ in found] == expected[:4]
+    for cost, path in found:
+        assert path[0] == start
+        assert path[-1] in goals
+        assert path_cost(nav_graph, path) == cost
+    assert len({path[-1] for _, path in found}) == len(found)
+
+    cost, path = nearest_goal_search(get_neighbors_and_costs(nav_graph),
+                                     start, goals, **kwargs)
+    assert cost == expected[0]
+    assert path[-1] in goals
+
+
+def test_fewer_reachable_than_k():
+    nav_graph = dict(a=dict(b=1), b=dict(a=1, c=2), c=dict(b=2), d=dict())
+    found = nearest_goals(get_neighbors_and_costs(nav_graph), 'a', 'bcd', k=3)
+    assert found == [(1, ['a', 'b']), (3, ['a', 'b', 'c'])]
+
+
+def test_start_is_a_goal():
+    nav_graph = dict(a=dict(b=1), b=dict(a=1))
+    assert nearest_goal_search(get_neighbors_and_costs(nav_graph), 'a', 'ab') == \
+        (0, ['a'])
+
+
+def test_no_goal_reachable():
+    nav_graph = dict(a=dict(b=1), b=dict(a=1), c=dict())
+    with pytest.raises(NoPath) as no_path:
+        nearest_goal_search(get_neighbors_and_costs(nav_graph), 'a', ['c'])
+    assert no_path.value.expanded == 2
+
+
+def test_bucket_queue_frontier():
+    nav_graph = random_grid(7)
+    nodes = sorted(nav_graph)
+    goals = nodes[-5:]
+    start = max(nodes, key=lambda node: len(costs_to_goals(nav_graph, node, goals)))
+    expected = costs_to_goals(nav_graph, start, goals)
+    found = nearest_goals(get_neighbors_and_costs(nav_graph), start, goals,
+                          k=5, cost_heuristic=estimate_manhattan,
+                          frontier=BucketQueue)
+    assert [cost for cost, _ in found] == expected
@@ -0,0 +1,77 @@
+import itertools
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from pychology.games.navmesh.builder import build_nav_graph
+from pychology.games.navmesh.builder import cached_nav_graph
+
+
+def grid_mesh(size):
+    # Like exported meshes, each triangle has its own vertices.
+    positions = []
+    triangles = []
+    for x in range(size):
+        for y in range(size):
+            z = 0.1 * ((x + y) % 3)
+            a, b, c, d = (x, y, z), (x + 1, y, z), (x + 1, y + 1, z), (x, y + 1, z)
+            for triangle in ([a, b, c], [a, c, d]):
+                triangles.append(list(range(len(positions), len(positions) + 3)))
+                positions.extend(triangle)
+    return np.array(positions, dtype=np.float32), np.array(triangles)
+
+
+def reference_neighbors(positions, triangles, edge_only):
+    # The way that make_nav_graph finds neighbors
+    vert_dict = defaultdict(set)
+    vertex_ids = []
+    for triangle_id, triangle in enumerate(triangles):
+        ids = [tuple(round(round(float(c), 4) * 4.0) / 4.0 for c in positions[vertex])
+               for vertex in triangle]
+        vertex_ids.append(ids)
+        for vertex_id in ids:
+            vert_dict[vertex_id].add(triangle_id)
+    neighbors = {}
+    for triangle_id, ids in enumerate(vertex_ids):
+        common = set()
+        if edge_only:
+            for pair in itertools.combinations(ids, 2):
+                common |= vert_dict[pair[0]] & vert_dict[pair[1]]
+        else:
+            for vertex_id in ids:
+                common |= vert_dict[vertex_id]
+        neighbors[triangle_id] = common - {triangle_id}
+    return neighbors
+
+
+@pytest.mark.parametrize('edge_only', [True, False])
+def test_matches_make_nav_graph(edge_only):
+    positions, triangles = grid_mesh(5)
+    graph = build_nav_graph(positions, triangles, edge_only)
+    expected = reference_neighbors(positions, triangles, edge_only)
+    nav_graph = graph.to_nav_graph()
+    assert {node: set(neighbors) for node, neighbors in nav_graph.items()} == expected
+    centers = positions[triangles].mean(axis=1)
+    assert np.allclose(graph.centers, centers)
+    for node, neighbors in nav_graph.items():
+        for neighbor, cost in neighbors.items():
+            assert cost == pytest.approx(
+                np.linalg.norm(centers[neighbor] - centers[node]), rel=1e-6)
+
+
+def test_cache(tmp_path):
+    positions, triangles = grid_mesh(4)
+    filename = tmp_path / 'level.csr'
+    built = cached_nav_graph(positions, triangles, filename)
+    loaded = cached_nav_graph(positions, triangles, filename)
+    assert not loaded.targets.flags.writeable  # Memory-mapped
+    assert loaded.to_nav_graph() == built.to_nav_graph()
+
+    # A changed mesh, or other options, make it rebuild the graph.
+    rebuilt = cached_nav_graph(positions, triangles[:-2], filename)
+    assert rebuilt.num_nodes == len(triangles) - 2
+    rebuilt = cached_nav_graph(positions, triangles[:-2], filename,
+                               edge_neighbors_only=False)
+    assert rebuilt.num_edges > built.num_edges - 6
+    assert rebuilt.targets.flags.writeable
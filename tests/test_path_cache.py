@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.path_cache import PathCache
+from tests.graphs import random_grid
+
+
+def test_hits_and_misses():
+    nav_graph = random_grid(0, 8, holes=0)
+    cache = PathCache(get_neighbors_and_costs(nav_graph))
+    first = cache.search((0, 0), (7, 7), estimate_manhattan)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.search((0, 0), (7, 7), estimate_manhattan) == first
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Another heuristic is another query, but any optimal path will do.
+    assert cache.search((0, 0), (7, 7))[0] == first[0]
+    assert (cache.hits, cache.subpath_hits, cache.misses) == (1, 1, 1)
+    cache.search((0, 1), (7, 7))
+    assert cache.misses == 2
+
+
+def test_subpaths():
+    nav_graph = random_grid(0, 8, holes=0)
+    transitions = get_neighbors_and_costs(nav_graph)
+    cache = PathCache(transitions)
+    cost, path = cache.search((0, 0), (7, 7))
+    for position, node in enumerate(path):
+        sub_cost, sub_path = cache.search(node, (7, 7))
+        assert sub_path == path[position:]
+        assert sub_cost == search(transitions, node, (7, 7))[0]
+    assert cache.subpath_hits == len(path) - 1  # The start is a full hit.
+    assert cache.misses == 1
+
+
+def test_lru():
+    nav_graph = random_grid(0, 5, holes=0)
+    cache = PathCache(get_neighbors_and_costs(nav_graph), max_entries=2)
+    cache.search((0, 0), (4, 4))
+    cache.search((4, 0), (0, 4))
+    cache.search((0, 0), (4, 4))  # Now the most recently used one
+    cache.search((0, 4), (4, 0))
+    assert len(cache.entries) == 2
+    assert cache.lookup((0, 0), (4, 4)) is not None
+    assert cache.lookup((4, 0), (0, 4)) is None
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_edges_changed(seed):
+    size = 8
+    nav_graph = random_grid(seed, size, holes=0)
+    transitions = get_neighbors_and_costs(nav_graph)
+    cache = PathCache(transitions, max_entries=1000)
+    rng = random.Random(seed)
+    nodes = sorted(nav_graph)
+    queries = [(rng.choice(nodes), rng.choice(nodes)) for _ in range(40)]
+    for start, goal in queries:
+        cache.search(start, goal, estimate_manhattan)
+    for _ in range(5):
+        from_node = rng.choice(nodes)
+        to_node = rng.choice(list(nav_graph[from_node]))
+        nav_graph[from_node][to_node] = rng.randint(1, 9)
+        cache.edges_changed([(from_node, to_node)])
+        kept = len(cache.entries)
+        for start, goal in queries:
+            assert cache.search(start, goal, estimate_manhattan)[0] == \
+                search(transitions, start, goal, estimate_manhattan)[0]
+    assert kept > 0
+
+
+def test_removed_edge_and_graph_changed():
+    nav_graph = dict(
+        start=dict(middle=1),
+        middle=dict(start=1, goal=1),
+        goal=dict(middle=1),
+    )
+    cache = PathCache(get_neighbors_and_costs(nav_graph))
+    assert cache.search('start', 'goal') == (2, ['start', 'middle', 'goal'])
+    del nav_graph['middle']['goal']
+    cache.edges_changed([('middle', 'goal')])
+    with pytest.raises(NoPath):
+        cache.search('start', 'goal')
+    nav_graph['start']['goal'] = 5
+    cache.graph_changed()
+    assert cache.search('start', 'goal') == (5, ['start', 'goal'])
+    assert cache.search('start', 'goal') == (5, ['start', 'goal'])
+    cache.graph_changed()
+    assert cache.lookup('start', 'goal') is None
+    assert not cache.entries
+
+
+def test_remove_entry_covered_by_a_removed_one():
+    nav_graph = dict(
+        a=dict(b=1),
+        b=dict(c=1),
+        c=dict(),
+    )
+    cache = PathCache(get_neighbors_and_costs(nav_graph))
+    cache.search('b', 'c')
+    cache.search('a', 'c')  # Takes over the nodes of the first entry.
+    cache.search('b', 'c')  # So that the second entry is removed first
+    cache.clear()
+    assert not cache.entries and not cache.through and not cache.edge_users
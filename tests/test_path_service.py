@@ -0,0 +1,167 @@
+import random
+import asyncio
+
+import pytest
+
+from pychology.simple_search.a_star import search
+from pychology.simple_search.a_star import get_neighbors_and_costs
+from pychology.simple_search.a_star import estimate_manhattan
+from pychology.simple_search.a_star import NoPath
+from pychology.simple_search.path_service import PathService
+from tests.graphs import random_grid
+
+
+def expected_result(nav_graph, start, goal):
+    try:
+        return search(get_neighbors_and_costs(nav_graph), start, goal)[0]
+    except NoPath:
+        return None
+
+
+async def gather_results(futures):
+    results = []
+    for future in futures:
+        try:
+            results.append((await future)[0])
+        except NoPath:
+            results.append(None)
+    return results
+
+
+def run_requests(service, nav_graph, queries, max_time=None):
+    async def main():
+        futures = [service.request(start, goal) for start, goal in queries]
+        while await service.tick(max_time):
+            pass
+        return await gather_results(futures)
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_same_results_as_search(seed):
+    nav_graph = random_grid(seed)
+    rng = random.Random(seed)
+    nodes = sorted(nav_graph)
+    goals = rng.sample(nodes, 3)
+    # Many starts per goal are solved by flow fields, few by A*.
+    queries = [(rng.choice(nodes), goal) for goal in goals for _ in range(5)]
+    queries += [(rng.choice(nodes), rng.choice(nodes)) for _ in range(5)]
+    service = PathService(nav_graph, estimate_manhattan)
+    results = run_requests(service, nav_graph, queries)
+    for (start, goal), result in zip(queries, results):
+        expected = expected_result(nav_graph, start, goal)
+        assert result == expected and type(result) is type(expected)
+    assert service.searches < len(queries)
+
+
+def test_coalescing():
+    nav_graph = random_grid(0)
+    nodes = sorted(nav_graph)
+    service = PathService(nav_graph)
+
+    async def main():
+        first = service.request(nodes[0], nodes[-1])
+        second = service.request(nodes[0], nodes[-1])
+        assert first is second
+        await service.tick()
+        return first
+
+    future = asyncio.run(main())
+    assert future.done()
+    assert (service.requests, service.coalesced, service.searches) == (2, 1, 1)
+
+
+def test_time_budget():
+    nav_graph = random_grid(1)
+    nodes = sorted(nav_graph)
+    service = PathService(nav_graph)
+
+    async def main():
+        futures = [service.request(start, nodes[-1 - goal])
+                   for goal in range(4) for start in nodes[:2]]
+        remaining = await service.tick(max_time=0.0)
+        assert remaining == 6  # Only one batch per tick
+        assert sum(future.done() for future in futures) == 2
+        while await service.tick(max_time=0.0):
+            pass
+        assert all(future.done() for future in futures)
+        await gather_results(futures)
+
+    asyncio.run(main())
+
+
+def test_time_budget_with_process_pool():
+    nav_graph = random_grid(1)
+    nodes = sorted(nav_graph)
+    service = PathService(nav_graph, processes=1)
+    try:
+        async def main():
+            futures = [service.request(start, nodes[-1 - goal])
+                       for goal in range(4) for start in nodes[:2]]
+            remaining = await service.tick(max_time=0.0)
+            assert remaining == 6  # Only one batch submitted per tick
+            while await service.tick(max_time=0.0):
+                pass
+            await service.tick()
+            return await gather_results(futures)
+        results = asyncio.run(main())
+    finally:
+        service.close()
+    assert len(results) == 8
+
+
+def test_process_pool():
+    nav_graph = random_grid(2)
+    rng = random.Random(2)
+    nodes = sorted(nav_graph)
+    queries = [(rng.choice(nodes), goal)
+               for goal in rng.sample(nodes, 2) for _ in range(4)]
+    service = PathService(nav_graph, estimate_manhattan, processes=2)
+    try:
+        async def main():
+            futures = [service.request(start, goal) for start, goal in queries]
+            await service.tick()
+            return await gather_results(futures)
+        results = asyncio.run(main())
+    finally:
+        service.close()
+    for (start, goal), result in zip(queries, results):
+        assert result == expected_result(nav_graph, start, goal)
+
+
+def test_graph_changed():
+    nav_graph = dict(
+        start=dict(middle=1),
+        middle=dict(start=1, goal=1),
+        goal=dict(middle=1),
+    )
+    service = PathService(nav_graph, min_group=1)
+    queries = [('start', 'goal')]
+    assert run_requests(service, nav_graph, queries) == [2]
+    nav_graph['middle']['goal'] = 5
+    service.graph_changed()
+    assert run_requests(service, nav_graph, queries) == [6]
+    del nav_graph['middle']['goal']
+    service.graph_changed()
+    assert run_requests(service, nav_graph, queries) == [None]
+
+
+@pytest.mark.parametrize('min_group', [1, 3])
+@pytest.mark.parametrize('processes', [None, 1])
+def test_unknown_node(min_group, processes):
+    nav_graph = {0: {1: 1}, 1: {0: 1}}
+    service = PathService(nav_graph, min_group=min_group, processes=processes)
+    try:
+        async def main():
+            known = service.request(0, 1)
+            unknown_start = service.request(5, 1)
+            unknown_goal = service.request(0, 7)
+            await service.tick()
+            await asyncio.wait([known, unknown_start, unknown_goal])
+            return known, unknown_start, unknown_goal
+        known, unknown_start, unknown_goal = asyncio.run(main())
+    finally:
+        service.close()
+    assert known.result() == (1, [0, 1])
+    assert isinstance(unknown_start.exception(), (KeyError, NoPath))
+    assert isinstance(unknown_goal.exception(), (KeyError, NoPath))
@@ -0,0 +1,692 @@
+import sys
+import math
+import time
+import random
+import subprocess
+
+import numpy as np
+import pytest
+from collections import Counter
+
+from pychology.search import TranspositionTable
+from pychology.search import FullExpansion
+from pychology.search import BreadthSearch
+from pychology.search import AllCombinations
+from pychology.search import Minimax
+from pychology.search import AlphaBeta
+from pychology.search import AlphaBetaExpansion
+from pychology.search import TimeLimitedDeepening
+from pychology.search import MCTSExpansion
+from pychology.search import UCT
+from pychology.search import ZeroSumPlayer
+from pychology.search import NoExpansion
+from pychology.search import ParallelMonteCarloBasedEvaluation
+from pychology.search import shutdown_rollout_pools
+from pychology.search import MonteCarloBasedEvaluation
+from pychology.search import VectorizedMonteCarloBasedEvaluation
+from pychology.search import StepLimitedExpansion
+from pychology.search import NoExpansionQueue
+from pychology.search import GameBasedEvaluation
+from pychology.search import BestMovePlayer
+from pychology.search import Search
+from pychology.search import PriorityExpansionQueue
+from pychology.search import SingleNodeBreadthSearch
+from pychology.games import tic_tac_toe
+from pychology.games import four_in_a_row
+from pychology.games.repl import assemble_search
+
+
+class FullSearch(
+        TranspositionTable,
+        FullExpansion,
+        BreadthSearch,
+        AllCombinations,
+        Minimax,
+        BestMovePlayer,
+        Search,
+):
+    def evaluate_state(self, state):
+        return terminal_value(self.game, state, self.player)
+
+
+class CountingSearch(FullSearch):
+    def setup_storage(self):
+        super().setup_storage()
+        self.waves = []
+
+    def backpropagate(self, *states):
+        self.waves.append([])
+        super().backpropagate(*states)
+
+    def reevaluate_node(self, state):
+        self.waves[-1].append(self.game.hash_state(state))
+        return super().reevaluate_node(state)
+
+
+def terminal_value(game, state, player):
+    winner = game.game_winner(state)
+    if winner == player:
+        return math.inf
+    elif winner in game.players():
+        return -math.inf
+    return 0
+
+
+def minimax(game, state, player):
+    if game.game_winner(state) is not None:
+        return terminal_value(game, state, player)
+    values = []
+    for move in game.legal_moves(state)[state['player']]:
+        successor = game.make_move(state, {state['player']: move})
+        values.append(minimax(game, successor, player))
+    if state['player'] == player:
+        return max(values)
+    return min(values)
+
+
+def midgame_state():
+    state = tic_tac_toe.initial_state()
+    for move in [4, 0, 8, 2]:
+        state = tic_tac_toe.make_move(state, {state['player']: move})
+    return state
+
+
+def test_values_match_minimax():
+    state = midgame_state()
+    for player in tic_tac_toe.players():
+        search = FullSearch(tic_tac_toe, state, player)
+        search.build_tree()
+        root_hash = tic_tac_toe.hash_state(state)
+        assert search.value[root_hash] == minimax(tic_tac_toe, state, player)
+        for state_hash, value in search.value.items():
+            node = search.known_states[state_hash]
+            assert value == minimax(tic_tac_toe, node, player)
+
+
+def test_each_node_reevaluated_once_per_wave():
+    state = midgame_state()
+    search = CountingSearch(tic_tac_toe, state, tic_tac_toe.X)
+    search.build_tree()
+    assert len(search.waves) > 1
+    for wave in search.waves:
+        assert max(Counter(wave).values()) == 1
+    assert search.reevaluations == len(search.waves[-1])
+
+
+class CyclicGame:
+    """
+    One player walks around a ring of four positions, forever. Moving
+    between adjacent positions makes the graph of states cyclic.
+    """
+    @staticmethod
+    def players():
+        return [1]
+
+    @staticmethod
+    def game_winner(state):
+        return None
+
+    @staticmethod
+    def legal_moves(state):
+        return {1: [-1, 1]}
+
+    @staticmethod
+    def make_move(state, moves):
+        return (state + moves[1]) % 4
+
+    @staticmethod
+    def hash_state(state):
+        return state
+
+
+class CyclicSearch(CountingSearch):
+    def evaluate_state(self, state):
+        return state
+
+
+def test_cycles_terminate():
+    search = CyclicSearch(CyclicGame, 0, 1)
+    search.build_tree()
+    # Every position is reachable, so every one can reach the best one.
+    assert search.value[0] == 3
+    for wave in search.waves:
+        counts = Counter(wave)
+        assert max(counts.values()) <= search.backpropagation_limit
+
+
+class GrowingCyclicSearch(CyclicSearch):
+    def reevaluate_node(self, state):
+        value, actions = super().reevaluate_node(state)
+        return value + 1, actions
+
+
+def test_limit_only_truncates_cycles():
+    state = midgame_state()
+    search = FullSearch(tic_tac_toe, state, tic_tac_toe.X)
+    search.backpropagation_limit = 0
+    search.build_tree()
+    assert not search.truncated
+    for state_hash, value in search.value.items():
+        node = search.known_states[state_hash]
+        assert value == minimax(tic_tac_toe, node, tic_tac_toe.X)
+
+    # Without the limit, this would count up around the ring forever.
+    search = GrowingCyclicSearch(CyclicGame, 0, 1)
+    search.build_tree()
+    assert search.truncated
+    assert search.truncated <= search.cyclic_states
+    for wave in search.waves:
+        assert max(Counter(wave).values()) <= search.backpropagation_limit
+
+
+class QueueGame:
+    prioritization_funcs = dict(default=lambda state: state['priority'])
+
+    @staticmethod
+    def hash_state(state):
+        return state['name']
+
+
+def make_queue(queue_class, unique_expansions=False):
+    expansion_queue = queue_class()
+    expansion_queue.game = QueueGame
+    expansion_queue.prioritization_function = 'default'
+    expansion_queue.unique_expansions = unique_expansions
+    expansion_queue.setup_expansion()
+    return expansion_queue
+
+
+def drain(expansion_queue):
+    names = []
+    while (states := expansion_queue.select_states_to_expand()):
+        names.extend(state['name'] for state in states)
+    return names
+
+
+def test_priority_queue_ties_keep_insertion_order():
+    expansion_queue = make_queue(PriorityExpansionQueue)
+    # Dicts can't be compared, so ties must never get to the states.
+    for name, priority in [('a', 2), ('b', 1), ('c', 2), ('d', 1), ('e', 0)]:
+        expansion_queue.enqueue_for_expansion(dict(name=name, priority=priority))
+    priority, state = expansion_queue.peek_expansion()
+    assert (priority, state['name']) == (0, 'e')
+    assert expansion_queue.peek_expansion()[1] is state  # Still there
+    assert drain(expansion_queue) == ['e', 'b', 'd', 'a', 'c']
+    assert expansion_queue.peek_expansion() is None
+
+
+def test_unique_expansions():
+    for queue_class in [PriorityExpansionQueue, SingleNodeBreadthSearch]:
+        expansion_queue = make_queue(queue_class, unique_expansions=True)
+        for name in 'abab':
+            expansion_queue.enqueue_for_expansion(dict(name=name, priority=0))
+        assert drain(expansion_queue) == ['a', 'b']
+        expansion_queue = make_queue(queue_class)
+        for name in 'abab':
+            expansion_queue.enqueue_for_expansion(dict(name=name, priority=0))
+        assert drain(expansion_queue) == ['a', 'b', 'a', 'b']
+
+
+class AlphaBetaSearch(
+        TranspositionTable,
+        AlphaBetaExpansion,
+        NoExpansionQueue,
+        AllCombinations,
+        AlphaBeta,
+        BestMovePlayer,
+        Search,
+):
+    def evaluate_state(self, state):
+        return terminal_value(self.game, state, self.player)
+
+
+def test_alpha_beta_matches_minimax():
+    state = midgame_state()
+    root_hash = tic_tac_toe.hash_state(state)
+    for player in tic_tac_toe.players():
+        full = FullSearch(tic_tac_toe, state, player)
+        full.build_tree()
+        pruned = AlphaBetaSearch(tic_tac_toe, state, player)
+        pruned.search_depth = 9
+        pruned.build_tree()
+        value, actions = pruned.opinion[root_hash]
+        assert value == full.opinion[root_hash][0]
+        assert actions and set(actions) <= set(full.opinion[root_hash][1])
+        assert len(pruned.known_states) < len(full.known_states)
+
+
+class HeuristicEvaluation:
+    evaluation_function = 'default'
+
+    def evaluate_state(self, state):
+        scores = self.game.evaluation_funcs['default'](state)
+        opponent = [v for p, v in scores.items() if p != self.player]
+        return scores[self.player] - sum(opponent)
+
+
+class PliesSearch(
+        HeuristicEvaluation,
+        TranspositionTable,
+        StepLimitedExpansion,
+        BreadthSearch,
+        AllCombinations,
+        Minimax,
+        BestMovePlayer,
+        Search,
+):
+    expansion_steps = 3
+
+
+class PrunedPliesSearch(
+        HeuristicEvaluation,
+        TranspositionTable,
+        AlphaBetaExpansion,
+        NoExpansionQueue,
+        AllCombinations,
+        AlphaBeta,
+        BestMovePlayer,
+        Search,
+):
+    search_depth = 3
+
+
+def test_alpha_beta_with_heuristic_at_equal_depth():
+    game = four_in_a_row.Game
+    state = game.initial_state()
+    for move in [3, 3, 2]:
+        player = [p for p, moves in game.legal_moves(state).items() if moves][0]
+        state = game.make_move(state, {player: move})
+    root_hash = game.hash_state(state)
+    full = PliesSearch(game, state, four_in_a_row.O)
+    full.build_tree()
+    pruned = PrunedPliesSearch(game, state, four_in_a_row.O)
+    pruned.build_tree()
+    value, actions = pruned.opinion[root_hash]
+    assert value == full.opinion[root_hash][0]
+    assert set(actions) <= set(full.opinion[root_hash][1])
+    assert len(pruned.known_states) < len(full.known_states)
+
+    # Searching again, deeper, reuses the stored bounds.
+    pruned.search_depth = 4
+    pruned.build_tree()
+    assert pruned.bounds[root_hash][0] == 4
+
+
+def test_assemble_alpha_beta():
+    search_class = assemble_search('limit_type=alphabeta,limit=5')
+    assert issubclass(search_class, AlphaBeta)
+    assert issubclass(search_class, AlphaBetaExpansion)
+    assert search_class.search_depth == 5
+    search = search_class(four_in_a_row.Game, four_in_a_row.initial_state(),
+                          four_in_a_row.X)
+    assert search.run() in range(four_in_a_row.COLUMNS)
+
+
+@pytest.mark.parametrize('spec', ['limit_type=alphabeta,limit=2',
+                                  'time=1.0,limit=2'])
+def test_alpha_beta_on_finished_game(spec):
+    state = tic_tac_toe.initial_state()
+    for move in [0, 3, 1, 4, 2]:  # X wins.
+        state = tic_tac_toe.make_move(state, {state['player']: move})
+    search = assemble_search(spec)(tic_tac_toe, state, tic_tac_toe.O)
+    search.evaluate_state = lambda state: terminal_value(
+        tic_tac_toe, state, tic_tac_toe.O)
+    search.build_tree()
+    assert search.value[tic_tac_toe.hash_state(state)] == -math.inf
+
+
+class DeepeningSearch(
+        HeuristicEvaluation,
+        TranspositionTable,
+        TimeLimitedDeepening,
+        NoExpansionQueue,
+        AllCombinations,
+        AlphaBeta,
+        BestMovePlayer,
+        Search,
+):
+    pass
+
+
+def test_deepening_matches_fixed_depth():
+    game = four_in_a_row.Game
+    state = game.initial_state()
+    root_hash = game.hash_state(state)
+    deepening = DeepeningSearch(game, state, four_in_a_row.X)
+    deepening.time_limit = 60.0
+    deepening.max_depth = 3
+    deepening.build_tree()
+    assert deepening.completed_depth == 3
+    fixed = PrunedPliesSearch(game, state, four_in_a_row.X)
+    fixed.build_tree()
+    assert deepening.opinion[root_hash][0] == fixed.opinion[root_hash][0]
+
+
+def test_deepening_keeps_to_the_time_limit():
+    game = four_in_a_row.Game
+    state = game.initial_state()
+    search = DeepeningSearch(game, state, four_in_a_row.X)
+    search.time_limit = 0.0
+    search.clock_check_interval = 1
+    assert search.run() in range(four_in_a_row.COLUMNS)
+    assert search.completed_depth == 1  # The first one always completes.
+
+    search = DeepeningSearch(game, state, four_in_a_row.X)
+    search.time_limit = 0.2
+    start_time = time.perf_counter()
+    assert search.run() in range(four_in_a_row.COLUMNS)
+    assert time.perf_counter() - start_time < 1.0
+    assert 1 < search.completed_depth < search.max_depth
+
+
+def test_deepening_stops_at_sure_outcome():
+    state = tic_tac_toe.initial_state()
+    for move in [4, 1, 0]:  # X can't be stopped anymore.
+        state = tic_tac_toe.make_move(state, {state['player']: move})
+    search = DeepeningSearch(tic_tac_toe, state, tic_tac_toe.O)
+    search.evaluate_state = lambda state: terminal_value(
+        tic_tac_toe, state, tic_tac_toe.O)
+    search.time_limit = 60.0
+    search.build_tree()
+    assert search.completed_depth == 4
+    assert search.opinion[tic_tac_toe.hash_state(state)][0] == -math.inf
+
+
+def test_assemble_time_limited():
+    search_class = assemble_search('time=0.1,limit=7,eval_func')
+    assert issubclass(search_class, TimeLimitedDeepening)
+    assert issubclass(search_class, AlphaBeta)
+    assert (search_class.time_limit, search_class.max_depth) == (0.1, 7)
+    search = search_class(four_in_a_row.Game, four_in_a_row.initial_state(),
+                          four_in_a_row.X)
+    assert search.run() in range(four_in_a_row.COLUMNS)
+
+
+class MCTSSearch(
+        TranspositionTable,
+        MCTSExpansion,
+        NoExpansionQueue,
+        AllCombinations,
+        UCT,
+        BestMovePlayer,
+        Search,
+):
+    mcts_iterations = 2000  # Needs no evaluation; The playouts count.
+
+
+def test_mcts_finds_winning_and_blocking_moves():
+    random.seed(0)
+    state = tic_tac_toe.initial_state()
+    for move in [0, 3, 1, 4]:  # X wins at 2, O threatens 5.
+        state = tic_tac_toe.make_move(state, {state['player']: move})
+    search = MCTSSearch(tic_tac_toe, state, tic_tac_toe.X)
+    assert search.run() == 2
+    root_hash = tic_tac_toe.hash_state(state)
+    assert search.visits[root_hash] == search.mcts_iterations
+    assert search.opinion[root_hash][0] > 0.9
+
+    state = tic_tac_toe.initial_state()
+    for move in [0, 4, 1]:  # X threatens 2.
+        state = tic_tac_toe.make_move(state, {state['player']: move})
+    search = MCTSSearch(tic_tac_toe, state, tic_tac_toe.O)
+    assert search.run() == 2
+
+
+class SimultaneousGame:
+    """
+    Both players pick 0 or 1 at the same time. Player 1 wins by picking
+    1, unless player 2 picks 1 as well, which makes it a draw.
+    """
+    @staticmethod
+    def players():
+        return [1, 2]
+
+    @staticmethod
+    def game_winner(state):
+        if state is None:
+            return None
+        if state == (1, 0):
+            return 1
+        elif state == (1, 1):
+            return 3  # Draw
+        return 2
+
+    @staticmethod
+    def legal_moves(state):
+        return {1: [0, 1], 2: [0, 1]}
+
+    @staticmethod
+    def make_move(state, moves):
+        return (moves[1], moves[2])
+
+    @staticmethod
+    def hash_state(state):
+        return state
+
+
+def test_mcts_simultaneous_moves():
+    random.seed(0)
+    for player, best_move in [(1, 1), (2, 1)]:
+        search = MCTSSearch(SimultaneousGame, None, player)
+        search.mcts_iterations = 500
+        assert search.run() == best_move
+        stats = search.move_stats[None]
+        assert set(stats) == {1, 2}
+        assert sum(visits for visits, _ in stats[1].values()) == 499
+
+
+class DiagonalMCTSSearch(MCTSSearch):
+    # Both players always pick the same move.
+    def get_expanding_actions(self, state):
+        return [{1: 0, 2: 0}, {1: 1, 2: 1}]
+
+
+def test_mcts_credits_the_played_action():
+    random.seed(0)
+    search = DiagonalMCTSSearch(SimultaneousGame, None, 1)
+    search.mcts_iterations = 200
+    search.build_tree()
+    stats = search.move_stats[None]
+    for move in [0, 1]:
+        assert stats[1][move][0] == stats[2][move][0]
+        assert stats[1][move][1] + stats[2][move][1] == stats[1][move][0]
+
+
+def test_mcts_does_not_evaluate_expanded_states():
+    search_class = assemble_search('limit_type=mcts,limit=50,mcts=10')
+    assert issubclass(search_class, MonteCarloBasedEvaluation)
+    search = search_class(tic_tac_toe.Game, tic_tac_toe.initial_state(),
+                          tic_tac_toe.X)
+    evaluated = []
+    search.evaluate_state = evaluated.append
+    assert search.run() in range(9)
+    assert not evaluated
+
+
+def test_mcts_time_budget():
+    search = MCTSSearch(four_in_a_row.Game, four_in_a_row.initial_state(),
+                        four_in_a_row.X)
+    search.mcts_iterations = None
+    search.time_limit = 0.2
+    start_time = time.perf_counter()
+    assert search.run() in range(four_in_a_row.COLUMNS)
+    assert time.perf_counter() - start_time < 1.0
+    assert search.visits[four_in_a_row.hash_state(search.current_state)] > 1
+
+
+@pytest.mark.parametrize('spec', ['limit_type=mcts,limit=1',
+                                  'limit_type=mcts,time=1e-9'])
+def test_mcts_minimal_budget(spec):
+    search = assemble_search(spec)(four_in_a_row.Game,
+                                   four_in_a_row.initial_state(),
+                                   four_in_a_row.X)
+    assert search.run() in range(four_in_a_row.COLUMNS)
+
+
+def test_mcts_needs_a_limit():
+    search = MCTSSearch(four_in_a_row.Game, four_in_a_row.initial_state(),
+                        four_in_a_row.X)
+    search.mcts_iterations = None
+    search.time_limit = None
+    with pytest.raises(Exception, match="limit"):
+        search.build_tree()
+
+
+def test_assemble_mcts():
+    search_class = assemble_search('limit_type=mcts,limit=200')
+    assert issubclass(search_class, UCT)
+    assert search_class.mcts_iterations == 200
+    search = search_class(four_in_a_row.Game, four_in_a_row.initial_state(),
+                          four_in_a_row.X)
+    assert search.run() in range(four_in_a_row.COLUMNS)
+    search_class = assemble_search('limit_type=mcts,time=0.1')
+    assert (search_class.mcts_iterations, search_class.time_limit) == (None, 0.1)
+
+
+class ParallelRollouts(
+        TranspositionTable,
+        NoExpansion,
+        NoExpansionQueue,
+        AllCombinations,
+        ZeroSumPlayer,
+        ParallelMonteCarloBasedEvaluation,
+        Minimax,
+        BestMovePlayer,
+        Search,
+):
+    mcts_width = 200
+    rollout_seed = 1
+
+
+def test_parallel_rollouts_are_reproducible():
+    state = midgame_state()
+    try:
+        valuations = []
+        for processes in [1, 2, 2]:
+            search = ParallelRollouts(tic_tac_toe, state, tic_tac_toe.X)
+            search.rollout_processes = processes
+            valuations.append(search.evaluate_state_by_player(state))
+        assert valuations[0] == valuations[1] == valuations[2]
+        assert 0 < sum(valuations[0].values()) <= search.mcts_width
+        # X is ahead, and should win most random games from here.
+        assert valuations[0][tic_tac_toe.X] > valuations[0][tic_tac_toe.O]
+
+        # Terminal states don't need playouts.
+        won = tic_tac_toe.initial_state()
+        for move in [0, 3, 1, 4, 2]:
+            won = tic_tac_toe.make_move(won, {won['player']: move})
+        assert search.evaluate_state_by_player(won)[tic_tac_toe.X] == math.inf
+    finally:
+        shutdown_rollout_pools()
+
+
+def random_games(game, count, seed):
+    # All states of random games, with the moves made in them
+    rng = random.Random(seed)
+    for _ in range(count):
+        state = game.initial_state()
+        while game.game_winner(state) is None:
+            moves = game.legal_moves(state)
+            player = [p for p, options in moves.items() if options][0]
+            move = rng.choice(moves[player])
+            yield state, move
+            state = game.make_move(state, {player: move})
+        yield state, None
+
+
+@pytest.mark.parametrize('game', [tic_tac_toe.Game, four_in_a_row.Game])
+def test_batch_functions_match_game_rules(game):
+    for state, move in random_games(game, 20, 0):
+        boards = game.state_to_array(state)[np.newaxis]
+        winner = game.game_winner(state)
+        assert game.batch_game_winner(boards)[0] == (winner or 0)
+        if move is None:
+            continue
+        legal = np.flatnonzero(game.batch_legal_moves(boards)[0])
+        moves = game.legal_moves(state)
+        player = [p for p, options in moves.items() if options][0]
+        assert list(legal) == moves[player]
+        successor = game.make_move(state, {player: move})
+        boards = game.batch_make_move(boards, np.array([move]))
+        assert (boards[0] == game.state_to_array(successor)).all()
+
+
+class PlayoutEvaluation(
+        TranspositionTable,
+        NoExpansion,
+        NoExpansionQueue,
+        AllCombinations,
+        ZeroSumPlayer,
+        MonteCarloBasedEvaluation,
+        Minimax,
+        BestMovePlayer,
+        Search,
+):
+    mcts_width = 2000
+
+
+class VectorizedPlayoutEvaluation(
+        TranspositionTable,
+        NoExpansion,
+        NoExpansionQueue,
+        AllCombinations,
+        ZeroSumPlayer,
+        VectorizedMonteCarloBasedEvaluation,
+        Minimax,
+        BestMovePlayer,
+        Search,
+):
+    mcts_width = 2000
+    rollout_seed = 0
+
+
+@pytest.mark.parametrize('game', [tic_tac_toe.Game, four_in_a_row.Game])
+def test_vectorized_playouts_match_serial_ones(game):
+    random.seed(0)
+    state = game.initial_state()
+    for move in [4, 0] if game is tic_tac_toe.Game else [3, 3, 2]:
+        moves = game.legal_moves(state)
+        player = [p for p, options in moves.items() if options][0]
+        state = game.make_move(state, {player: move})
+    serial = PlayoutEvaluation(game, state, 1).evaluate_state_by_player(state)
+    search = VectorizedPlayoutEvaluation(game, state, 1)
+    vectorized = search.evaluate_state_by_player(state)
+    assert sum(vectorized.values()) <= search.mcts_width
+    for player in game.players():
+        assert abs(serial[player] - vectorized[player]) < 0.05 * search.mcts_width
+
+    # Same seed, same results
+    again = VectorizedPlayoutEvaluation(game, state, 1)
+    assert again.evaluate_state_by_player(state) == vectorized
+
+
+@pytest.mark.parametrize('game', [tic_tac_toe.Game, four_in_a_row.Game])
+def test_assemble_vectorized_playouts(game):
+    search_class = assemble_search('limit_type=plies,limit=1,mcts,vectorized,seed=3')
+    assert issubclass(search_class, VectorizedMonteCarloBasedEvaluation)
+    assert search_class.rollout_seed == 3
+    assert 'mcts_width' not in vars(search_class)
+    assert assemble_search('mcts=50,vectorized').mcts_width == 50
+    # The REPL passes the game's `Game` class.
+    search = search_class(game, game.initial_state(), 1)
+    search.mcts_width = 50
+    assert search.run() in game.legal_moves(game.initial_state())[1]
+    assert hasattr(search, 'playout_rng')  # Didn't fall back to serial ones
+
+
+def test_games_and_search_work_without_numpy():
+    # NumPy is only needed for the vectorized playouts.
+    script = """
+import sys
+class BlockNumPy:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] == 'numpy':
+            raise ImportError(name)
+sys.meta_path.insert(0, BlockNumPy())
+from pychology.games import four_in_a_row
+from pychology.games.repl import assemble_search
+search = assemble_search('limit_type=mcts,limit=20')(
+    four_in_a_row.Game, four_in_a_row.initial_state(), four_in_a_row.X)
+assert search.run() in range(four_in_a_row.COLUMNS)
+"""
+    subprocess.run([sys.executable, '-c', script], check=True)
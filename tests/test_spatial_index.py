@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+from pychology.games.navmesh.spatial_index import TriangleIndex
+
+
+def grid_mesh(size, seed=0):
+    # Two triangles per unit square, at slightly varying heights
+    rng = random.Random(seed)
+    triangles = []
+    for x in range(size):
+        for y in range(size):
+            z = rng.random() * 0.1
+            a, b, c, d = (x, y, z), (x + 1, y, z), (x + 1, y + 1, z), (x, y + 1, z)
+            triangles.append([a, b, c])
+            triangles.append([a, c, d])
+    return triangles
+
+
+def brute_force_distances(index, pos):
+    return np.sort(np.linalg.norm(index.centers - np.array(pos), axis=1))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_k_nearest(seed):
+    index = TriangleIndex(grid_mesh(12, seed))
+    rng = random.Random(seed)
+    for _ in range(200):
+        # Includes positions off the mesh.
+        pos = (rng.uniform(-4, 16), rng.uniform(-4, 16), rng.uniform(-1, 1))
+        found = index.k_nearest(pos, 5)
+        distances = np.linalg.norm(index.centers[found] - np.array(pos), axis=1)
+        assert np.allclose(distances, brute_force_distances(index, pos)[:5])
+
+
+def test_nearest():
+    index = TriangleIndex(grid_mesh(4))
+    center = index.centers[7]
+    assert index.nearest(center) == 7
+    assert index.nearest(center + np.array([0.0, 0.0, 5.0])) == 7
+
+
+def test_k_larger_than_mesh():
+    index = TriangleIndex(grid_mesh(2))
+    assert sorted(index.k_nearest((0, 0, 0), 100)) == list(range(8))
+
+
+def test_containing():
+    index = TriangleIndex(grid_mesh(5))
+    rng = random.Random(0)
+    for _ in range(200):
+        x, y = rng.uniform(0, 5), rng.uniform(0, 5)
+        triangle_id = index.containing((x, y, 0))
+        square_x, square_y = int(x), int(y)
+        upper = (y - square_y) > (x - square_x)
+        assert triangle_id == (square_x * 5 + square_y) * 2 + upper
+    assert index.containing((-1, 2, 0)) is None
+    assert index.containing((2, 7, 0)) is None
+
+
+def test_containing_stacked_floors():
+    lower = [[(0, 0, 0), (4, 0, 0), (0, 4, 0)]]
+    upper = [[(0, 0, 3), (4, 0, 3), (0, 4, 3)]]
+    index = TriangleIndex(lower + upper)
+    assert index.containing((1, 1, 0.2)) == 0
+    assert index.containing((1, 1, 2.5)) == 1
+
+
+def test_snap():
+    index = TriangleIndex(grid_mesh(3))
+    assert index.snap((0.9, 0.1, 0)) == 0
+    assert index.snap((-2, -2, 0)) in (0, 1)
+
+
+def test_empty_mesh():
+    with pytest.raises(ValueError):
+        TriangleIndex([])